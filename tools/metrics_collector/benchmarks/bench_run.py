@@ -0,0 +1,261 @@
+"""End-to-end `run` benchmark against the local stand-in APIs, checked against stored baselines.
+
+Each repetition runs `run` in a fresh process, so peak RSS and start-up cost are measured as
+in production. Provider rate limits are lifted in the benchmarked process: the numbers show
+the collector's own cost, not the pacing in `scheduler`.
+
+    python benchmarks/bench_run.py                       # all scenarios, compare with baselines
+    python benchmarks/bench_run.py --scenario large-export --scale 1 --repeat 3   # 3M-row account
+    python benchmarks/bench_run.py --update-baselines    # after an intended change
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from standin_api import SyntheticAccount, base_url, make_server
+
+BASELINES_PATH = Path(__file__).with_name("baselines.json")
+END_DATE = "2026-02-07"
+# Allowed drift from a baseline before the benchmark fails: throughput may drop and p95 wall
+# time and peak RSS may grow by this fraction.
+DEFAULT_TOLERANCE = 0.25
+# Baselines are recorded at this scale (a 300k-row export); --scale 1 exports 3M rows per run.
+DEFAULT_SCALE = 0.1
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    description: str
+    account: SyntheticAccount
+    args: tuple[str, ...]
+    # Scaled by --scale; the account sizes above are for scale 1.
+    scaled: bool = False
+
+
+SCENARIOS = (
+    Scenario(
+        "top-rows",
+        "all providers, default row limit (per-run overhead and latency)",
+        SyntheticAccount(),
+        ("--providers", "ga4,gsc,cloudflare,adsense"),
+    ),
+    Scenario(
+        "large-export",
+        "GA4 and GSC full exports (1M pages and 2M queries at --scale 1)",
+        SyntheticAccount(pages=1_000_000, queries=2_000_000),
+        ("--providers", "ga4,gsc", "--full-export"),
+        scaled=True,
+    ),
+    Scenario(
+        "wide-rows",
+        "10k rows per provider file, gzip output",
+        SyntheticAccount(pages=200_000, queries=200_000, paths=50_000),
+        ("--providers", "ga4,gsc,cloudflare", "--row-limit", "10000", "--compress", "gzip"),
+    ),
+)
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    """Nearest-rank percentile; with few repetitions p95 is the slowest run."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+@dataclass
+class Result:
+    scenario: str
+    scale: float
+    rows: int = 0
+    walls: list[float] = field(default_factory=list)
+    rss_peaks: list[int] = field(default_factory=list)
+    providers: dict[str, list[float]] = field(default_factory=dict)
+
+    def to_json(self) -> dict[str, Any]:
+        median = statistics.median(self.walls)
+        return {
+            "scale": self.scale,
+            "rows": self.rows,
+            "rows_per_second": round(self.rows / median, 1),
+            "wall_p50_seconds": round(median, 3),
+            "wall_p95_seconds": round(percentile(self.walls, 0.95), 3),
+            "rss_peak_mib": round(max(self.rss_peaks) / 2**20, 1),
+            "provider_p50_seconds": {
+                name: round(statistics.median(walls), 3) for name, walls in self.providers.items()
+            },
+        }
+
+
+def _scaled(account: SyntheticAccount, scale: float) -> SyntheticAccount:
+    return SyntheticAccount(
+        pages=max(1, int(account.pages * scale)),
+        queries=max(1, int(account.queries * scale)),
+        paths=max(1, int(account.paths * scale)),
+        seed=account.seed,
+    )
+
+
+def _write_credentials(root: Path) -> dict[str, str]:
+    # A cached token that never expires: the broker returns it without refreshing or prompting.
+    from geovito_metrics_collector.credentials import ALL_GOOGLE_SCOPES
+
+    (root / "client_secret.json").write_text("{}", encoding="utf-8")
+    token = {
+        "token": "standin",
+        "refresh_token": "standin",
+        "client_id": "standin",
+        "client_secret": "standin",
+        "scopes": list(ALL_GOOGLE_SCOPES),
+        "expiry": "2099-01-01T00:00:00Z",
+    }
+    (root / "tokens.json").write_text(json.dumps(token), encoding="utf-8")
+    (root / "empty.env").write_text("", encoding="utf-8")
+    return {
+        "GOOGLE_OAUTH_CLIENT_SECRET_FILE": str(root / "client_secret.json"),
+        "GOOGLE_TOKEN_CACHE": str(root / "tokens.json"),
+        "GA4_PROPERTY_ID": "100000001",
+        "GSC_SITE_URL": "sc-domain:geovito.com",
+        "CLOUDFLARE_API_TOKEN": "standin",
+        "CLOUDFLARE_ACCOUNT_ID": "standin",
+        "CLOUDFLARE_ZONE_ID": "",
+        "ADSENSE_ACCOUNT": "",
+        "COLLECTOR_TIMEZONE": "UTC",
+        "COLLECTOR_CACHE_DIR": str(root / "http-cache"),
+    }
+
+
+def _run_once(scenario: Scenario, root: Path, env: dict[str, str]) -> tuple[float, dict[str, Any]]:
+    out = root / "out"
+    shutil.rmtree(out, ignore_errors=True)
+    command = [
+        sys.executable,
+        __file__,
+        "--child",
+        "run",
+        "--date",
+        END_DATE,
+        "--out",
+        str(out),
+        "--env-file",
+        str(root / "empty.env"),
+        "--no-cache",
+        *scenario.args,
+    ]
+    started = time.perf_counter()
+    completed = subprocess.run(command, env=env, cwd=root, capture_output=True, text=True)
+    wall = time.perf_counter() - started
+    if completed.returncode != 0:
+        raise SystemExit(f"{scenario.name}: run failed\n{completed.stdout}\n{completed.stderr}")
+    timings = json.loads((out / END_DATE / "timings.json").read_text(encoding="utf-8"))
+    for provider in timings["providers"]:
+        if provider["rows"] == 0 and provider["http_requests"] == 0:
+            raise SystemExit(f"{scenario.name}: {provider['provider']} made no requests\n{completed.stdout}")
+    return wall, timings
+
+
+def run_scenario(scenario: Scenario, scale: float, repeat: int, latency: float) -> Result:
+    account = _scaled(scenario.account, scale) if scenario.scaled else scenario.account
+    server, stats = make_server(account, latency=latency)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    result = Result(scenario.name, scale if scenario.scaled else 1.0)
+    with tempfile.TemporaryDirectory(prefix="geovito-bench-") as tmp:
+        root = Path(tmp)
+        env = {**os.environ, **_write_credentials(root), "COLLECTOR_API_BASE_URL": base_url(server)}
+        # Warm-up: the first run also pays for byte-compiling and page cache misses.
+        _run_once(scenario, root, env)
+        served = sum(stats.to_json()["rows"].values())
+        for _ in range(repeat):
+            wall, timings = _run_once(scenario, root, env)
+            result.walls.append(wall)
+            result.rss_peaks.append(int(timings.get("rss_peak_bytes") or 0))
+            for provider in timings["providers"]:
+                result.providers.setdefault(provider["provider"], []).append(provider["wall_seconds"])
+        result.rows = (sum(stats.to_json()["rows"].values()) - served) // repeat
+    server.shutdown()
+    server.server_close()
+    return result
+
+
+def compare(current: dict[str, Any], baseline: dict[str, Any], tolerance: float) -> list[str]:
+    failures = []
+    if current["rows_per_second"] < baseline["rows_per_second"] * (1 - tolerance):
+        failures.append(
+            f"throughput {current['rows_per_second']:,.0f} rows/s < baseline {baseline['rows_per_second']:,.0f}"
+        )
+    for key, label in (("wall_p95_seconds", "p95 wall"), ("rss_peak_mib", "peak RSS")):
+        if current[key] > baseline[key] * (1 + tolerance):
+            failures.append(f"{label} {current[key]} > baseline {baseline[key]}")
+    return failures
+
+
+def _child(argv: list[str]) -> None:
+    from geovito_metrics_collector import cli, scheduler
+
+    unlimited = scheduler.RateLimit(rate=1e9, burst=1e9)
+    for provider in list(scheduler.PROVIDER_RATE_LIMITS):
+        scheduler.PROVIDER_RATE_LIMITS[provider] = unlimited
+    scheduler.DEFAULT_RATE_LIMIT = unlimited
+    cli.app(argv, prog_name="geovito-metrics-collector")
+
+
+def main() -> None:
+    if sys.argv[1:2] == ["--child"]:
+        _child(sys.argv[2:])
+        return
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenario", action="append", choices=[scenario.name for scenario in SCENARIOS])
+    parser.add_argument("--scale", type=float, default=DEFAULT_SCALE, help="Multiplies the large-export account size.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Delay the stand-in adds to every response.")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--baselines", type=Path, default=BASELINES_PATH)
+    parser.add_argument("--update-baselines", action="store_true")
+    args = parser.parse_args()
+
+    baselines = json.loads(args.baselines.read_text(encoding="utf-8")) if args.baselines.exists() else {}
+    selected = [scenario for scenario in SCENARIOS if not args.scenario or scenario.name in args.scenario]
+    failures: list[str] = []
+    for scenario in selected:
+        current = run_scenario(scenario, args.scale, args.repeat, args.latency_ms / 1000).to_json()
+        print(
+            f"{scenario.name:>13}: {current['rows_per_second']:>12,.0f} rows/s  "
+            f"p50 {current['wall_p50_seconds']:.2f}s  p95 {current['wall_p95_seconds']:.2f}s  "
+            f"rss {current['rss_peak_mib']:.0f} MiB  ({current['rows']:,} rows; {scenario.description})"
+        )
+        baseline = baselines.get(scenario.name)
+        if args.update_baselines:
+            baselines[scenario.name] = current
+        elif baseline is None:
+            print(f"{'':>15}no baseline; record one with --update-baselines")
+        elif baseline["scale"] != current["scale"] or args.latency_ms:
+            print(f"{'':>15}baseline was recorded at scale {baseline['scale']} without latency; not compared")
+        else:
+            failures += [f"{scenario.name}: {failure}" for failure in compare(current, baseline, args.tolerance)]
+
+    if args.update_baselines:
+        args.baselines.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        print(f"Baselines written to {args.baselines}")
+    if failures:
+        print("PERFORMANCE REGRESSION (beyond {:.0%} of baseline):".format(args.tolerance), file=sys.stderr)
+        for failure in failures:
+            print(f"  - {failure}", file=sys.stderr)
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
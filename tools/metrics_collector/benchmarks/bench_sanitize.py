@@ -0,0 +1,62 @@
+"""Compare `sanitize_rows` with the batch sanitizer on synthetic full-export rows.
+
+    python benchmarks/bench_sanitize.py --rows 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import time
+
+from geovito_metrics_collector.sanitize import sanitize_batch, sanitize_rows
+
+
+def synthetic_rows(count: int, seed: int = 7) -> list[dict[str, object]]:
+    rng = random.Random(seed)
+    pages = [f"https://geovito.com/en/atlas/place-{index}?utm_source=x" for index in range(5_000)]
+    queries = [f"things to do in city {index}" for index in range(20_000)]
+    queries += ["contact me at someone@example.com", "call +90 212 555 0101"]
+    rows = []
+    for index in range(count):
+        rows.append(
+            {
+                "kind": "query",
+                "value": rng.choice(queries),
+                "page": rng.choice(pages),
+                "clicks": rng.randint(0, 500),
+                "impressions": rng.randint(0, 50_000),
+                "ctr": round(rng.random(), 4),
+                "position": round(rng.uniform(1, 80), 2),
+                "sessionId": f"s{index}",
+            }
+        )
+    return rows
+
+
+def _timed(label: str, func, rows, limit):
+    started = time.perf_counter()
+    result = func(rows, limit=limit)
+    elapsed = time.perf_counter() - started
+    print(f"{label:>14}: {elapsed:7.2f}s  {len(rows) / elapsed:>12,.0f} rows/s  ({len(result)} kept)")
+    return result, elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    rows = synthetic_rows(args.rows)
+    limit = len(rows)
+    baseline, baseline_seconds = _timed("sanitize_rows", sanitize_rows, rows, limit)
+    batch, batch_seconds = _timed("sanitize_batch", sanitize_batch, rows, limit)
+
+    if json.dumps(baseline, ensure_ascii=False) != json.dumps(batch, ensure_ascii=False):
+        raise SystemExit("outputs differ")
+    print(f"speedup: {baseline_seconds / batch_seconds:.1f}x, outputs identical")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Compare writing a provider file through full pydantic validation with the trusted-rows path.
+
+    python benchmarks/bench_serialization.py --rows 50000
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime, timezone
+from pathlib import Path
+
+from geovito_metrics_collector import schema
+from geovito_metrics_collector.sanitize import sanitize_batch
+from geovito_metrics_collector.schema import make_provider_result, make_trusted_result
+from geovito_metrics_collector.storage import build_summary, write_results
+
+DAY = date(2026, 2, 7)
+
+
+def synthetic_rows(count: int) -> list[dict[str, object]]:
+    raw = (
+        {"page": f"/en/atlas/city-{index}", "property": "123", "sessions": index % 97, "pageviews": index * 1.5}
+        for index in range(count)
+    )
+    return sanitize_batch(raw, limit=None)
+
+
+def validated_path(out_root: Path, rows: list[dict[str, object]]) -> Path:
+    # The previous path: validate every row, dump the whole model, then sort keys in json.dumps.
+    result = make_provider_result("ga4", DAY, DAY, metrics={"sessions": 1.0}, rows=rows)
+    summary = build_summary([result])
+    output_dir = out_root / DAY.isoformat()
+    output_dir.mkdir(parents=True)
+    payload = json.dumps(result.model_dump(mode="json"), ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    (output_dir / "ga4.json").write_bytes((payload + "\n").encode("utf-8"))
+    (output_dir / "summary.json").write_bytes(summary.model_dump_json().encode("utf-8"))
+    return output_dir
+
+
+def trusted_path(out_root: Path, rows: list[dict[str, object]]) -> Path:
+    result = make_trusted_result("ga4", DAY, DAY, metrics={"sessions": 1.0}, rows=rows)
+    return write_results(out_root, DAY, [result], build_summary([result]))
+
+
+def _measure(path, out_root: Path, rows) -> tuple[float, int]:
+    gc.collect()
+    started = time.perf_counter()
+    path(out_root / "timed", rows)
+    elapsed = time.perf_counter() - started
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        path(out_root / "traced", rows)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return elapsed, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50_000)
+    args = parser.parse_args()
+
+    # Both paths stamp generated_at; pin it so the files can be compared byte for byte.
+    generated_at = datetime.now(timezone.utc)
+    schema.utc_now = lambda: generated_at
+    rows = synthetic_rows(args.rows)
+    with tempfile.TemporaryDirectory(prefix="geovito-bench-") as tmp:
+        root = Path(tmp)
+        old_seconds, old_peak = _measure(validated_path, root / "validated", rows)
+        new_seconds, new_peak = _measure(trusted_path, root / "trusted", rows)
+        same = (root / "validated" / "timed" / DAY.isoformat() / "ga4.json").read_bytes() == (
+            root / "trusted" / "timed" / DAY.isoformat() / "ga4.json"
+        ).read_bytes()
+
+    for label, seconds, peak in (("validated", old_seconds, old_peak), ("trusted", new_seconds, new_peak)):
+        print(f"{label:>10}: {seconds * 1000:8.0f} ms  peak {peak / 2**20:6.1f} MiB  ({args.rows:,} rows)")
+    if not same:
+        raise SystemExit("outputs differ")
+    print(f"speedup: {old_seconds / new_seconds:.1f}x, peak memory: {old_peak / new_peak:.1f}x less, outputs identical")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+"""A local stand-in for the GA4, Search Console, AdSense and Cloudflare GraphQL APIs.
+
+Responses follow the real APIs' shapes and are generated from a synthetic account: row ``i`` of
+every listing is computed from ``i`` alone, so an account with millions of rows costs no memory
+and every run sees the same data. Point the collector at it with ``COLLECTOR_API_BASE_URL``.
+
+    python benchmarks/standin_api.py --pages 1000000 --queries 2000000 --listen 127.0.0.1:8788
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qs, unquote, urlsplit
+
+COUNTRIES = ("tur", "deu", "usa", "gbr", "fra", "nld", "aze", "rus", "ita", "esp")
+DEVICES = ("MOBILE", "DESKTOP", "TABLET")
+STATUSES = (200, 200, 200, 301, 304, 404, 403, 500, 502)
+# Same cap as the real GraphQL API's `limit` on httpRequestsAdaptiveGroups.
+CLOUDFLARE_MAX_GROUPS = 10_000
+
+
+@dataclass(frozen=True)
+class SyntheticAccount:
+    """Row counts of a simulated site; each listing is ordered by its main metric, descending."""
+
+    pages: int = 10_000
+    queries: int = 50_000
+    paths: int = 10_000
+    seed: int = 7
+
+    def _spread(self, index: int, modulo: int) -> int:
+        return (index * 2_654_435_761 + self.seed) % modulo
+
+    def page(self, index: int) -> str:
+        # Every 50th URL carries a query string and a fragment for the sanitizer to strip.
+        suffix = f"?utm_source=news&id={index}#top" if index % 50 == 0 else ""
+        return f"/{('en', 'tr', 'de')[index % 3]}/atlas/place-{index}{suffix}"
+
+    def query(self, index: int) -> str:
+        if index % 997 == 0:
+            return f"contact someone{index}@example.com about city {index}"
+        return f"things to do in city {index}"
+
+    def ga4_row(self, index: int) -> dict[str, Any]:
+        pageviews = self.pages - index
+        return {
+            "dimensionValues": [{"value": self.page(index)}],
+            "metricValues": [{"value": str(pageviews // 2 + self._spread(index, 3))}, {"value": str(pageviews)}],
+        }
+
+    def gsc_row(self, dimensions: list[str], index: int) -> dict[str, Any]:
+        keys = []
+        for dimension in dimensions:
+            if dimension == "query":
+                keys.append(self.query(index))
+            elif dimension == "page":
+                keys.append(f"https://geovito.com{self.page(index % self.pages)}")
+            elif dimension == "country":
+                keys.append(COUNTRIES[index % len(COUNTRIES)])
+            elif dimension == "device":
+                keys.append(DEVICES[index % len(DEVICES)])
+            else:
+                keys.append(f"{dimension}-{index}")
+        impressions = (self.queries - index) * 10 + self._spread(index, 10)
+        clicks = impressions // (20 + self._spread(index, 30))
+        return {
+            "keys": keys,
+            "clicks": clicks,
+            "impressions": impressions,
+            "ctr": clicks / impressions if impressions else 0.0,
+            "position": 1.0 + self._spread(index, 400) / 10,
+        }
+
+    def gsc_rows(self, dimensions: list[str]) -> int:
+        if not dimensions:
+            return 1
+        if dimensions == ["page"]:
+            return self.pages
+        if dimensions in (["country"], ["device"]):
+            return len(COUNTRIES) if dimensions == ["country"] else len(DEVICES)
+        return self.queries
+
+    def gsc_totals(self) -> dict[str, Any]:
+        impressions = self.queries * (self.queries + 1) * 5
+        clicks = impressions // 35
+        return {"clicks": clicks, "impressions": impressions, "ctr": clicks / impressions, "position": 12.5}
+
+
+class Stats:
+    """Requests and rows served, per API, since the server started."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.requests: dict[str, int] = {}
+        self.rows: dict[str, int] = {}
+
+    def add(self, api: str, rows: int) -> None:
+        with self._lock:
+            self.requests[api] = self.requests.get(api, 0) + 1
+            self.rows[api] = self.rows.get(api, 0) + rows
+
+    def to_json(self) -> dict[str, Any]:
+        with self._lock:
+            return {"requests": dict(self.requests), "rows": dict(self.rows)}
+
+
+def _ga4_report(account: SyntheticAccount, body: dict[str, Any]) -> tuple[dict[str, Any], int]:
+    quota = {
+        "tokensPerDay": {"consumed": 20, "remaining": 199_980},
+        "tokensPerHour": {"consumed": 20, "remaining": 39_980},
+        "tokensPerProjectPerHour": {"consumed": 20, "remaining": 13_980},
+    }
+    if not body.get("dimensions"):
+        sessions = account.pages * (account.pages + 1) // 4
+        values = [{"value": str(sessions)}, {"value": str(sessions * 3 // 4)}, {"value": str(sessions * 2)}]
+        return {"rowCount": 1, "totals": [{"metricValues": values}], "propertyQuota": quota}, 1
+    offset = int(body.get("offset") or 0)
+    stop = min(account.pages, offset + int(body.get("limit") or 10_000))
+    rows = [account.ga4_row(index) for index in range(offset, stop)]
+    return {"rowCount": account.pages, "rows": rows, "propertyQuota": quota}, len(rows)
+
+
+def _gsc_query(account: SyntheticAccount, body: dict[str, Any]) -> tuple[dict[str, Any], int]:
+    dimensions = list(body.get("dimensions") or [])
+    if not dimensions:
+        return {"rows": [{"keys": [], **account.gsc_totals()}], "responseAggregationType": "byProperty"}, 1
+    start = int(body.get("startRow") or 0)
+    stop = min(account.gsc_rows(dimensions), start + int(body.get("rowLimit") or 1_000))
+    rows = [account.gsc_row(dimensions, index) for index in range(start, stop)]
+    return {"rows": rows, "responseAggregationType": "byPage"}, len(rows)
+
+
+def _adsense_report(params: dict[str, list[str]]) -> tuple[dict[str, Any], int]:
+    def day(prefix: str) -> date:
+        return date(*(int(params[f"{prefix}.{part}"][0]) for part in ("year", "month", "day")))
+
+    start, end = day("startDate"), day("endDate")
+    limit = int(params.get("limit", ["10000"])[0])
+    days = [start + timedelta(days=offset) for offset in range((end - start).days + 1)][:limit]
+    rows = [
+        {
+            "cells": [
+                {"value": str(current)},
+                {"value": f"{12.5 + index:.2f}"},
+                {"value": str(4000 + index)},
+                {"value": "3.10"},
+            ]
+        }
+        for index, current in enumerate(days)
+    ]
+    headers = [{"name": name} for name in ("DATE", "ESTIMATED_EARNINGS", "IMPRESSIONS", "PAGE_VIEWS_RPM")]
+    earnings = sum(12.5 + index for index in range(len(days)))
+    totals = [{}, {"value": f"{earnings:.2f}"}, {"value": str(4000 * len(days))}, {"value": "3.10"}]
+    payload = {"headers": headers, "rows": rows, "totals": {"cells": totals}, "totalMatchedRows": str(len(rows))}
+    return payload, len(rows)
+
+
+def _cloudflare_graphql(account: SyntheticAccount, body: dict[str, Any]) -> tuple[dict[str, Any], int]:
+    variables = body.get("variables") or {}
+    limit = min(CLOUDFLARE_MAX_GROUPS, account.paths, int(variables.get("limit") or 1))
+    top_paths = [
+        {
+            "dimensions": {"clientRequestPath": account.page(index % account.pages)},
+            "sum": {"requests": (account.paths - index) * 4, "bytes": (account.paths - index) * 40_960},
+        }
+        for index in range(limit)
+    ]
+    total_requests = account.paths * (account.paths + 1) * 2
+    entity = {
+        "totals": [{"sum": {"requests": total_requests, "bytes": total_requests * 10_240}}],
+        "topPaths": top_paths,
+        "statusGroups": [
+            {"dimensions": {"edgeResponseStatus": status}, "sum": {"requests": total_requests // (index + 2)}}
+            for index, status in enumerate(STATUSES)
+        ],
+    }
+    key = "zones" if "zoneTag" in variables else "accounts"
+    return {"data": {"viewer": {key: [entity]}}, "errors": None}, len(top_paths) + len(STATUSES)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    account: SyntheticAccount
+    stats: Stats
+    latency: float
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        return None
+
+    def _reply(self, status: int, payload: Any) -> None:
+        body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        if self.latency:
+            time.sleep(self.latency)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=UTF-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _body(self) -> dict[str, Any]:
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def do_GET(self) -> None:  # noqa: N802
+        url = urlsplit(self.path)
+        path = unquote(url.path)
+        if path == "/_stats":
+            self._reply(200, self.stats.to_json())
+        elif path == "/v2/accounts":
+            self.stats.add("adsense", 1)
+            self._reply(200, {"accounts": [{"name": "accounts/pub-0000000000000000", "displayName": "Stand-in"}]})
+        elif path.startswith("/v2/accounts/") and path.endswith("/reports:generate"):
+            payload, rows = _adsense_report(parse_qs(url.query))
+            self.stats.add("adsense", rows)
+            self._reply(200, payload)
+        else:
+            self._reply(404, {"error": {"code": 404, "message": f"no stand-in for GET {path}"}})
+
+    def do_POST(self) -> None:  # noqa: N802
+        path = unquote(urlsplit(self.path).path)
+        body = self._body()
+        if path.startswith("/v1beta/properties/") and path.endswith(":batchRunReports"):
+            reports = [_ga4_report(self.account, request) for request in body.get("requests") or []]
+            self.stats.add("ga4", sum(rows for _, rows in reports))
+            self._reply(200, {"reports": [report for report, _ in reports], "kind": "analyticsData#batchRunReports"})
+        elif path.startswith("/v1beta/properties/") and path.endswith(":runReport"):
+            report, rows = _ga4_report(self.account, body)
+            self.stats.add("ga4", rows)
+            self._reply(200, report)
+        elif path.startswith("/webmasters/v3/sites/") and path.endswith("/searchAnalytics/query"):
+            payload, rows = _gsc_query(self.account, body)
+            self.stats.add("gsc", rows)
+            self._reply(200, payload)
+        elif path == "/client/v4/graphql":
+            payload, rows = _cloudflare_graphql(self.account, body)
+            self.stats.add("cloudflare", rows)
+            self._reply(200, payload)
+        else:
+            self._reply(404, {"error": {"code": 404, "message": f"no stand-in for POST {path}"}})
+
+
+def make_server(
+    account: SyntheticAccount, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0
+) -> tuple[ThreadingHTTPServer, Stats]:
+    """A threaded stand-in server (port 0 picks a free one); ``latency`` seconds are added per response."""
+    stats = Stats()
+    handler = type("Handler", (_Handler,), {"account": account, "stats": stats, "latency": latency})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server, stats
+
+
+def base_url(server: ThreadingHTTPServer) -> str:
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=SyntheticAccount.pages)
+    parser.add_argument("--queries", type=int, default=SyntheticAccount.queries)
+    parser.add_argument("--paths", type=int, default=SyntheticAccount.paths)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Delay added to every response.")
+    parser.add_argument("--listen", default="127.0.0.1:8788")
+    args = parser.parse_args()
+
+    host, _, port = args.listen.rpartition(":")
+    account = SyntheticAccount(pages=args.pages, queries=args.queries, paths=args.paths)
+    server, _ = make_server(account, host or "127.0.0.1", int(port), args.latency_ms / 1000)
+    print(f"Serving {account} at {base_url(server)}; set COLLECTOR_API_BASE_URL to it")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import threading
+import uuid
+from datetime import date
+from pathlib import Path
+from typing import Any
+
+from .cache import cache_key
+from .config import CollectorConfig, DateWindow
+from .schema import utc_now
+
+ARCHIVE_DIRNAME = "archive"
+ARCHIVE_SUFFIX = ".jsonl.gz"
+ARCHIVE_VERSION = 1
+# Config that shapes a provider's requests and parsing. Secrets and local paths are not archived.
+REPLAYED_FIELDS = (
+    "ga4_property_id",
+    "gsc_site_url",
+    "gsc_combined_dimensions",
+    "adsense_account",
+    "cloudflare_account_id",
+    "cloudflare_zone_id",
+    "collector_timezone",
+)
+# Stands in for credentials when replaying, so providers still count as configured.
+REPLAY_PLACEHOLDER = "archived"
+
+
+def archive_dir(out_root: Path, day: date) -> Path:
+    return out_root / ARCHIVE_DIRNAME / day.isoformat()
+
+
+def archive_path(out_root: Path, day: date, provider: str) -> Path:
+    return archive_dir(out_root, day) / f"{provider}{ARCHIVE_SUFFIX}"
+
+
+def archived_days(out_root: Path) -> list[date]:
+    root = out_root / ARCHIVE_DIRNAME
+    if not root.is_dir():
+        return []
+    days = []
+    for entry in root.iterdir():
+        try:
+            days.append(date.fromisoformat(entry.name))
+        except ValueError:
+            continue
+    return sorted(days)
+
+
+def archived_providers(out_root: Path, day: date) -> list[str]:
+    directory = archive_dir(out_root, day)
+    if not directory.is_dir():
+        return []
+    return sorted(
+        path.name.removesuffix(ARCHIVE_SUFFIX)
+        for path in directory.iterdir()
+        if path.name.endswith(ARCHIVE_SUFFIX) and not path.name.startswith(".")
+    )
+
+
+class ArchiveWriter:
+    """Raw responses of one provider run, streamed into a gzipped JSONL file.
+
+    The first line describes the run (window, row limit, replayed config); every other line
+    holds one request and its raw response. The file replaces the previous archive of the same
+    provider and end date only on `commit`, after the provider finished without an exception.
+    """
+
+    replaying = False
+
+    def __init__(self, path: Path, header: dict[str, Any]) -> None:
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex[:8]}.tmp")
+        self._handle = gzip.GzipFile(self._tmp, "wb", mtime=0)
+        self._lock = threading.Lock()
+        self.responses = 0
+        self._write(header)
+
+    def _write(self, payload: dict[str, Any]) -> None:
+        line = json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(",", ":"), default=str)
+        self._handle.write(line.encode("utf-8") + b"\n")
+
+    def add(self, request: dict[str, Any], response: dict[str, Any]) -> None:
+        # Provider sub-threads (GA4 properties, GSC dimensions) share one writer.
+        with self._lock:
+            self._write({"request": request, "response": response})
+            self.responses += 1
+
+    def commit(self) -> Path:
+        with self._lock:
+            self._handle.close()
+            # Raw responses are unsanitized, like the response cache: owner-readable only.
+            os.chmod(self._tmp, 0o600)
+            os.replace(self._tmp, self.path)
+        return self.path
+
+    def discard(self) -> None:
+        with self._lock:
+            self._handle.close()
+            self._tmp.unlink(missing_ok=True)
+
+
+def open_archive(
+    config: CollectorConfig, date_window: DateWindow, provider: str, row_limit: int
+) -> ArchiveWriter | None:
+    """A writer for ``provider``'s run when ``config.archive_root`` is set."""
+    if config.archive_root is None:
+        return None
+    header = {
+        "version": ARCHIVE_VERSION,
+        "provider": provider,
+        "start": date_window.start.isoformat(),
+        "end": date_window.end.isoformat(),
+        "row_limit": row_limit,
+        "archived_at": utc_now().isoformat(),
+        "config": {name: getattr(config, name) for name in REPLAYED_FIELDS},
+        "configured": {
+            "google": config.google_oauth_client_secret_file is not None,
+            "cloudflare": config.cloudflare_api_token is not None,
+        },
+    }
+    return ArchiveWriter(archive_path(config.archive_root, date_window.end, provider), header)
+
+
+class ArchiveReader:
+    """Serves one archived provider run back to its collector, keyed like the response cache."""
+
+    replaying = True
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        with gzip.open(path, "rt", encoding="utf-8") as handle:
+            lines = iter(handle)
+            try:
+                self.header: dict[str, Any] = json.loads(next(lines))
+            except StopIteration:
+                raise RuntimeError(f"Archive {path} is empty") from None
+            if self.header.get("version") != ARCHIVE_VERSION:
+                raise RuntimeError(f"Archive {path} has unsupported version {self.header.get('version')}")
+            self.provider = str(self.header["provider"])
+            self.date_window = DateWindow(
+                start=date.fromisoformat(self.header["start"]), end=date.fromisoformat(self.header["end"])
+            )
+            self._responses: dict[str, dict[str, Any]] = {}
+            for line in lines:
+                entry = json.loads(line)
+                self._responses[cache_key(self.provider, entry["request"], self.date_window)] = entry["response"]
+
+    @property
+    def row_limit(self) -> int:
+        return int(self.header["row_limit"])
+
+    def get(self, provider: str, request: dict[str, Any], date_window: DateWindow) -> dict[str, Any]:
+        response = self._responses.get(cache_key(provider, request, date_window))
+        if response is None:
+            method = request.get("method", "request")
+            raise RuntimeError(f"{self.path.name} has no response for {method}; reprocessing never fetches")
+        return response
+
+    def replay_config(self) -> CollectorConfig:
+        """A config that reproduces the archived run's requests without network or credentials.
+
+        Collectors only replay while the reader is bound with `cache.bind_archive`.
+        """
+        configured = self.header.get("configured") or {}
+        return CollectorConfig(
+            **self.header["config"],
+            google_oauth_client_secret_file=Path(REPLAY_PLACEHOLDER) if configured.get("google") else None,
+            google_token_cache=Path(REPLAY_PLACEHOLDER),
+            cloudflare_api_token=REPLAY_PLACEHOLDER if configured.get("cloudflare") else None,
+            cache_enabled=False,
+        )
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Sequence
+
+from .columnar import write_columnar
+from .config import CollectorConfig, DateWindow, resolve_date_window
+from .rollups import update_rollups
+from .runner import DEFAULT_PROVIDER_TIMEOUT_SECONDS, CollectionAborted, Echo, collect_from_days, collect_providers
+from .schema import ProviderName, utc_now
+from .storage import build_summary, write_results
+from .warehouse import upsert_results
+
+JOURNAL_DIRNAME = ".backfill"
+JOURNAL_FILENAME = "journal.jsonl"
+
+
+def split_date_range(start: date, end: date, days: int, timezone_name: str = "UTC") -> list[DateWindow]:
+    if end < start:
+        raise ValueError("--from must not be after --to")
+    count = (end - start).days + 1
+    return [resolve_date_window(start + timedelta(days=offset), days=days, timezone_name=timezone_name) for offset in range(count)]
+
+
+class BackfillJournal:
+    """Append-only JSONL checkpoint of backfill days that were written successfully."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_output(cls, out_root: Path) -> BackfillJournal:
+        return cls(out_root / JOURNAL_DIRNAME / JOURNAL_FILENAME)
+
+    @staticmethod
+    def _signature(days: int, providers: Sequence[ProviderName]) -> str:
+        return f"days={days};providers={','.join(providers)}"
+
+    def completed(self, days: int, providers: Sequence[ProviderName]) -> set[date]:
+        if not self.path.exists():
+            return set()
+
+        signature = self._signature(days, providers)
+        done: set[date] = set()
+        for line in self.path.read_text(encoding="utf-8").splitlines():
+            try:
+                entry = json.loads(line)
+                if entry.get("signature") == signature:
+                    done.add(date.fromisoformat(str(entry["date"])))
+            except (ValueError, KeyError, TypeError):
+                # A torn trailing line from an interrupted run only loses that day's checkpoint.
+                continue
+        return done
+
+    def mark_done(self, day: date, days: int, providers: Sequence[ProviderName]) -> None:
+        entry = {
+            "date": day.isoformat(),
+            "signature": self._signature(days, providers),
+            "completed_at": utc_now().isoformat(),
+        }
+        line = json.dumps(entry, sort_keys=True, separators=(",", ":")) + "\n"
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a", encoding="utf-8") as handle:
+                handle.write(line)
+                handle.flush()
+                os.fsync(handle.fileno())
+
+    def reset(self) -> None:
+        with self._lock:
+            self.path.unlink(missing_ok=True)
+
+
+@dataclass
+class BackfillReport:
+    written: list[date] = field(default_factory=list)
+    skipped: list[date] = field(default_factory=list)
+    failed: dict[date, list[str]] = field(default_factory=dict)
+    not_started: list[date] = field(default_factory=list)
+
+
+def run_backfill(
+    config: CollectorConfig,
+    windows: Sequence[DateWindow],
+    providers: Sequence[ProviderName],
+    out_root: Path,
+    journal: BackfillJournal,
+    workers: int = 4,
+    fail_soft: bool = False,
+    timeout: float | None = DEFAULT_PROVIDER_TIMEOUT_SECONDS,
+    pretty: bool = False,
+    columnar_format: str | None = None,
+    warehouse_path: Path | None = None,
+    day_store: bool = False,
+    compression: str | None = None,
+    echo: Echo | None = None,
+) -> BackfillReport:
+    """Collect and write one output directory per window using a bounded worker pool."""
+    emit = echo or (lambda _: None)
+    days = (windows[0].end - windows[0].start).days + 1 if windows else 1
+    done = journal.completed(days, providers)
+
+    report = BackfillReport()
+    pending: list[DateWindow] = []
+    for window in windows:
+        if window.end in done:
+            report.skipped.append(window.end)
+        else:
+            pending.append(window)
+
+    stop = threading.Event()
+    report_lock = threading.Lock()
+
+    def process(window: DateWindow) -> None:
+        day = window.end
+        if stop.is_set():
+            with report_lock:
+                report.not_started.append(day)
+            return
+
+        try:
+            if day_store:
+                # Overlapping windows share their days; each day is fetched once across workers.
+                composed = collect_from_days(
+                    config, window, providers, out_root, fail_soft=fail_soft, timeout=timeout, workers=2
+                )
+                results = composed.results
+                for fetched_day in composed.fetched_days:
+                    update_rollups(out_root, fetched_day)
+            else:
+                results = collect_providers(config, window, providers, fail_soft=fail_soft, timeout=timeout)
+            summary = build_summary(results)
+            output_dir = write_results(
+                out_root=out_root,
+                target_date=day,
+                provider_results=results,
+                summary=summary,
+                pretty=pretty,
+                compression=compression,
+            )
+            update_rollups(out_root, day)
+            if columnar_format is not None:
+                write_columnar(out_root, day, results, columnar_format)
+            if warehouse_path is not None:
+                upsert_results(warehouse_path, results)
+        except CollectionAborted as exc:
+            stop.set()
+            with report_lock:
+                report.failed[day] = exc.errors
+            emit(f"- {day.isoformat()}: aborted -> {'; '.join(exc.errors)}")
+            return
+        except Exception as exc:
+            stop.set()
+            with report_lock:
+                report.failed[day] = [f"{type(exc).__name__}: {exc}"]
+            emit(f"- {day.isoformat()}: failed -> {type(exc).__name__}: {exc}")
+            return
+
+        # Fail-soft days that still carry provider errors stay out of the journal so a resumed
+        # backfill retries them.
+        if not any(result.errors for result in results):
+            journal.mark_done(day, days, providers)
+        with report_lock:
+            report.written.append(day)
+        warnings = f" warnings={len(summary.warnings)}" if summary.warnings else ""
+        emit(f"- {day.isoformat()}: wrote {output_dir}{warnings}")
+
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="backfill") as pool:
+        for future in [pool.submit(process, window) for window in pending]:
+            future.result()
+
+    report.written.sort()
+    report.not_started.sort()
+    return report
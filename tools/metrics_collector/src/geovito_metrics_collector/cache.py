@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Callable, Iterator, TypeVar
+
+from .config import PROVIDER_FINALIZATION_LAG_DAYS, CollectorConfig, DateWindow, today_in_timezone
+
+FINAL_TTL_SECONDS = 30 * 24 * 3600
+RECENT_TTL_SECONDS = 15 * 60
+CACHE_FORMAT_VERSION = 1
+
+T = TypeVar("T")
+
+# The raw-response archive of the provider run on this thread (see `archive`): a writer while
+# collecting with --archive, a reader while reprocessing. Bound per run, never on the config.
+_archive: ContextVar[Any] = ContextVar("geovito_archive", default=None)
+
+
+def cache_key(provider: str, request: dict[str, Any], date_window: DateWindow) -> str:
+    material = {
+        "v": CACHE_FORMAT_VERSION,
+        "provider": provider,
+        "request": request,
+        "start": date_window.start.isoformat(),
+        "end": date_window.end.isoformat(),
+    }
+    encoded = json.dumps(material, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def ttl_for_window(provider: str, date_window: DateWindow, today: date) -> int:
+    lag_days = PROVIDER_FINALIZATION_LAG_DAYS.get(provider, 3)
+    if date_window.end <= today - timedelta(days=lag_days):
+        return FINAL_TTL_SECONDS
+    return RECENT_TTL_SECONDS
+
+
+class ResponseCache:
+    """Content-addressed JSON response cache with per-entry TTL and LRU eviction by bytes."""
+
+    def __init__(self, root: Path, max_bytes: int) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._size: int | None = None
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        path = self._path(key)
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+        if float(entry.get("expires_at", 0)) <= time.time():
+            self._discard(path)
+            return None
+
+        try:
+            # mtime doubles as the LRU clock.
+            os.utime(path)
+        except OSError:
+            pass
+        response = entry.get("response")
+        return response if isinstance(response, dict) else None
+
+    def put(self, key: str, response: dict[str, Any], ttl_seconds: int) -> None:
+        if self.max_bytes <= 0:
+            return
+
+        payload = json.dumps(
+            {"expires_at": time.time() + ttl_seconds, "response": response},
+            ensure_ascii=False,
+            separators=(",", ":"),
+        ).encode("utf-8")
+        if len(payload) > self.max_bytes:
+            return
+
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        previous_size = path.stat().st_size if path.exists() else 0
+
+        # Responses are raw (pre-sanitization), so keep them owner-readable only.
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(payload)
+            os.chmod(tmp_name, 0o600)
+            os.replace(tmp_name, path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+        with self._lock:
+            if self._size is not None:
+                self._size += len(payload) - previous_size
+        self._evict_if_needed()
+
+    def _entries(self) -> list[tuple[float, int, Path]]:
+        entries: list[tuple[float, int, Path]] = []
+        if not self.root.exists():
+            return entries
+        for path in self.root.glob("*/*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _discard(self, path: Path) -> None:
+        try:
+            size = path.stat().st_size
+            path.unlink()
+        except OSError:
+            return
+        with self._lock:
+            if self._size is not None:
+                self._size -= size
+
+    def _evict_if_needed(self) -> None:
+        with self._lock:
+            if self._size is not None and self._size <= self.max_bytes:
+                return
+
+            entries = self._entries()
+            total = sum(size for _, size, _ in entries)
+            if total > self.max_bytes:
+                for _, size, path in sorted(entries, key=lambda item: item[0]):
+                    try:
+                        path.unlink()
+                    except OSError:
+                        continue
+                    total -= size
+                    if total <= self.max_bytes:
+                        break
+            self._size = total
+
+
+_CACHES: dict[tuple[Path, int], ResponseCache] = {}
+_CACHES_LOCK = threading.Lock()
+
+
+def get_response_cache(config: CollectorConfig) -> ResponseCache:
+    key = (config.cache_dir, config.cache_max_bytes)
+    with _CACHES_LOCK:
+        cache = _CACHES.get(key)
+        if cache is None:
+            cache = ResponseCache(config.cache_dir, config.cache_max_bytes)
+            _CACHES[key] = cache
+        return cache
+
+
+@contextmanager
+def bind_archive(archive: Any) -> Iterator[None]:
+    token = _archive.set(archive)
+    try:
+        yield
+    finally:
+        _archive.reset(token)
+
+
+def carry_archive(fn: Callable[..., T]) -> Callable[..., T]:
+    """Wrap ``fn`` to run on another thread with the calling thread's archive bound."""
+    archive = _archive.get()
+
+    def run(*args: Any, **kwargs: Any) -> T:
+        with bind_archive(archive):
+            return fn(*args, **kwargs)
+
+    return run
+
+
+def replaying() -> bool:
+    """Responses come from an archive (`reprocess`): nothing is fetched and nobody signs in."""
+    return bool(getattr(_archive.get(), "replaying", False))
+
+
+def cached_fetch(
+    config: CollectorConfig,
+    provider: str,
+    date_window: DateWindow,
+    request: dict[str, Any],
+    fetch: Callable[[], dict[str, Any]],
+    cacheable: bool = True,
+    identity: str | None = None,
+) -> dict[str, Any]:
+    """Return the cached response for ``request`` or call ``fetch`` and cache its result.
+
+    ``cacheable=False`` bypasses the response cache (bulk export pages that are never asked
+    for again would evict everything else). ``identity`` is mixed into the cache key only, for
+    responses that depend on who is asking; it is not archived.
+
+    With an archive bound (`bind_archive`) the response is also archived, or, when
+    reprocessing, comes from the archive and ``fetch`` is never called.
+    """
+    archive = _archive.get()
+    if archive is not None and archive.replaying:
+        return archive.get(provider, request, date_window)
+
+    if cacheable:
+        response = _cached_or_fetched(config, provider, date_window, request, fetch, identity)
+    else:
+        response = fetch()
+    if archive is not None:
+        archive.add(request, response)
+    return response
+
+
+def _cached_or_fetched(
+    config: CollectorConfig,
+    provider: str,
+    date_window: DateWindow,
+    request: dict[str, Any],
+    fetch: Callable[[], dict[str, Any]],
+    identity: str | None,
+) -> dict[str, Any]:
+    if not config.cache_enabled:
+        return fetch()
+
+    cache = get_response_cache(config)
+    key = cache_key(provider, request if identity is None else {**request, "identity": identity}, date_window)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    response = fetch()
+    ttl = ttl_for_window(provider, date_window, today_in_timezone(config.collector_timezone))
+    cache.put(key, response, ttl)
+    return response
@@ -1,15 +1,56 @@
 from __future__ import annotations
 
+import csv
+import io
+import json
+import logging
+import signal
+import threading
+from contextlib import contextmanager
+from dataclasses import replace
 from datetime import date
 from pathlib import Path
+from typing import Iterator
 
 import typer
 
+from .archive import ARCHIVE_DIRNAME, archived_days
+from .backfill import BackfillJournal, run_backfill, split_date_range
+from .columnar import check_columnar_format, write_columnar
 from .config import load_config, resolve_date_window
-from .providers import COLLECTORS
-from .sanitize import sanitize_rows
-from .schema import SUPPORTED_PROVIDERS, ProviderName, make_provider_result
-from .storage import build_summary, write_results
+from .daemon import CollectorDaemon, ServeOptions
+from .httpapi import DEFAULT_LISTEN, OutputCache, make_server, start_server
+from .instrument import Profiler, RunTimer
+from .providers import COLLECTORS, available_providers
+from .reprocess import run_reprocess
+from .rollups import GRAINS, read_rollups, rebuild_rollups, update_rollups
+from .runner import (
+    DEFAULT_PROVIDER_TIMEOUT_SECONDS,
+    CollectionAborted,
+    StreamedProvider,
+    collect_from_days,
+    collect_providers,
+    commit_side_outputs,
+    discard_side_outputs,
+    stream_providers,
+)
+from .schema import ProviderName, utc_now
+from .startup import CLI_MODULE, cumulative_ms, measure_imports
+from .storage import (
+    StagedOutputDir,
+    build_summary,
+    check_compression,
+    write_provider_files,
+    write_summary,
+    write_timings,
+)
+from .timeseries import AGGREGATIONS, GROUP_BYS, SeriesKey, TimeSeriesIndex, group_points
+from .warehouse import upsert_results
+
+# Largest page size every provider API accepts in one request (Cloudflare GraphQL groups).
+MAX_ROW_LIMIT = 10_000
+PROFILES_DIRNAME = ".profiles"
+PROFILE_TOP_FUNCTIONS = 25
 
 app = typer.Typer(help="GeoVito metrics collector (local-first, aggregated, privacy-safe)")
 
@@ -17,37 +58,80 @@ app = typer.Typer(help="GeoVito metrics collector (local-first, aggregated, priv
 @app.callback()
 def app_root() -> None:
     """GeoVito metrics collector commands."""
+    package_logger = logging.getLogger("geovito_metrics_collector")
+    if not package_logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("  %(message)s"))
+        package_logger.addHandler(handler)
+        package_logger.setLevel(logging.INFO)
 
 
-def _parse_date(value: str | None) -> date | None:
+def _parse_date(value: str | None, option: str = "--date") -> date | None:
     if not value:
         return None
     try:
         return date.fromisoformat(value)
     except ValueError as exc:
-        raise typer.BadParameter("--date must be in YYYY-MM-DD format") from exc
+        raise typer.BadParameter(f"{option} must be in YYYY-MM-DD format") from exc
+
+
+def _parse_columnar(value: str | None) -> str | None:
+    if value is None:
+        return None
+    try:
+        return check_columnar_format(value.strip().lower())
+    except (RuntimeError, ValueError) as exc:
+        raise typer.BadParameter(str(exc), param_hint="--columnar") from exc
+
+
+def _parse_compression(value: str | None) -> str | None:
+    try:
+        return check_compression(value.strip().lower() if value else None)
+    except (RuntimeError, ValueError) as exc:
+        raise typer.BadParameter(str(exc), param_hint="--compress") from exc
 
 
 def _parse_provider_selection(value: str | None) -> list[ProviderName]:
+    # Builtins in canonical order, then entry-point providers sorted by name.
+    available = available_providers()
     if not value:
-        return list(SUPPORTED_PROVIDERS)
+        return available
 
     requested = [part.strip().lower() for part in value.split(",") if part.strip()]
     if not requested:
-        return list(SUPPORTED_PROVIDERS)
+        return available
 
-    invalid = [name for name in requested if name not in SUPPORTED_PROVIDERS]
+    invalid = [name for name in requested if name not in available]
     if invalid:
         raise typer.BadParameter(f"Unknown provider(s): {', '.join(invalid)}")
 
     # Keep canonical order for deterministic output.
     selected: list[ProviderName] = []
-    for name in SUPPORTED_PROVIDERS:
+    for name in available:
         if name in requested:
             selected.append(name)
     return selected
 
 
+@contextmanager
+def _profiling(enabled: bool, out: Path) -> Iterator[None]:
+    if not enabled:
+        yield
+        return
+    profiler = Profiler()
+    try:
+        with profiler:
+            yield
+    finally:
+        path = out / PROFILES_DIRNAME / f"run-{utc_now().strftime('%Y%m%dT%H%M%SZ')}.pstats"
+        stream = io.StringIO()
+        stats = profiler.save(path)
+        stats.stream = stream
+        stats.sort_stats("cumulative").print_stats(PROFILE_TOP_FUNCTIONS)
+        typer.echo(stream.getvalue(), err=True)
+        typer.echo(f"Saved profile to: {path} (open with python -m pstats)", err=True)
+
+
 @app.command("run")
 def run_command(
     date_value: str | None = typer.Option(None, "--date", help="End date (YYYY-MM-DD). Defaults to today."),
@@ -58,64 +142,510 @@ def run_command(
     json_pretty: bool = typer.Option(False, "--json-pretty", help="Pretty-print output JSON files."),
     fail_soft: bool = typer.Option(False, "--fail-soft", help="Continue when provider errors occur."),
     env_file: str | None = typer.Option(None, "--env-file", help="Optional .env path for collector config."),
+    cache: bool = typer.Option(True, "--cache/--no-cache", help="Reuse cached provider API responses."),
+    full_export: bool = typer.Option(
+        False, "--full-export", help="Also stream complete page/query row exports next to the JSON files."
+    ),
+    provider_timeout: float = typer.Option(
+        DEFAULT_PROVIDER_TIMEOUT_SECONDS,
+        "--provider-timeout",
+        min=0,
+        help="Per-provider wall-clock deadline in seconds (0 disables).",
+    ),
+    columnar: str | None = typer.Option(
+        None, "--columnar", help="Also write rows and metrics as a columnar dataset: parquet or arrow."
+    ),
+    warehouse: Path | None = typer.Option(
+        None, "--warehouse", help="Also upsert results into this SQLite metrics warehouse."
+    ),
+    day_store: bool = typer.Option(
+        False, "--day-store", help="Compose windows from stored single-day results, fetching only missing or non-final days."
+    ),
+    compress: str | None = typer.Option(
+        None, "--compress", help="Compress provider JSON files: gzip or zstd (summary.json stays plain)."
+    ),
+    row_limit: int = typer.Option(
+        50, "--row-limit", min=1, max=MAX_ROW_LIMIT, help="Maximum rows kept per provider JSON file."
+    ),
+    profile: bool = typer.Option(
+        False, "--profile", help="Save cProfile stats of the run under <out>/.profiles and trace memory peaks."
+    ),
+    archive: bool = typer.Option(
+        False, "--archive", help="Also keep the raw API responses under <out>/archive for `reprocess`."
+    ),
 ) -> None:
     """Collect provider metrics and write versioned JSON files."""
-    config = load_config(env_file=env_file)
+    if day_store and (dry_run or full_export or archive):
+        raise typer.BadParameter("--day-store cannot be combined with --dry-run, --full-export or --archive")
+    config = replace(
+        load_config(env_file=env_file),
+        cache_enabled=cache,
+        export_root=out if full_export and not dry_run else None,
+        archive_root=out if archive and not dry_run else None,
+    )
     date_window = resolve_date_window(_parse_date(date_value), days=days, timezone_name=config.collector_timezone)
     selected_providers = _parse_provider_selection(providers)
+    columnar_format = _parse_columnar(columnar)
+    compression = _parse_compression(compress)
 
-    typer.echo(
-        f"Collecting metrics for {date_window.start.isoformat()}..{date_window.end.isoformat()} "
-        f"providers={','.join(selected_providers)} dry_run={dry_run}"
-    )
-
-    provider_results = []
-    fatal_errors = []
+    timer = RunTimer()
+    with _profiling(profile, out):
+        typer.echo(
+            f"Collecting metrics for {date_window.start.isoformat()}..{date_window.end.isoformat()} "
+            f"providers={','.join(selected_providers)} dry_run={dry_run}"
+        )
 
-    for provider in selected_providers:
-        collector = COLLECTORS[provider]
-        typer.echo(f"- {provider}: start")
+        output_dir = out / date_window.end.isoformat()
+        staged: StagedOutputDir | None = None
+        streamed: list[StreamedProvider] = []
         try:
-            result = collector(config, date_window, 50)
-            result.rows = sanitize_rows(result.rows, limit=50)
-            provider_results.append(result)
-            if result.errors:
-                typer.echo(f"  {provider}: warnings/errors -> {', '.join(result.errors)}")
+            if dry_run:
+                provider_results = collect_providers(
+                    config,
+                    date_window,
+                    selected_providers,
+                    row_limit=row_limit,
+                    fail_soft=fail_soft,
+                    timeout=provider_timeout,
+                    echo=typer.echo,
+                    timer=timer,
+                )
+                row_counts = None
+            elif day_store:
+                composed = collect_from_days(
+                    config,
+                    date_window,
+                    selected_providers,
+                    out,
+                    row_limit=row_limit,
+                    fail_soft=fail_soft,
+                    timeout=provider_timeout,
+                    echo=typer.echo,
+                    timer=timer,
+                )
+                provider_results = composed.results
+                row_counts = None
             else:
-                typer.echo(f"  {provider}: ok ({len(result.rows)} rows)")
-        except Exception as exc:  # noqa: BLE001
-            message = str(exc) or exc.__class__.__name__
-            if fail_soft:
-                typer.echo(f"  {provider}: failed (fail-soft) -> {message}")
-                provider_results.append(
-                    make_provider_result(
-                        provider=provider,
-                        start=date_window.start,
-                        end=date_window.end,
-                        notes=["provider execution failed"],
-                        errors=[message],
-                    )
+                # Rows go straight from each collector through the sanitizer into its provider file,
+                # inside a staging directory that replaces the date directory in one rename.
+                staged = StagedOutputDir(out, date_window.end)
+                streamed = stream_providers(
+                    config,
+                    date_window,
+                    selected_providers,
+                    staged.path,
+                    row_limit=row_limit,
+                    fail_soft=fail_soft,
+                    timeout=provider_timeout,
+                    pretty=json_pretty,
+                    columnar_format=columnar_format,
+                    warehouse_path=warehouse,
+                    compression=compression,
+                    echo=typer.echo,
+                    timer=timer,
                 )
-                continue
+                provider_results = [item.result for item in streamed]
+                row_counts = {item.result.provider: item.row_count for item in streamed}
+        except CollectionAborted as exc:
+            if staged is not None:
+                staged.discard()
+            typer.echo("Collection aborted:", err=True)
+            for err in exc.errors:
+                typer.echo(f"  - {err}", err=True)
+            raise typer.Exit(code=1) from exc
+
+        summary = build_summary(provider_results, row_counts=row_counts)
+
+        if dry_run:
+            typer.echo("Dry-run summary:")
+            typer.echo(summary.model_dump_json(indent=2, exclude_none=True))
+            return
+
+        if staged is None:
+            # Day-store results are composed in memory; they are staged here instead of streamed.
+            staged = StagedOutputDir(out, date_window.end)
+        try:
+            with timer.stage("write"):
+                if day_store:
+                    write_provider_files(staged.path, provider_results, pretty=json_pretty, compression=compression)
+                write_summary(staged.path, summary, pretty=json_pretty)
+            # timings.json is swapped in together with the files it describes.
+            write_timings(staged.path, timer.to_json(selected_providers), pretty=json_pretty)
+            staged.commit()
+        except BaseException:
+            staged.discard()
+            discard_side_outputs(streamed)
+            raise
+        # Columnar files and the warehouse only ever follow a date directory that is in place.
+        commit_side_outputs(streamed)
+        if day_store and columnar_format is not None:
+            write_columnar(out, date_window.end, provider_results, columnar_format)
+        if day_store and warehouse is not None:
+            upsert_results(warehouse, provider_results)
+        for fetched_day in composed.fetched_days if day_store else []:
+            update_rollups(out, fetched_day)
+        update_rollups(out, date_window.end)
+        typer.echo(f"Wrote metrics to: {output_dir}")
+
+
+@app.command("backfill")
+def backfill_command(
+    from_value: str = typer.Option(..., "--from", help="First end date to backfill (YYYY-MM-DD)."),
+    to_value: str = typer.Option(..., "--to", help="Last end date to backfill (YYYY-MM-DD)."),
+    days: int = typer.Option(7, "--days", min=1, help="Inclusive lookback window per day, as in `run`."),
+    out: Path = typer.Option(Path("../../data/metrics"), "--out", help="Output root directory."),
+    providers: str | None = typer.Option(None, "--providers", help="Comma-separated providers."),
+    workers: int = typer.Option(4, "--workers", min=1, help="Number of days collected in parallel."),
+    json_pretty: bool = typer.Option(False, "--json-pretty", help="Pretty-print output JSON files."),
+    fail_soft: bool = typer.Option(False, "--fail-soft", help="Continue when provider errors occur."),
+    restart: bool = typer.Option(False, "--restart", help="Ignore the checkpoint journal and redo every day."),
+    env_file: str | None = typer.Option(None, "--env-file", help="Optional .env path for collector config."),
+    cache: bool = typer.Option(True, "--cache/--no-cache", help="Reuse cached provider API responses."),
+    full_export: bool = typer.Option(
+        False, "--full-export", help="Also stream complete page/query row exports next to the JSON files."
+    ),
+    provider_timeout: float = typer.Option(
+        DEFAULT_PROVIDER_TIMEOUT_SECONDS,
+        "--provider-timeout",
+        min=0,
+        help="Per-provider wall-clock deadline in seconds (0 disables).",
+    ),
+    columnar: str | None = typer.Option(
+        None, "--columnar", help="Also write rows and metrics as a columnar dataset: parquet or arrow."
+    ),
+    warehouse: Path | None = typer.Option(
+        None, "--warehouse", help="Also upsert results into this SQLite metrics warehouse."
+    ),
+    day_store: bool = typer.Option(
+        False, "--day-store", help="Compose windows from stored single-day results, fetching only missing or non-final days."
+    ),
+    compress: str | None = typer.Option(
+        None, "--compress", help="Compress provider JSON files: gzip or zstd (summary.json stays plain)."
+    ),
+    archive: bool = typer.Option(
+        False, "--archive", help="Also keep the raw API responses under <out>/archive for `reprocess`."
+    ),
+) -> None:
+    """Collect and write one metrics directory per day, resuming from the checkpoint journal."""
+    if day_store and (full_export or archive):
+        raise typer.BadParameter("--full-export and --archive cannot be combined with --day-store")
+    config = replace(
+        load_config(env_file=env_file),
+        cache_enabled=cache,
+        export_root=out if full_export else None,
+        archive_root=out if archive else None,
+    )
+    start = _parse_date(from_value, "--from")
+    end = _parse_date(to_value, "--to")
+    try:
+        windows = split_date_range(start, end, days=days, timezone_name=config.collector_timezone)
+    except ValueError as exc:
+        raise typer.BadParameter(str(exc)) from exc
+    selected_providers = _parse_provider_selection(providers)
+    columnar_format = _parse_columnar(columnar)
+    compression = _parse_compression(compress)
+
+    journal = BackfillJournal.for_output(out)
+    if restart:
+        journal.reset()
+
+    typer.echo(
+        f"Backfilling {start.isoformat()}..{end.isoformat()} ({len(windows)} days, window={days}d) "
+        f"providers={','.join(selected_providers)} workers={workers}"
+    )
+
+    report = run_backfill(
+        config,
+        windows,
+        selected_providers,
+        out_root=out,
+        journal=journal,
+        workers=workers,
+        fail_soft=fail_soft,
+        timeout=provider_timeout,
+        pretty=json_pretty,
+        columnar_format=columnar_format,
+        warehouse_path=warehouse,
+        day_store=day_store,
+        compression=compression,
+        echo=typer.echo,
+    )
+
+    typer.echo(
+        f"Backfill finished: written={len(report.written)} skipped={len(report.skipped)} "
+        f"failed={len(report.failed)} not_started={len(report.not_started)}"
+    )
+    if report.failed:
+        typer.echo("Backfill aborted (re-run the same command to resume):", err=True)
+        for day in sorted(report.failed):
+            for err in report.failed[day]:
+                typer.echo(f"  - {day.isoformat()} {err}", err=True)
+        raise typer.Exit(code=1)
 
-            fatal_errors.append(f"{provider}: {message}")
-            break
 
-    if fatal_errors:
-        typer.echo("Collection aborted:", err=True)
-        for err in fatal_errors:
-            typer.echo(f"  - {err}", err=True)
+@app.command("reprocess")
+def reprocess_command(
+    from_value: str = typer.Option(..., "--from", help="First date directory to rebuild (YYYY-MM-DD)."),
+    to_value: str = typer.Option(..., "--to", help="Last date directory to rebuild (YYYY-MM-DD)."),
+    out: Path = typer.Option(Path("../../data/metrics"), "--out", help="Output root directory."),
+    providers: str | None = typer.Option(None, "--providers", help="Comma-separated providers (default: all archived)."),
+    workers: int = typer.Option(0, "--workers", min=0, help="Worker processes (0: one per CPU core)."),
+    json_pretty: bool = typer.Option(False, "--json-pretty", help="Pretty-print output JSON files."),
+    compress: str | None = typer.Option(
+        None, "--compress", help="Compress provider JSON files: gzip or zstd (summary.json stays plain)."
+    ),
+    warehouse: Path | None = typer.Option(
+        None, "--warehouse", help="Also upsert the rebuilt results into this SQLite metrics warehouse."
+    ),
+) -> None:
+    """Rebuild provider JSON and summary.json from archived raw responses, without calling any API."""
+    start = _parse_date(from_value, "--from")
+    end = _parse_date(to_value, "--to")
+    if start > end:
+        raise typer.BadParameter("--from must be on or before --to")
+    selected_providers = _parse_provider_selection(providers) if providers else None
+    compression = _parse_compression(compress)
+    days = [day for day in archived_days(out) if start <= day <= end]
+    if not days:
+        typer.echo(f"No archived runs under {out / ARCHIVE_DIRNAME} for {start.isoformat()}..{end.isoformat()}")
+        return
+
+    typer.echo(f"Reprocessing {len(days)} archived days {days[0].isoformat()}..{days[-1].isoformat()}")
+    report = run_reprocess(
+        out,
+        days,
+        providers=selected_providers,
+        workers=workers or None,
+        pretty=json_pretty,
+        compression=compression,
+        warehouse_path=warehouse,
+        echo=typer.echo,
+    )
+    typer.echo(f"Reprocess finished: written={len(report.written)} failed={len(report.failed)}")
+    if report.failed:
         raise typer.Exit(code=1)
 
-    summary = build_summary(provider_results)
 
-    if dry_run:
-        typer.echo("Dry-run summary:")
-        typer.echo(summary.model_dump_json(indent=2, exclude_none=True))
+@app.command("startup-benchmark")
+def startup_benchmark_command(
+    providers: str | None = typer.Option(None, "--providers", help="Comma-separated providers to measure."),
+    top: int = typer.Option(10, "--top", min=0, help="Show the N slowest modules imported by the CLI."),
+    max_ms: float = typer.Option(0.0, "--max-ms", min=0, help="Exit 1 if CLI startup imports exceed this (0 disables)."),
+) -> None:
+    """Report import time of the CLI and of each provider module (python -X importtime)."""
+    selected_providers = _parse_provider_selection(providers)
+
+    cli_timings = measure_imports([CLI_MODULE])
+    cli_ms = cumulative_ms(cli_timings, CLI_MODULE)
+    typer.echo(f"cli startup imports: {cli_ms:.1f} ms ({CLI_MODULE})")
+
+    # Self time is what each module costs on its own; cumulative includes what it pulls in.
+    heaviest = sorted(cli_timings, key=lambda item: -item.self_us)
+    for timing in heaviest[:top]:
+        typer.echo(f"  {timing.self_us / 1000.0:8.1f} ms self {timing.cumulative_us / 1000.0:8.1f} ms cumulative  {timing.module}")
+
+    for provider in selected_providers:
+        module = COLLECTORS.module_name(provider)
+        if module is None:
+            typer.echo(f"provider {provider}: registered in-process, nothing to import")
+            continue
+        timings = measure_imports([CLI_MODULE, module])
+        typer.echo(f"provider {provider}: +{cumulative_ms(timings, module):.1f} ms ({module})")
+
+    if max_ms and cli_ms > max_ms:
+        typer.echo(f"CLI startup imports took {cli_ms:.1f} ms, over the {max_ms:.1f} ms budget", err=True)
+        raise typer.Exit(code=1)
+
+
+@app.command("query")
+def query_command(
+    metric: str = typer.Option(..., "--metric", help="Metric name, e.g. sessions or clicks."),
+    provider: str | None = typer.Option(None, "--provider", help="Comma-separated providers (default: all)."),
+    path: str = typer.Option("", "--path", help="Site path for per-page series; empty for provider totals."),
+    from_value: str | None = typer.Option(None, "--from", help="First end date (YYYY-MM-DD)."),
+    to_value: str | None = typer.Option(None, "--to", help="Last end date (YYYY-MM-DD)."),
+    group_by: str = typer.Option("day", "--group-by", help="Group points by day or ISO week."),
+    days: int = typer.Option(7, "--days", min=1, help="Window length of the stored runs to read."),
+    agg: str | None = typer.Option(
+        None, "--agg", help="sum, mean, min, max or last. Default: sum for --days 1, else last (windows overlap)."
+    ),
+    output_format: str = typer.Option("json", "--format", help="json or csv."),
+    out: Path = typer.Option(Path("../../data/metrics"), "--out", help="Output root directory."),
+    rebuild: bool = typer.Option(False, "--rebuild", help="Rebuild the time-series index before querying."),
+) -> None:
+    """Query a metric over stored runs through the memory-mapped time-series index."""
+    start = _parse_date(from_value, "--from")
+    end = _parse_date(to_value, "--to")
+    if start and end and start > end:
+        raise typer.BadParameter("--from must be on or before --to")
+    if group_by not in GROUP_BYS:
+        raise typer.BadParameter(f"--group-by must be one of: {', '.join(GROUP_BYS)}")
+    aggregation = agg or ("sum" if days == 1 else "last")
+    if aggregation not in AGGREGATIONS:
+        raise typer.BadParameter(f"--agg must be one of: {', '.join(AGGREGATIONS)}")
+    if output_format not in ("json", "csv"):
+        raise typer.BadParameter("--format must be json or csv")
+
+    index = TimeSeriesIndex(out)
+    if rebuild:
+        index.build()
+    else:
+        index.ensure_current()
+
+    requested = [part.strip().lower() for part in (provider or "").split(",") if part.strip()]
+    providers = sorted(
+        {key.provider for key in index.series_keys() if key.days == days and (not requested or key.provider in requested)}
+    )
+    records: list[dict[str, object]] = []
+    for name in providers:
+        points = index.points(SeriesKey(name, days, metric, path), start, end)
+        for period, value in group_points(points, group_by, aggregation):
+            records.append({"provider": name, "period": period, "value": value})
+    index.close()
+
+    if output_format == "csv":
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=["provider", "period", "value"], lineterminator="\n")
+        writer.writeheader()
+        writer.writerows(records)
+        typer.echo(buffer.getvalue(), nl=False)
+    else:
+        payload = {"metric": metric, "path": path, "days": days, "group_by": group_by, "agg": aggregation}
+        typer.echo(json.dumps({**payload, "points": records}, indent=2))
+
+
+@app.command("rollups")
+def rollups_command(
+    grain: str = typer.Option("month", "--grain", help="week, month or quarter."),
+    from_value: str | None = typer.Option(None, "--from", help="First date to include (YYYY-MM-DD)."),
+    to_value: str | None = typer.Option(None, "--to", help="Last date to include (YYYY-MM-DD)."),
+    top: int = typer.Option(10, "--top", min=0, help="Top rows per provider and row kind."),
+    out: Path = typer.Option(Path("../../data/metrics"), "--out", help="Output root directory."),
+    rebuild: bool = typer.Option(False, "--rebuild", help="Recompute every rollup from the stored days first."),
+) -> None:
+    """Print calendar rollups of the summary KPIs and top rows as JSON.
+
+    Only single-day runs (`--days 1`) and `--day-store` days feed the rollups; the default
+    7-day `run` and `backfill` windows add nothing.
+    """
+    if grain not in GRAINS:
+        raise typer.BadParameter(f"--grain must be one of: {', '.join(GRAINS)}")
+    start = _parse_date(from_value, "--from")
+    end = _parse_date(to_value, "--to")
+    if rebuild:
+        used = rebuild_rollups(out)
+        typer.echo(f"Rebuilt rollups from {used} single-day runs", err=True)
+    typer.echo(json.dumps(read_rollups(out, grain, start, end, top=top), ensure_ascii=False, indent=2))
+
+
+@app.command("serve")
+def serve_command(
+    out: Path = typer.Option(Path("../../data/metrics"), "--out", help="Output root directory."),
+    days: int = typer.Option(7, "--days", min=1, help="Inclusive lookback window in days, as in `run`."),
+    schedule: str | None = typer.Option(
+        None,
+        "--schedule",
+        help="Provider intervals, e.g. cloudflare=1h,gsc=1d (default: COLLECTOR_SCHEDULE, else cloudflare=1h, others 1d).",
+    ),
+    env_file: str | None = typer.Option(None, "--env-file", help="Optional .env path; reloaded when it changes."),
+    fail_soft: bool = typer.Option(True, "--fail-soft/--fail-hard", help="Write partial results when a provider fails."),
+    json_pretty: bool = typer.Option(False, "--json-pretty", help="Pretty-print output JSON files."),
+    provider_timeout: float = typer.Option(
+        DEFAULT_PROVIDER_TIMEOUT_SECONDS,
+        "--provider-timeout",
+        min=0,
+        help="Per-provider wall-clock deadline in seconds (0 disables).",
+    ),
+    warehouse: Path | None = typer.Option(
+        None, "--warehouse", help="Also upsert results into this SQLite metrics warehouse."
+    ),
+    day_store: bool = typer.Option(
+        False, "--day-store", help="Compose windows from stored single-day results, fetching only missing or non-final days."
+    ),
+    compress: str | None = typer.Option(
+        None, "--compress", help="Compress provider JSON files: gzip or zstd (summary.json stays plain)."
+    ),
+    row_limit: int = typer.Option(
+        50, "--row-limit", min=1, max=MAX_ROW_LIMIT, help="Maximum rows kept per provider JSON file."
+    ),
+    once: bool = typer.Option(False, "--once", help="Run every scheduled provider once, then exit."),
+    http: str | None = typer.Option(
+        None, "--http", help=f"Also serve the latest results over HTTP on HOST:PORT (e.g. {DEFAULT_LISTEN})."
+    ),
+    archive: bool = typer.Option(
+        False, "--archive", help="Also keep the raw API responses under <out>/archive for `reprocess`."
+    ),
+) -> None:
+    """Stay running and collect each provider on its own schedule, keeping credentials and connections warm."""
+    if day_store and archive:
+        raise typer.BadParameter("--archive cannot be combined with --day-store")
+    options = ServeOptions(
+        out=out,
+        days=days,
+        row_limit=row_limit,
+        fail_soft=fail_soft,
+        timeout=provider_timeout,
+        pretty=json_pretty,
+        compression=_parse_compression(compress),
+        warehouse_path=warehouse,
+        day_store=day_store,
+        schedule=schedule,
+        archive=archive,
+    )
+    cache = OutputCache(out)
+    daemon = CollectorDaemon(options, env_file=env_file, echo=typer.echo, on_written=cache.invalidate)
+    try:
+        daemon.reload()
+        server = _make_http_server(out, http, cache) if http and not once else None
+    except (RuntimeError, ValueError) as exc:
+        raise typer.BadParameter(str(exc)) from exc
+
+    if once:
+        if daemon.collect(list(daemon.intervals)) is None:
+            raise typer.Exit(code=1)
         return
 
-    output_dir = write_results(out_root=out, target_date=date_window.end, provider_results=provider_results, summary=summary, pretty=json_pretty)
-    typer.echo(f"Wrote metrics to: {output_dir}")
+    stop = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop.set())
+    schedule_text = ",".join(f"{name}={seconds:g}s" for name, seconds in daemon.intervals.items())
+    typer.echo(f"Serving; schedule={schedule_text} out={out}")
+    if server is not None:
+        start_server(server)
+        typer.echo(f"HTTP on http://{http}/summary and /metrics")
+    try:
+        daemon.serve(stop)
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+    typer.echo(f"Stopped after {daemon.runs} runs")
+
+
+def _make_http_server(out: Path, listen: str, cache: OutputCache | None = None):
+    try:
+        return make_server(out, listen, cache)
+    except OSError as exc:
+        raise RuntimeError(f"Cannot listen on {listen}: {exc}") from exc
+
+
+@app.command("http")
+def http_command(
+    out: Path = typer.Option(Path("../../data/metrics"), "--out", help="Output root directory."),
+    listen: str = typer.Option(DEFAULT_LISTEN, "--listen", help="HOST:PORT to bind (keep it on localhost)."),
+) -> None:
+    """Serve the latest summary, provider results and Prometheus KPIs from memory."""
+    try:
+        server = _make_http_server(out, listen)
+    except (RuntimeError, ValueError) as exc:
+        raise typer.BadParameter(str(exc), param_hint="--listen") from exc
+    typer.echo(f"Serving {out} on http://{listen}/ (summary, providers/<name>, metrics, days)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
 
 
 if __name__ == "__main__":
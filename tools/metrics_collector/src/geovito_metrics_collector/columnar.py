@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import os
+import tempfile
+from datetime import date
+from pathlib import Path
+from typing import Any
+
+from .schema import ProviderResult
+
+COLUMNAR_FORMATS = ("parquet", "arrow")
+COLUMNAR_DIRNAME = "columnar"
+
+# Typed columns written for every provider (null where a provider has no such field), so a
+# dataset scan across providers and dates sees one stable schema.
+STRING_COLUMNS = ("kind", "value", "page", "path", "property", "status_group", "date")
+FLOAT_COLUMNS = (
+    "sessions",
+    "pageviews",
+    "activeUsers",
+    "screenPageViews",
+    "clicks",
+    "impressions",
+    "ctr",
+    "position",
+    "requests",
+    "bytes",
+    "estimatedEarnings",
+    "pageViewsRpm",
+)
+
+
+def _pyarrow() -> Any:
+    try:
+        import pyarrow
+    except ImportError as exc:
+        raise RuntimeError(
+            "Columnar output needs pyarrow: pip install 'geovito-metrics-collector[columnar]'"
+        ) from exc
+    return pyarrow
+
+
+def check_columnar_format(value: str) -> str:
+    if value not in COLUMNAR_FORMATS:
+        raise ValueError(f"Unsupported columnar format {value!r} (expected one of: {', '.join(COLUMNAR_FORMATS)})")
+    _pyarrow()
+    return value
+
+
+def partition_path(out_root: Path, table: str, provider: str, target_date: date, fmt: str) -> Path:
+    """``<out>/columnar/<table>/provider=<p>/end_date=<YYYY-MM-DD>/part-0.<fmt>`` (Hive layout).
+
+    The date key is ``end_date`` (the window end, like the JSON directory name) because AdSense
+    rows already carry a ``date`` column.
+    """
+    return (
+        out_root
+        / COLUMNAR_DIRNAME
+        / table
+        / f"provider={provider}"
+        / f"end_date={target_date.isoformat()}"
+        / f"part-0.{fmt}"
+    )
+
+
+def partition_formats(out_root: Path, provider: str, target_date: date) -> list[str]:
+    """Formats in which ``provider``'s rows or metrics for ``target_date`` were already written."""
+    return [
+        fmt
+        for fmt in COLUMNAR_FORMATS
+        if any(partition_path(out_root, table, provider, target_date, fmt).exists() for table in ("rows", "metrics"))
+    ]
+
+
+def _column_type(pa: Any, name: str) -> Any:
+    if name in FLOAT_COLUMNS:
+        return pa.float64()
+    if name in STRING_COLUMNS:
+        return pa.string()
+    return None
+
+
+def _column(pa: Any, name: str, values: list[Any]) -> Any:
+    column_type = _column_type(pa, name)
+    if column_type is not None:
+        return pa.array(values, type=column_type)
+    try:
+        return pa.array(values)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Mixed value types in a provider-specific column: keep it readable as text.
+        return pa.array([None if value is None else str(value) for value in values], type=pa.string())
+
+
+def rows_table(rows: list[dict[str, Any]]) -> Any:
+    pa = _pyarrow()
+    names = sorted({key for row in rows for key in row}.union(STRING_COLUMNS, FLOAT_COLUMNS))
+    return pa.table({name: _column(pa, name, [row.get(name) for row in rows]) for name in names})
+
+
+def _with_window(table: Any, result: ProviderResult) -> Any:
+    pa = _pyarrow()
+    return table.append_column("window_start", pa.array([result.date_range.start] * table.num_rows, type=pa.date32()))
+
+
+def metrics_table(result: ProviderResult) -> Any:
+    pa = _pyarrow()
+    names = sorted(result.metrics)
+    return pa.table(
+        {
+            "metric": pa.array(names, type=pa.string()),
+            "value": pa.array([float(result.metrics[name]) for name in names], type=pa.float64()),
+            "window_start": pa.array([result.date_range.start] * len(names), type=pa.date32()),
+            "generated_at": pa.array([result.generated_at] * len(names), type=pa.timestamp("us", tz="UTC")),
+        }
+    )
+
+
+def _write_table(table: Any, path: Path, fmt: str) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    os.close(fd)
+    try:
+        if fmt == "parquet":
+            import pyarrow.parquet as pq
+
+            pq.write_table(table, tmp_name, compression="zstd")
+        else:
+            import pyarrow.feather as feather
+
+            feather.write_feather(table, tmp_name, compression="zstd")
+        os.chmod(tmp_name, 0o644)
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+    return path
+
+
+class ColumnarResultWriter:
+    """Row sink writing a provider's rows and metrics as Parquet/Arrow partitions.
+
+    Batches are converted to Arrow tables as they arrive (far smaller than the row dicts) and
+    written as one file per partition on `commit`, after the JSON files are complete.
+    """
+
+    def __init__(self, out_root: Path, provider: str, target_date: date, fmt: str) -> None:
+        self.out_root = out_root
+        self.provider = provider
+        self.target_date = target_date
+        self.fmt = check_columnar_format(fmt)
+        self.row_count = 0
+        self._tables: list[Any] = []
+        self._result: ProviderResult | None = None
+
+    def write_rows(self, rows: list[dict[str, Any]]) -> None:
+        if rows:
+            self._tables.append(rows_table(rows))
+            self.row_count += len(rows)
+
+    def finish(self, result: ProviderResult) -> None:
+        self._result = result
+
+    def commit(self) -> list[Path]:
+        result = self._result
+        if result is None:
+            return []
+        pa = _pyarrow()
+        # "permissive" unifies batches whose inferred provider-specific columns differ (int/float, missing).
+        rows = pa.concat_tables(self._tables, promote_options="permissive") if self._tables else rows_table([])
+        written = [
+            _write_table(
+                _with_window(rows, result),
+                partition_path(self.out_root, "rows", self.provider, self.target_date, self.fmt),
+                self.fmt,
+            ),
+            _write_table(
+                metrics_table(result),
+                partition_path(self.out_root, "metrics", self.provider, self.target_date, self.fmt),
+                self.fmt,
+            ),
+        ]
+        self.discard()
+        return written
+
+    def discard(self) -> None:
+        self._tables = []
+        self._result = None
+
+
+def write_columnar(out_root: Path, target_date: date, provider_results: list[ProviderResult], fmt: str) -> list[Path]:
+    """Columnar counterpart of `write_results` for results that hold their rows in memory."""
+    written: list[Path] = []
+    for result in provider_results:
+        writer = ColumnarResultWriter(out_root, result.provider, target_date, fmt)
+        writer.write_rows(result.rows)
+        writer.finish(result)
+        written.extend(writer.commit())
+    return written
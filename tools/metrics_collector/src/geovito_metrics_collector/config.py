@@ -4,18 +4,26 @@ import os
 from dataclasses import dataclass
 from datetime import date, datetime, timedelta
 from pathlib import Path
-from typing import Iterable
 from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 from dotenv import load_dotenv
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
 
 GOOGLE_SCOPE_GA4 = "https://www.googleapis.com/auth/analytics.readonly"
 GOOGLE_SCOPE_GSC = "https://www.googleapis.com/auth/webmasters.readonly"
 GOOGLE_SCOPE_ADSENSE = "https://www.googleapis.com/auth/adsense.readonly"
 
+# Days after which a provider's numbers stop changing (GSC lags 2-3 days, AdSense revises earnings).
+PROVIDER_FINALIZATION_LAG_DAYS: dict[str, int] = {
+    "ga4": 2,
+    "gsc": 3,
+    "cloudflare": 1,
+    "adsense": 3,
+}
+
+DEFAULT_CACHE_DIR = "~/.cache/geovito/metrics-http"
+DEFAULT_DISCOVERY_CACHE_DIR = "~/.cache/geovito/google-discovery"
+DEFAULT_CACHE_MAX_MB = 256
+
 
 @dataclass(frozen=True)
 class DateWindow:
@@ -34,6 +42,18 @@ class CollectorConfig:
     cloudflare_zone_id: str | None
     adsense_account: str | None
     collector_timezone: str
+    gsc_combined_dimensions: bool = False
+    google_discovery_mode: str = "cache"
+    google_discovery_cache_dir: Path = Path(DEFAULT_DISCOVERY_CACHE_DIR).expanduser()
+    cache_enabled: bool = True
+    cache_dir: Path = Path(DEFAULT_CACHE_DIR).expanduser()
+    cache_max_bytes: int = DEFAULT_CACHE_MAX_MB * 1024 * 1024
+    # Set by `--full-export`: providers stream complete row exports below <export_root>/<end date>/.
+    export_root: Path | None = None
+    # Sends every provider request to this server instead of the real APIs (offline benchmarks, tests).
+    api_base_url: str | None = None
+    # Set by `--archive`: raw responses are kept below <archive_root>/archive/<end date>/ (see `archive`).
+    archive_root: Path | None = None
 
 
 def _clean(value: str | None) -> str | None:
@@ -43,6 +63,23 @@ def _clean(value: str | None) -> str | None:
     return stripped or None
 
 
+def _bool_env(name: str, default: bool = False) -> bool:
+    raw = _clean(os.getenv(name))
+    if raw is None:
+        return default
+    return raw.lower() in {"1", "true", "yes", "on"}
+
+
+def _int_env(name: str, default: int) -> int:
+    raw = _clean(os.getenv(name))
+    if raw is None:
+        return default
+    try:
+        return int(raw)
+    except ValueError as exc:
+        raise RuntimeError(f"{name} must be an integer") from exc
+
+
 def load_config(env_file: str | None = None) -> CollectorConfig:
     if env_file:
         load_dotenv(env_file, override=False)
@@ -51,6 +88,11 @@ def load_config(env_file: str | None = None) -> CollectorConfig:
 
     secret_file_raw = _clean(os.getenv("GOOGLE_OAUTH_CLIENT_SECRET_FILE"))
     token_cache_raw = _clean(os.getenv("GOOGLE_TOKEN_CACHE")) or "~/.config/geovito/tokens.json"
+    cache_dir_raw = _clean(os.getenv("COLLECTOR_CACHE_DIR")) or DEFAULT_CACHE_DIR
+    discovery_mode = (_clean(os.getenv("GOOGLE_DISCOVERY_MODE")) or "cache").lower()
+    if discovery_mode not in {"cache", "static", "network"}:
+        raise RuntimeError("GOOGLE_DISCOVERY_MODE must be one of: cache, static, network")
+    discovery_dir_raw = _clean(os.getenv("GOOGLE_DISCOVERY_CACHE_DIR")) or DEFAULT_DISCOVERY_CACHE_DIR
 
     return CollectorConfig(
         ga4_property_id=_clean(os.getenv("GA4_PROPERTY_ID")),
@@ -62,47 +104,25 @@ def load_config(env_file: str | None = None) -> CollectorConfig:
         cloudflare_zone_id=_clean(os.getenv("CLOUDFLARE_ZONE_ID")),
         adsense_account=_clean(os.getenv("ADSENSE_ACCOUNT")),
         collector_timezone=_clean(os.getenv("COLLECTOR_TIMEZONE")) or "Europe/Istanbul",
+        gsc_combined_dimensions=_bool_env("GSC_COMBINED_DIMENSIONS"),
+        google_discovery_mode=discovery_mode,
+        google_discovery_cache_dir=Path(discovery_dir_raw).expanduser(),
+        cache_dir=Path(cache_dir_raw).expanduser(),
+        cache_max_bytes=max(0, _int_env("COLLECTOR_CACHE_MAX_MB", DEFAULT_CACHE_MAX_MB)) * 1024 * 1024,
+        api_base_url=_clean(os.getenv("COLLECTOR_API_BASE_URL")),
     )
 
 
+def today_in_timezone(timezone_name: str) -> date:
+    try:
+        return datetime.now(ZoneInfo(timezone_name)).date()
+    except ZoneInfoNotFoundError:
+        return datetime.utcnow().date()
+
+
 def resolve_date_window(end_date: date | None, days: int, timezone_name: str = "UTC") -> DateWindow:
     if days <= 0:
         raise ValueError("days must be >= 1")
-    if end_date:
-        end = end_date
-    else:
-        try:
-            end = datetime.now(ZoneInfo(timezone_name)).date()
-        except ZoneInfoNotFoundError:
-            end = datetime.utcnow().date()
+    end = end_date or today_in_timezone(timezone_name)
     start = end - timedelta(days=days - 1)
     return DateWindow(start=start, end=end)
-
-
-def get_google_credentials(config: CollectorConfig, scopes: Iterable[str]) -> Credentials:
-    scope_list = sorted(set(scopes))
-
-    if not config.google_oauth_client_secret_file:
-        raise RuntimeError("GOOGLE_OAUTH_CLIENT_SECRET_FILE is not configured")
-    if not config.google_oauth_client_secret_file.exists():
-        raise RuntimeError(f"Google OAuth client secret file not found: {config.google_oauth_client_secret_file}")
-
-    cache_path = config.google_token_cache
-    cache_path.parent.mkdir(parents=True, exist_ok=True)
-
-    creds: Credentials | None = None
-    if cache_path.exists():
-        try:
-            creds = Credentials.from_authorized_user_file(str(cache_path), scopes=scope_list)
-        except Exception:
-            creds = None
-
-    if creds and creds.expired and creds.refresh_token:
-        creds.refresh(Request())
-
-    if not creds or not creds.valid or not set(scope_list).issubset(set(creds.scopes or [])):
-        flow = InstalledAppFlow.from_client_secrets_file(str(config.google_oauth_client_secret_file), scopes=scope_list)
-        creds = flow.run_local_server(port=0)
-        cache_path.write_text(creds.to_json(), encoding="utf-8")
-
-    return creds
@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import os
+import sys
+import tempfile
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from google.auth.exceptions import RefreshError
+from google.auth.transport.requests import Request
+from google.oauth2.credentials import Credentials
+from google_auth_oauthlib.flow import InstalledAppFlow
+
+from .cache import replaying
+from .config import GOOGLE_SCOPE_ADSENSE, GOOGLE_SCOPE_GA4, GOOGLE_SCOPE_GSC, CollectorConfig
+from .instrument import stage
+
+# One consent and one token for every Google provider, instead of one per scope set.
+ALL_GOOGLE_SCOPES = tuple(sorted({GOOGLE_SCOPE_GA4, GOOGLE_SCOPE_GSC, GOOGLE_SCOPE_ADSENSE}))
+
+# Refresh a little before expiry so a token handed out now outlives the requests made with it.
+REFRESH_MARGIN = timedelta(minutes=5)
+
+if os.name == "nt":
+    import msvcrt
+
+    def _lock_file(handle) -> None:
+        handle.seek(0)
+        msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)
+
+    def _unlock_file(handle) -> None:
+        handle.seek(0)
+        msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+
+else:
+    import fcntl
+
+    def _lock_file(handle) -> None:
+        fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+
+    def _unlock_file(handle) -> None:
+        fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+
+@contextmanager
+def token_cache_lock(cache_path: Path) -> Iterator[None]:
+    """Exclusive lock shared by every process using the same token cache file."""
+    lock_path = cache_path.with_name(cache_path.name + ".lock")
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    with lock_path.open("a+b") as handle:
+        _lock_file(handle)
+        try:
+            yield
+        finally:
+            _unlock_file(handle)
+
+
+def write_token_cache(cache_path: Path, creds: Credentials) -> None:
+    fd, tmp_name = tempfile.mkstemp(dir=cache_path.parent, prefix=f".{cache_path.name}.")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            handle.write(creds.to_json())
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.chmod(tmp_name, 0o600)
+        os.replace(tmp_name, cache_path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+def _is_fresh(creds: Credentials | None, scopes: Iterable[str]) -> bool:
+    if creds is None or not creds.valid:
+        return False
+    if not set(scopes).issubset(set(creds.scopes or [])):
+        return False
+    if creds.expiry is None:
+        return True
+    expiry = creds.expiry.replace(tzinfo=timezone.utc) if creds.expiry.tzinfo is None else creds.expiry
+    return expiry - REFRESH_MARGIN > datetime.now(timezone.utc)
+
+
+def _interactive() -> bool:
+    return bool(sys.stdin and sys.stdin.isatty())
+
+
+class GoogleCredentialBroker:
+    """Process-wide holder of one Google ``Credentials`` for the union of provider scopes."""
+
+    def __init__(self, client_secret_file: Path, token_cache: Path, scopes: Iterable[str] = ALL_GOOGLE_SCOPES) -> None:
+        self.client_secret_file = client_secret_file
+        self.token_cache = token_cache
+        self.scopes = sorted(set(scopes))
+        self._lock = threading.Lock()
+        self._creds: Credentials | None = None
+
+    def _load_cached(self) -> Credentials | None:
+        if not self.token_cache.exists():
+            return None
+        try:
+            # No scopes argument: keep the scopes stored with the token so a narrower grant is detected.
+            return Credentials.from_authorized_user_file(str(self.token_cache))
+        except Exception:
+            return None
+
+    def get(self) -> Credentials:
+        with self._lock:
+            if _is_fresh(self._creds, self.scopes):
+                return self._creds
+
+            self.token_cache.parent.mkdir(parents=True, exist_ok=True)
+            with token_cache_lock(self.token_cache):
+                # Another process may have refreshed the token while we waited for the lock.
+                creds = self._load_cached()
+                if creds and not set(self.scopes).issubset(set(creds.scopes or [])):
+                    creds = None
+                if creds and not _is_fresh(creds, self.scopes) and creds.refresh_token:
+                    try:
+                        creds.refresh(Request())
+                    except RefreshError:
+                        # Revoked or expired grant: only a new consent helps. Network errors and
+                        # Google 5xx propagate, so a cron run fails instead of waiting for a browser.
+                        creds = None
+                    else:
+                        write_token_cache(self.token_cache, creds)
+
+                if not creds or not creds.valid:
+                    if not _interactive():
+                        # The consent flow waits for a browser while holding the token-cache lock.
+                        raise RuntimeError(
+                            f"Google authorization needed for {self.token_cache}; "
+                            "re-run the collector interactively to re-authorize"
+                        )
+                    flow = InstalledAppFlow.from_client_secrets_file(str(self.client_secret_file), scopes=self.scopes)
+                    creds = flow.run_local_server(port=0)
+                    write_token_cache(self.token_cache, creds)
+
+            self._creds = creds
+            return creds
+
+
+_brokers: dict[tuple[Path, Path], GoogleCredentialBroker] = {}
+_brokers_lock = threading.Lock()
+
+
+def get_credential_broker(config: CollectorConfig) -> GoogleCredentialBroker:
+    if not config.google_oauth_client_secret_file:
+        raise RuntimeError("GOOGLE_OAUTH_CLIENT_SECRET_FILE is not configured")
+    if not config.google_oauth_client_secret_file.exists():
+        raise RuntimeError(f"Google OAuth client secret file not found: {config.google_oauth_client_secret_file}")
+
+    key = (config.google_oauth_client_secret_file, config.google_token_cache)
+    with _brokers_lock:
+        broker = _brokers.get(key)
+        if broker is None:
+            broker = GoogleCredentialBroker(config.google_oauth_client_secret_file, config.google_token_cache)
+            _brokers[key] = broker
+        return broker
+
+
+def get_google_credentials(config: CollectorConfig, scopes: Iterable[str]) -> Credentials | None:
+    if replaying():
+        # Reprocessing serves archived responses; requests are never sent.
+        return None
+    broker = get_credential_broker(config)
+    missing = set(scopes) - set(broker.scopes)
+    if missing:
+        raise RuntimeError(f"Unsupported Google scope(s): {', '.join(sorted(missing))}")
+    with stage("credentials"):
+        return broker.get()
@@ -0,0 +1,260 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from dataclasses import dataclass, replace
+from datetime import date
+from pathlib import Path
+from typing import Callable, Sequence
+
+from dotenv import dotenv_values, find_dotenv
+
+from .config import CollectorConfig, load_config, resolve_date_window
+from .providers import available_providers
+from .rollups import update_rollups
+from .runner import DEFAULT_PROVIDER_TIMEOUT_SECONDS, CollectionAborted, Echo, collect_from_days, collect_providers
+from .schema import ProviderName
+from .storage import build_summary, stored_results, write_results
+from .warehouse import upsert_results
+
+DEFAULT_SCHEDULE = "cloudflare=1h,ga4=1d,gsc=1d,adsense=1d"
+INTERVAL_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+# A run that aborted is retried after this long (or its interval, if shorter).
+RETRY_ABORTED_SECONDS = 300.0
+ENV_POLL_SECONDS = 5.0
+
+
+def parse_interval(value: str) -> float:
+    text = value.strip().lower()
+    unit = INTERVAL_UNITS.get(text[-1:]) if text else None
+    try:
+        seconds = float(text[:-1]) * unit if unit else float(text)
+    except ValueError:
+        seconds = 0.0
+    if seconds <= 0:
+        raise ValueError(f"Invalid interval {value!r}; use e.g. 90s, 15m, 1h or 1d")
+    return seconds
+
+
+def parse_schedule(spec: str, available: Sequence[str]) -> dict[ProviderName, float]:
+    """``cloudflare=1h,gsc=1d`` -> provider intervals in seconds, in canonical provider order."""
+    intervals: dict[str, float] = {}
+    for part in spec.split(","):
+        if not part.strip():
+            continue
+        name, sep, interval = part.partition("=")
+        name = name.strip().lower()
+        if not sep:
+            raise ValueError(f"Schedule entry {part.strip()!r} must look like provider=interval")
+        if name not in available:
+            raise ValueError(f"Unknown provider in schedule: {name}")
+        intervals[name] = parse_interval(interval)
+    if not intervals:
+        raise ValueError("Schedule selects no providers")
+    return {name: intervals[name] for name in available if name in intervals}
+
+
+class EnvFileReloader:
+    """Applies a ``.env`` file to ``os.environ`` and applies it again whenever the file changes.
+
+    As with `load_config`, variables set in the real environment win over the file. Variables
+    that came from the file follow its edits, including removals.
+    """
+
+    def __init__(self, path: Path | None) -> None:
+        self.path = path
+        self._owned: dict[str, str] = {}
+        self._stamp: tuple[int, int] | None = None
+
+    def _current_stamp(self) -> tuple[int, int] | None:
+        try:
+            stat = self.path.stat() if self.path else None
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size) if stat else None
+
+    def refresh(self) -> bool:
+        """Re-apply the file if it changed since the last call; returns True if it did."""
+        stamp = self._current_stamp()
+        if stamp == self._stamp:
+            return False
+        self._stamp = stamp
+        values = {key: value for key, value in dotenv_values(self.path).items() if value is not None} if stamp else {}
+
+        for key in list(self._owned):
+            if key not in values:
+                if os.environ.get(key) == self._owned.pop(key):
+                    del os.environ[key]
+        for key, value in values.items():
+            if key in self._owned or key not in os.environ:
+                os.environ[key] = value
+                self._owned[key] = value
+        return True
+
+
+@dataclass(frozen=True)
+class ServeOptions:
+    out: Path
+    days: int = 7
+    row_limit: int = 50
+    fail_soft: bool = True
+    timeout: float | None = DEFAULT_PROVIDER_TIMEOUT_SECONDS
+    pretty: bool = False
+    compression: str | None = None
+    warehouse_path: Path | None = None
+    day_store: bool = False
+    # Falls back to COLLECTOR_SCHEDULE from the environment / .env, then DEFAULT_SCHEDULE.
+    schedule: str | None = None
+    archive: bool = False
+
+
+class CollectorDaemon:
+    """Runs provider collections on their own intervals inside one long-lived process.
+
+    Imports, the loaded config, Google credentials and service objects, and pooled HTTP
+    connections all survive from one run to the next. The ``.env`` file is watched and a
+    changed file reloads the config and the schedule without a restart. A provider that is
+    due writes today's window into the date directory. The directory keeps the other
+    providers' files, and its summary covers all of them.
+    """
+
+    def __init__(
+        self,
+        options: ServeOptions,
+        env_file: str | None = None,
+        echo: Echo | None = None,
+        clock: Callable[[], float] = time.monotonic,
+        on_written: Callable[[Path], None] | None = None,
+    ) -> None:
+        self.options = options
+        self.on_written = on_written
+        self.env_file = env_file
+        dotenv_path = env_file or find_dotenv()
+        self.reloader = EnvFileReloader(Path(dotenv_path) if dotenv_path else None)
+        self.emit = echo or (lambda _: None)
+        self.clock = clock
+        self.config: CollectorConfig | None = None
+        self.intervals: dict[ProviderName, float] = {}
+        self.next_due: dict[ProviderName, float] = {}
+        self.runs = 0
+
+    def reload(self) -> bool:
+        """Load config and schedule on first use and after ``.env`` edits; returns True if (re)loaded."""
+        if not self.reloader.refresh() and self.config is not None:
+            return False
+        try:
+            config = load_config(self.env_file)
+            spec = self.options.schedule or os.getenv("COLLECTOR_SCHEDULE") or DEFAULT_SCHEDULE
+            intervals = parse_schedule(spec, available_providers())
+        except (RuntimeError, ValueError) as exc:
+            if self.config is None:
+                raise
+            self.emit(f"! config reload failed, keeping the previous one: {exc}")
+            return False
+
+        now = self.clock()
+        if self.config is not None:
+            schedule = ",".join(f"{name}={seconds:g}s" for name, seconds in intervals.items())
+            self.emit(f"Reloaded config; schedule={schedule}")
+        self.config = config
+        self.next_due = {
+            # New providers run right away; a shorter interval pulls an existing one forward.
+            name: min(self.next_due.get(name, now), now + interval)
+            for name, interval in intervals.items()
+        }
+        self.intervals = intervals
+        return True
+
+    def due(self) -> list[ProviderName]:
+        now = self.clock()
+        return [name for name in self.intervals if self.next_due[name] <= now]
+
+    def seconds_until_due(self) -> float:
+        if not self.next_due:
+            return ENV_POLL_SECONDS
+        return max(0.0, min(self.next_due.values()) - self.clock())
+
+    def _retry_soon(self, providers: Sequence[ProviderName], started: float) -> None:
+        for name in providers:
+            self.next_due[name] = started + min(self.intervals[name], RETRY_ABORTED_SECONDS)
+
+    def collect(self, providers: Sequence[ProviderName]) -> Path | None:
+        """Collect ``providers`` for today's window and write it; returns the date directory."""
+        options = self.options
+        config = replace(self.config, archive_root=options.out) if options.archive else self.config
+        started = self.clock()
+        date_window = resolve_date_window(None, days=options.days, timezone_name=config.collector_timezone)
+        self.emit(
+            f"Collecting {date_window.start.isoformat()}..{date_window.end.isoformat()} providers={','.join(providers)}"
+        )
+
+        fetched_days: list[date] = []
+        try:
+            if options.day_store:
+                composed = collect_from_days(
+                    config,
+                    date_window,
+                    providers,
+                    options.out,
+                    row_limit=options.row_limit,
+                    fail_soft=options.fail_soft,
+                    timeout=options.timeout,
+                    echo=self.emit,
+                )
+                results, fetched_days = composed.results, composed.fetched_days
+            else:
+                results = collect_providers(
+                    config,
+                    date_window,
+                    providers,
+                    row_limit=options.row_limit,
+                    fail_soft=options.fail_soft,
+                    timeout=options.timeout,
+                    echo=self.emit,
+                )
+        except CollectionAborted as exc:
+            for err in exc.errors:
+                self.emit(f"! collection aborted: {err}")
+            self._retry_soon(providers, started)
+            return None
+
+        for name in providers:
+            self.next_due[name] = started + self.intervals[name]
+
+        others = stored_results(options.out / date_window.end.isoformat(), exclude=providers)
+        order = {name: index for index, name in enumerate(available_providers())}
+        everything = sorted([*results, *others], key=lambda result: order.get(result.provider, len(order)))
+        output_dir = write_results(
+            options.out,
+            date_window.end,
+            results,
+            build_summary(everything),
+            pretty=options.pretty,
+            compression=options.compression,
+        )
+        if options.warehouse_path is not None:
+            upsert_results(options.warehouse_path, results)
+        for day in [*fetched_days, date_window.end]:
+            update_rollups(options.out, day)
+        self.runs += 1
+        if self.on_written is not None:
+            self.on_written(output_dir)
+        self.emit(f"Wrote metrics to: {output_dir} ({self.clock() - started:.1f}s)")
+        return output_dir
+
+    def serve(self, stop: threading.Event) -> None:
+        """Run due collections until ``stop`` is set, checking ``.env`` every few seconds."""
+        while not stop.is_set():
+            self.reload()
+            providers = self.due()
+            if providers:
+                started = self.clock()
+                try:
+                    self.collect(providers)
+                except Exception as exc:  # noqa: BLE001
+                    # One failed write (disk full, bad output permissions) must not end the daemon.
+                    self.emit(f"! run failed: {exc}")
+                    self._retry_soon(providers, started)
+                continue
+            stop.wait(min(ENV_POLL_SECONDS, self.seconds_until_due()))
@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import threading
+from dataclasses import dataclass
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Callable
+
+from .config import PROVIDER_FINALIZATION_LAG_DAYS, DateWindow
+from .instrument import is_timing_note
+from .schema import ProviderResult, make_trusted_result, utc_now
+
+DAY_STORE_DIRNAME = ".days"
+DAY_STORE_VERSION = 1
+
+# Metrics that are means, combined across days weighted by another quantity instead of summed.
+WEIGHTED_METRICS: dict[str, Callable[[dict[str, float]], float]] = {
+    "ctr": lambda metrics: metrics.get("impressions", 0.0),
+    "position": lambda metrics: metrics.get("impressions", 0.0),
+    # RPM is earnings per 1000 page views, so the implied page views weight it.
+    "pageViewsRpm": lambda metrics: (
+        metrics.get("estimatedEarnings", 0.0) / metrics["pageViewsRpm"] if metrics.get("pageViewsRpm") else 0.0
+    ),
+}
+# Ranking metrics for composed top rows, in order of precedence (descending).
+RANK_METRICS = ("pageviews", "sessions", "clicks", "impressions", "requests", "bytes")
+# Row kinds that are complete breakdowns rather than top lists; kept in key order.
+UNRANKED_KINDS = frozenset({"status_group", "daily"})
+
+
+def is_final(provider: str, day: date, today: date) -> bool:
+    """Whether the provider's numbers for ``day`` have stopped changing."""
+    return day <= today - timedelta(days=PROVIDER_FINALIZATION_LAG_DAYS.get(provider, 3))
+
+
+def window_days(date_window: DateWindow) -> list[date]:
+    return [date_window.start + timedelta(days=offset) for offset in range((date_window.end - date_window.start).days + 1)]
+
+
+@dataclass(frozen=True)
+class DayFact:
+    result: ProviderResult
+    final: bool
+    row_limit: int
+
+    def usable(self, row_limit: int) -> bool:
+        """A stored day is reused if it was final when fetched and holds enough top rows."""
+        return self.final and self.row_limit >= row_limit
+
+
+class DayStore:
+    """Single-day provider results under ``<out>/.days/<provider>/<YYYY-MM-DD>.json``.
+
+    A day is stored with whether it was already final when fetched; non-final days are
+    fetched again on the next run that needs them, final ones never.
+    """
+
+    def __init__(self, out_root: Path) -> None:
+        self.root = out_root / DAY_STORE_DIRNAME
+        self._locks: dict[tuple[str, date], threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    def path(self, provider: str, day: date) -> Path:
+        return self.root / provider / f"{day.isoformat()}.json"
+
+    def lock(self, provider: str, day: date) -> threading.Lock:
+        # Overlapping backfill windows ask for the same days; only one of them fetches.
+        with self._locks_guard:
+            return self._locks.setdefault((provider, day), threading.Lock())
+
+    def load(self, provider: str, day: date) -> DayFact | None:
+        try:
+            payload = json.loads(self.path(provider, day).read_text(encoding="utf-8"))
+            if payload.get("version") != DAY_STORE_VERSION:
+                return None
+            stored = payload["result"]
+            # Stored rows were sanitized before they were written; only the envelope is validated.
+            result = ProviderResult.model_validate({**stored, "rows": []})
+            result.rows = stored["rows"]
+            return DayFact(
+                result=result,
+                final=bool(payload["final"]),
+                row_limit=int(payload["row_limit"]),
+            )
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def save(self, result: ProviderResult, final: bool, row_limit: int) -> Path:
+        path = self.path(result.provider, result.date_range.end)
+        payload = {
+            "version": DAY_STORE_VERSION,
+            "final": final,
+            "row_limit": row_limit,
+            "stored_at": utc_now().isoformat(),
+            "result": result.model_dump(mode="json"),
+        }
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            json.dump(payload, handle, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+        os.chmod(tmp_name, 0o644)
+        os.replace(tmp_name, path)
+        return path
+
+
+_STORES: dict[Path, DayStore] = {}
+_STORES_LOCK = threading.Lock()
+
+
+def get_day_store(out_root: Path) -> DayStore:
+    with _STORES_LOCK:
+        store = _STORES.get(out_root)
+        if store is None:
+            store = DayStore(out_root)
+            _STORES[out_root] = store
+        return store
+
+
+def _numeric(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def combine_metrics(items: list[dict[str, Any]]) -> dict[str, float]:
+    """Sum additive metrics across days; weighted means (ctr, position, RPM) are re-weighted."""
+    sums: dict[str, float] = {}
+    weighted: dict[str, list[float]] = {}
+    for metrics in items:
+        for name, value in metrics.items():
+            if not _numeric(value):
+                continue
+            if name in WEIGHTED_METRICS:
+                weight = WEIGHTED_METRICS[name](metrics)
+                bucket = weighted.setdefault(name, [0.0, 0.0])
+                bucket[0] += float(value) * weight
+                bucket[1] += weight
+            else:
+                sums[name] = sums.get(name, 0.0) + float(value)
+    for name, (total, weight) in weighted.items():
+        sums[name] = total / weight if weight else 0.0
+    return sums
+
+
+def _row_identity(row: dict[str, Any]) -> tuple[tuple[str, Any], ...]:
+    return tuple(sorted((key, value) for key, value in row.items() if not _numeric(value)))
+
+
+def _row_sort_key(kind: str, row: dict[str, Any]) -> tuple:
+    labels = tuple(str(value) for _, value in _row_identity(row))
+    if kind in UNRANKED_KINDS:
+        return labels
+    return (*(-float(row.get(name, 0.0)) for name in RANK_METRICS), labels)
+
+
+def combine_rows(day_rows: list[list[dict[str, Any]]], row_limit: int) -> list[dict[str, Any]]:
+    """Merge per-day rows with the same labels, then keep the top ``row_limit`` per kind."""
+    grouped: dict[tuple, list[dict[str, Any]]] = {}
+    kinds: dict[str, None] = {}
+    for rows in day_rows:
+        for row in rows:
+            kinds.setdefault(str(row.get("kind", "")), None)
+            grouped.setdefault(_row_identity(row), []).append(row)
+
+    by_kind: dict[str, list[dict[str, Any]]] = {kind: [] for kind in kinds}
+    for identity, rows in grouped.items():
+        labels = dict(identity)
+        metrics = combine_metrics(rows)
+        # Keep the field order of the provider's rows.
+        merged = {key: labels[key] if key in labels else metrics.get(key, 0.0) for key in rows[0]}
+        by_kind[str(merged.get("kind", ""))].append(merged)
+
+    combined: list[dict[str, Any]] = []
+    for kind, rows in by_kind.items():
+        rows.sort(key=lambda row: _row_sort_key(kind, row))
+        combined.extend(rows if kind in UNRANKED_KINDS else rows[: max(1, row_limit)])
+    return combined[: max(1, row_limit)]
+
+
+def compose_result(
+    provider: str,
+    date_window: DateWindow,
+    day_results: list[ProviderResult],
+    row_limit: int,
+    failed: dict[date, ProviderResult] | None = None,
+) -> ProviderResult:
+    """Build a window's result from single-day results (in day order).
+
+    ``failed`` holds the error results of days that could not be fetched; their errors are
+    reported per day, or once when no day could be fetched (e.g. a dormant provider).
+    """
+    failed = failed or {}
+    notes: list[str] = []
+    for result in [*day_results, *failed.values()]:
+        for note in result.notes:
+            if note not in notes and not note.startswith("top_pages=") and not is_timing_note(note):
+                notes.append(note)
+    if day_results:
+        notes.append(f"composed from {len(day_results)} stored days")
+    if any(result.rows for result in day_results):
+        notes.append(f"top rows are ranked from per-day top {row_limit} lists")
+    if provider == "ga4" and day_results:
+        notes.append("activeUsers is summed over days and may double-count users")
+
+    if day_results:
+        errors = [f"{day.isoformat()}: {error}" for day, result in sorted(failed.items()) for error in result.errors]
+    else:
+        errors = list(dict.fromkeys(error for result in failed.values() for error in result.errors))
+
+    return make_trusted_result(
+        provider=provider,
+        start=date_window.start,
+        end=date_window.end,
+        metrics=combine_metrics([result.metrics for result in day_results]),
+        rows=combine_rows([result.rows for result in day_results], row_limit),
+        notes=notes,
+        errors=errors,
+    )
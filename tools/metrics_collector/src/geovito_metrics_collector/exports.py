@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Iterable
+
+from .config import CollectorConfig, DateWindow
+from .sanitize import RowSanitizer
+
+logger = logging.getLogger(__name__)
+
+
+def export_path(config: CollectorConfig, date_window: DateWindow, provider: str, name: str) -> Path | None:
+    if config.export_root is None:
+        return None
+    return config.export_root / date_window.end.isoformat() / f"{provider}.{name}.jsonl"
+
+
+class RowExport:
+    """Page-by-page JSONL export of sanitized rows with a resumable checkpoint.
+
+    Rows go to ``<name>.jsonl.partial``. After every page the file is fsynced and the next
+    request position is recorded in ``<name>.jsonl.progress.json``, so a failed export can be
+    resumed from the last complete page. ``commit`` renames the partial file into place.
+    """
+
+    def __init__(self, path: Path, label: str) -> None:
+        self.path = path
+        self.label = label
+        self.partial_path = path.with_name(path.name + ".partial")
+        self.progress_path = path.with_name(path.name + ".progress.json")
+        self.rows_written = 0
+        self.position: dict[str, Any] | None = None
+        # Full exports keep every row; only the bounded summaries deduplicate.
+        self._sanitizer = RowSanitizer(deduplicate=False)
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        size = self._load_progress()
+        self._handle = self.partial_path.open("r+b" if size is not None else "wb")
+        if size is not None:
+            self._handle.truncate(size)
+            self._handle.seek(size)
+            logger.info("%s: resuming at %s (%d rows already exported)", label, self.position, self.rows_written)
+
+    def _load_progress(self) -> int | None:
+        if not (self.progress_path.exists() and self.partial_path.exists()):
+            return None
+        try:
+            progress = json.loads(self.progress_path.read_text(encoding="utf-8"))
+            size = int(progress["bytes"])
+            rows = int(progress["rows"])
+            position = dict(progress["position"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        if size > self.partial_path.stat().st_size:
+            return None
+        self.rows_written = rows
+        self.position = position
+        return size
+
+    def restart(self) -> None:
+        self._handle.seek(0)
+        self._handle.truncate(0)
+        self.rows_written = 0
+        self.position = None
+
+    def append_page(self, rows: Iterable[dict[str, object]], next_position: dict[str, Any], total: int | None = None) -> int:
+        written = 0
+        for item in self._sanitizer.sanitize(rows):
+            self._handle.write(json.dumps(item, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n")
+            written += 1
+
+        self._handle.flush()
+        os.fsync(self._handle.fileno())
+        self.rows_written += written
+        self.position = next_position
+        progress = {"bytes": self._handle.tell(), "rows": self.rows_written, "position": next_position}
+        tmp_path = self.progress_path.with_name(self.progress_path.name + ".tmp")
+        tmp_path.write_text(json.dumps(progress, sort_keys=True), encoding="utf-8")
+        os.replace(tmp_path, self.progress_path)
+
+        if total is None:
+            logger.info("%s: %d rows exported", self.label, self.rows_written)
+        else:
+            logger.info("%s: %d/%d rows exported", self.label, self.rows_written, total)
+        return written
+
+    def commit(self) -> Path:
+        self._handle.close()
+        os.replace(self.partial_path, self.path)
+        self.progress_path.unlink(missing_ok=True)
+        return self.path
+
+    def close(self) -> None:
+        if not self._handle.closed:
+            self._handle.close()
@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterator
+
+from google_auth_httplib2 import AuthorizedHttp
+from googleapiclient.discovery import build
+from googleapiclient.discovery_cache.base import Cache
+from googleapiclient.http import build_http
+from googleapiclient.version import __version__ as GOOGLEAPICLIENT_VERSION
+
+from .cache import replaying
+from .config import CollectorConfig
+from .instrument import record, stage
+from .scheduler import schedule
+
+DISCOVERY_MODES = ("cache", "static", "network")
+DISCOVERY_MAX_AGE_SECONDS = 7 * 24 * 3600
+MAX_POOLED_CREDENTIALS = 4
+# Provider whose rate limit and retry policy apply to each API's requests.
+API_PROVIDERS = {"analyticsdata": "ga4", "searchconsole": "gsc", "adsense": "adsense"}
+
+_transports: dict[int, list[_MeteredHttp]] = {}
+_transports_lock = threading.Lock()
+_services: dict[tuple[str, str, str, Path, str | None], Any] = {}
+_services_lock = threading.Lock()
+
+
+class FileDiscoveryCache(Cache):
+    """Discovery documents on disk, namespaced by googleapiclient version and keyed by URL.
+
+    The discovery URL already carries the API name and version.
+    """
+
+    def __init__(self, root: Path, max_age_seconds: int = DISCOVERY_MAX_AGE_SECONDS) -> None:
+        self.root = root / f"googleapiclient-{GOOGLEAPICLIENT_VERSION}"
+        self.max_age_seconds = max_age_seconds
+
+    def _path(self, url: str) -> Path:
+        return self.root / f"{hashlib.sha256(url.encode('utf-8')).hexdigest()}.json"
+
+    def get(self, url: str) -> str | None:
+        path = self._path(url)
+        try:
+            if time.time() - path.stat().st_mtime > self.max_age_seconds:
+                return None
+            return path.read_text(encoding="utf-8")
+        except OSError:
+            return None
+
+    def set(self, url: str, content: str) -> None:
+        path = self._path(url)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                handle.write(content)
+            os.replace(tmp_name, path)
+        except OSError:
+            # A read-only cache directory only costs the next process a download.
+            return
+
+
+def _build_service(config: CollectorConfig, api: str, version: str) -> Any:
+    # Built without credentials: requests are authorized per call by `execute`, which lets one
+    # service object serve every provider, thread and backfill day in the process.
+    mode = config.google_discovery_mode
+    if config.api_base_url:
+        # Every API is served under the same base URL; its bundled document supplies the paths.
+        endpoint = config.api_base_url.rstrip("/") + "/"
+        return build(api, version, http=build_http(), static_discovery=True, client_options={"api_endpoint": endpoint})
+    if mode == "static":
+        return build(api, version, http=build_http(), static_discovery=True)
+    if mode == "network":
+        return build(api, version, http=build_http(), cache_discovery=False, static_discovery=False)
+
+    try:
+        return build(
+            api,
+            version,
+            http=build_http(),
+            cache_discovery=True,
+            cache=FileDiscoveryCache(config.google_discovery_cache_dir),
+            static_discovery=False,
+        )
+    except Exception:  # noqa: BLE001
+        # Discovery endpoint slow or down and nothing cached yet: fall back to the bundled copy.
+        return build(api, version, http=build_http(), static_discovery=True)
+
+
+def get_service(config: CollectorConfig, api: str, version: str) -> Any:
+    key = (api, version, config.google_discovery_mode, config.google_discovery_cache_dir, config.api_base_url)
+    with _services_lock:
+        service = _services.get(key)
+        if service is None:
+            with stage("discovery"):
+                service = _build_service(config, api, version)
+            _services[key] = service
+        return service
+
+
+class _MeteredHttp(AuthorizedHttp):
+    """Counts the response bytes it receives, for per-provider request instrumentation."""
+
+    received = 0
+
+    def request(self, *args: Any, **kwargs: Any) -> tuple[Any, bytes]:
+        response, content = super().request(*args, **kwargs)
+        self.received += len(content or b"")
+        return response, content
+
+
+@contextmanager
+def _borrowed_http(credentials: Any) -> Iterator[_MeteredHttp]:
+    # Idle transports are shared across threads and runs so their connections stay open, but
+    # each is used by one request at a time.
+    key = id(credentials)
+    with _transports_lock:
+        idle = [http for http in _transports.get(key, []) if http.credentials is credentials]
+        http = idle.pop() if idle else _MeteredHttp(credentials, http=build_http())
+        _transports.pop(key, None)
+        _transports[key] = idle
+        # Refreshed credentials are new objects; transports of long-replaced ones are dropped.
+        while len(_transports) > MAX_POOLED_CREDENTIALS:
+            _transports.pop(next(iter(_transports)))
+    try:
+        yield http
+    finally:
+        with _transports_lock:
+            _transports.setdefault(key, []).append(http)
+
+
+def execute(request: Any, credentials: Any, provider: str | None = None) -> dict[str, Any]:
+    """Execute a googleapiclient request with ``credentials`` on a transport no other thread is using.
+
+    httplib2 connections are not thread-safe, so shared service objects never use their own.
+    """
+    with _borrowed_http(credentials) as http:
+        received = http.received
+        try:
+            return request.execute(http=http)
+        finally:
+            record(provider, http_bytes=http.received - received)
+
+
+@dataclass(frozen=True)
+class GoogleClient:
+    """A process-wide service paired with the credentials its requests are sent with.
+
+    With ``provider`` set, requests go through that provider's scheduler (see `scheduler`).
+    """
+
+    service: Any
+    credentials: Any
+    provider: str | None = None
+
+    def execute(self, request: Any) -> dict[str, Any]:
+        if self.provider is None:
+            return execute(request, self.credentials)
+        return schedule(self.provider, lambda: execute(request, self.credentials, self.provider))
+
+
+def get_client(config: CollectorConfig, api: str, version: str, credentials: Any) -> GoogleClient:
+    return GoogleClient(
+        # No service while replaying an archive: request objects are only built inside fetches.
+        service=None if replaying() else get_service(config, api, version),
+        credentials=credentials,
+        provider=API_PROVIDERS.get(api),
+    )
@@ -0,0 +1,316 @@
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import re
+import threading
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlsplit
+
+from .storage import SUMMARY_FILENAME, provider_files, read_bytes, result_name
+from .timeseries import DATE_DIR_PATTERN
+
+DEFAULT_LISTEN = "127.0.0.1:8787"
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+JSON_CONTENT_TYPE = "application/json"
+# Bodies smaller than this are sent uncompressed even to clients accepting gzip.
+GZIP_MIN_BYTES = 1024
+
+_NAME_PATTERN = re.compile(r"^[a-z0-9_-]+$")
+
+
+def parse_listen(value: str) -> tuple[str, int]:
+    host, sep, port = value.rpartition(":")
+    if not sep or not port.isdigit():
+        raise ValueError(f"Listen address {value!r} must look like HOST:PORT")
+    return host or "127.0.0.1", int(port)
+
+
+@dataclass
+class Document:
+    body: bytes
+    etag: str
+    _gzipped: bytes | None = field(default=None, repr=False)
+
+    def gzipped(self) -> bytes:
+        # Compressed on first request and kept for the life of the cached entry.
+        if self._gzipped is None:
+            self._gzipped = gzip.compress(self.body, mtime=0)
+        return self._gzipped
+
+
+@dataclass
+class _DayEntry:
+    version: tuple[int, int]
+    documents: dict[str, Document | None] = field(default_factory=dict)
+    metrics: Document | None = None
+
+
+def _stat_version(path: Path) -> tuple[int, int] | None:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns
+
+
+def _prom_value(value: float) -> str:
+    if value != value:
+        return "NaN"
+    if value in (float("inf"), float("-inf")):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+def _prom_label(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def render_prometheus(summary: dict[str, Any]) -> bytes:
+    """Summary KPIs and per-provider metrics in the Prometheus text exposition format."""
+    lines = [
+        "# HELP geovito_kpi Summary KPI over the latest run's window.",
+        "# TYPE geovito_kpi gauge",
+    ]
+    # Only the KPI name is a label, so each KPI stays one series across runs; the window is
+    # exported as its own gauges below.
+    for name, value in sorted((summary.get("kpis") or {}).items()):
+        lines.append(f'geovito_kpi{{name="{_prom_label(name)}"}} {_prom_value(value)}')
+
+    window = summary.get("date_range") or {}
+    for bound in ("start", "end"):
+        if not window.get(bound):
+            continue
+        day = date.fromisoformat(str(window[bound]))
+        timestamp = datetime(day.year, day.month, day.day, tzinfo=timezone.utc).timestamp()
+        lines += [
+            f"# HELP geovito_window_{bound}_timestamp_seconds Midnight UTC of the latest run's window {bound} date.",
+            f"# TYPE geovito_window_{bound}_timestamp_seconds gauge",
+            f"geovito_window_{bound}_timestamp_seconds {_prom_value(timestamp)}",
+        ]
+
+    providers = summary.get("providers") or []
+    lines += [
+        "# HELP geovito_provider_metric Provider metric over the latest run's window.",
+        "# TYPE geovito_provider_metric gauge",
+    ]
+    for item in providers:
+        for name, value in sorted((item.get("metrics") or {}).items()):
+            labels = f'provider="{_prom_label(item["provider"])}",metric="{_prom_label(name)}"'
+            lines.append(f"geovito_provider_metric{{{labels}}} {_prom_value(value)}")
+    lines += [
+        "# HELP geovito_provider_rows Rows kept in the provider's result file.",
+        "# TYPE geovito_provider_rows gauge",
+    ]
+    for item in providers:
+        row_count = int(item.get("row_count", 0))
+        lines.append(f'geovito_provider_rows{{provider="{_prom_label(item["provider"])}"}} {row_count}')
+    lines += [
+        "# HELP geovito_provider_errors Errors the provider reported in the latest run.",
+        "# TYPE geovito_provider_errors gauge",
+    ]
+    for item in providers:
+        error_count = len(item.get("errors") or [])
+        lines.append(f'geovito_provider_errors{{provider="{_prom_label(item["provider"])}"}} {error_count}')
+
+    generated_at = summary.get("generated_at")
+    if generated_at:
+        timestamp = datetime.fromisoformat(str(generated_at).replace("Z", "+00:00")).timestamp()
+        lines += [
+            "# HELP geovito_summary_generated_timestamp_seconds When the latest summary was written.",
+            "# TYPE geovito_summary_generated_timestamp_seconds gauge",
+            f"geovito_summary_generated_timestamp_seconds {_prom_value(timestamp)}",
+        ]
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+class OutputCache:
+    """The latest run's summary and provider files, held in memory as ready-to-send bytes.
+
+    Every lookup stats the output root and the date directory. A run replaces its date
+    directory in one rename, so a new inode or mtime means new output. Entries of a changed
+    directory are dropped and read again on the next request. `invalidate` drops everything
+    at once, for writers in the same process.
+    """
+
+    def __init__(self, out_root: Path) -> None:
+        self.out_root = out_root
+        self._lock = threading.Lock()
+        self._root_version: tuple[int, int] | None = None
+        self._dates: list[str] = []
+        self._days: dict[str, _DayEntry] = {}
+
+    def invalidate(self, *_: Any) -> None:
+        with self._lock:
+            self._root_version = None
+            self._days.clear()
+
+    def dates(self) -> list[str]:
+        version = _stat_version(self.out_root)
+        with self._lock:
+            if version != self._root_version or version is None:
+                self._root_version = version
+                try:
+                    names = [entry.name for entry in os.scandir(self.out_root) if entry.is_dir()]
+                except OSError:
+                    names = []
+                self._dates = sorted(name for name in names if DATE_DIR_PATTERN.match(name))
+                for stale in set(self._days) - set(self._dates):
+                    del self._days[stale]
+            return list(self._dates)
+
+    def latest_date(self) -> str | None:
+        dates = self.dates()
+        return dates[-1] if dates else None
+
+    def _day(self, day: str) -> _DayEntry | None:
+        version = _stat_version(self.out_root / day)
+        if version is None:
+            return None
+        with self._lock:
+            entry = self._days.get(day)
+            if entry is None or entry.version != version:
+                entry = _DayEntry(version=version)
+                self._days[day] = entry
+            return entry
+
+    def document(self, day: str, name: str) -> Document | None:
+        """``summary`` or a provider's result for one date directory."""
+        entry = self._day(day)
+        if entry is None:
+            return None
+        if name in entry.documents:
+            return entry.documents[name]
+
+        day_dir = self.out_root / day
+        if name == "summary":
+            paths = [day_dir / SUMMARY_FILENAME]
+        else:
+            paths = [path for path in provider_files(day_dir) if result_name(path.name) == f"{name}.json"]
+        document = None
+        for path in paths:
+            try:
+                body = read_bytes(path)
+            except (OSError, RuntimeError):
+                continue
+            document = Document(body=body, etag=f'"{day}-{name}-{entry.version[0]:x}-{entry.version[1]:x}"')
+            break
+        with self._lock:
+            entry.documents[name] = document
+        return document
+
+    def metrics(self, day: str) -> Document | None:
+        entry = self._day(day)
+        if entry is None:
+            return None
+        if entry.metrics is None:
+            summary = self.document(day, "summary")
+            if summary is None:
+                return None
+            try:
+                body = render_prometheus(json.loads(summary.body))
+            except (ValueError, KeyError, TypeError):
+                return None
+            entry.metrics = Document(body=body, etag=summary.etag.replace("-summary-", "-metrics-"))
+        return entry.metrics
+
+
+class _Handler(BaseHTTPRequestHandler):
+    cache: OutputCache
+    server_version = "geovito-metrics-collector"
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        return None
+
+    def _send(
+        self, status: int, body: bytes, content_type: str, etag: str | None = None, document: Document | None = None
+    ) -> None:
+        if etag is not None and etag in (self.headers.get("If-None-Match") or ""):
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        encoding = None
+        accepts_gzip = "gzip" in (self.headers.get("Accept-Encoding") or "")
+        if document is not None and accepts_gzip and len(body) >= GZIP_MIN_BYTES:
+            body, encoding = document.gzipped(), "gzip"
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-cache")
+        if etag is not None:
+            self.send_header("ETag", etag)
+        if document is not None:
+            self.send_header("Vary", "Accept-Encoding")
+        if encoding is not None:
+            self.send_header("Content-Encoding", encoding)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _send_json(self, status: int, payload: Any) -> None:
+        self._send(status, json.dumps(payload).encode("utf-8"), JSON_CONTENT_TYPE)
+
+    def _not_found(self, message: str) -> None:
+        self._send_json(404, {"error": message})
+
+    def _send_document(self, document: Document | None, content_type: str, missing: str) -> None:
+        if document is None:
+            self._not_found(missing)
+        else:
+            self._send(200, document.body, content_type, etag=document.etag, document=document)
+
+    def do_GET(self) -> None:  # noqa: N802
+        parts = [part for part in urlsplit(self.path).path.split("/") if part]
+        cache = self.cache
+
+        if parts == ["healthz"]:
+            self._send(200, b"ok\n", "text/plain; charset=utf-8")
+            return
+        if parts == ["days"]:
+            self._send_json(200, cache.dates())
+            return
+
+        # /days/<date>/... addresses one date directory; everything else the latest one.
+        if len(parts) >= 2 and parts[0] == "days":
+            if not DATE_DIR_PATTERN.match(parts[1]):
+                self._not_found("dates look like YYYY-MM-DD")
+                return
+            day, parts = parts[1], parts[2:]
+        else:
+            day = cache.latest_date()
+            if day is None:
+                self._not_found(f"no runs under {cache.out_root}")
+                return
+
+        if parts in (["summary"], ["summary.json"]):
+            self._send_document(cache.document(day, "summary"), JSON_CONTENT_TYPE, f"no summary for {day}")
+        elif parts == ["metrics"]:
+            self._send_document(cache.metrics(day), PROMETHEUS_CONTENT_TYPE, f"no summary for {day}")
+        elif len(parts) == 2 and parts[0] == "providers" and _NAME_PATTERN.match(parts[1].removesuffix(".json")):
+            provider = parts[1].removesuffix(".json")
+            self._send_document(cache.document(day, provider), JSON_CONTENT_TYPE, f"no {provider} result for {day}")
+        else:
+            self._not_found("try /summary, /providers/<name>, /metrics, /days or /days/<date>/summary")
+
+    do_HEAD = do_GET
+
+
+def make_server(out_root: Path, listen: str = DEFAULT_LISTEN, cache: OutputCache | None = None) -> ThreadingHTTPServer:
+    """A threaded HTTP server over ``out_root``; call ``serve_forever`` (or run it in a thread)."""
+    host, port = parse_listen(listen)
+    handler = type("Handler", (_Handler,), {"cache": cache or OutputCache(out_root)})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def start_server(server: ThreadingHTTPServer) -> threading.Thread:
+    thread = threading.Thread(target=server.serve_forever, name="http-api", daemon=True)
+    thread.start()
+    return thread
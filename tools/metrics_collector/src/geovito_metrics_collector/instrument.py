@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+import cProfile
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterator
+
+TIMINGS_VERSION = 1
+# Stage timers add ``<stage>_seconds`` to a provider's counters; ``http`` is the scheduler's.
+STAGES = ("credentials", "discovery", "http", "sanitize", "write")
+
+_counters: dict[str, dict[str, float]] = {}
+_counters_lock = threading.Lock()
+_local = threading.local()
+
+
+def record(provider: str | None, **amounts: float) -> None:
+    """Add to a provider's process-wide counters (no-op without a provider)."""
+    if provider is None:
+        return
+    with _counters_lock:
+        counters = _counters.setdefault(provider, {})
+        for name, amount in amounts.items():
+            counters[name] = counters.get(name, 0.0) + amount
+
+
+def snapshot(provider: str) -> dict[str, float]:
+    with _counters_lock:
+        return dict(_counters.get(provider, {}))
+
+
+def bind_provider(provider: str | None) -> None:
+    """Attribute stages timed on this thread to ``provider`` (set on each collector thread)."""
+    _local.provider = provider
+
+
+def current_provider() -> str | None:
+    return getattr(_local, "provider", None)
+
+
+@contextmanager
+def stage(name: str, provider: str | None = None) -> Iterator[None]:
+    """Add the block's wall time to ``<name>_seconds`` of the provider bound to this thread."""
+    provider = provider or current_provider()
+    if provider is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(provider, **{f"{name}_seconds": time.perf_counter() - started})
+
+
+def _rss_peak_bytes() -> int | None:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return int(peak if sys.platform == "darwin" else peak * 1024)
+
+
+@dataclass
+class ProviderSpan:
+    """One provider's share of a run: wall time, stage times and request counters.
+
+    Counters are process-wide per provider and diffed over the span, so two concurrent runs
+    of the same provider (parallel backfill days) share their counts.
+    """
+
+    provider: str
+    window: str = ""
+    started: float = field(default_factory=time.perf_counter)
+    before: dict[str, float] = field(default_factory=dict)
+    wall_seconds: float | None = None
+    counters: dict[str, float] = field(default_factory=dict)
+    rows: int = 0
+    tracemalloc_peak_bytes: int | None = None
+
+    @classmethod
+    def start(cls, provider: str, window: str = "") -> ProviderSpan:
+        return cls(provider=provider, window=window, before=snapshot(provider))
+
+    def finish(self, rows: int) -> ProviderSpan:
+        self.wall_seconds = time.perf_counter() - self.started
+        after = snapshot(self.provider)
+        self.counters = {name: after[name] - self.before.get(name, 0.0) for name in after}
+        self.rows = rows
+        if tracemalloc.is_tracing():
+            # Process-wide: providers overlap, so this is the peak up to the provider's end.
+            self.tracemalloc_peak_bytes = tracemalloc.get_traced_memory()[1]
+        return self
+
+    def to_json(self) -> dict[str, Any]:
+        payload: dict[str, Any] = {
+            "provider": self.provider,
+            "window": self.window,
+            "wall_seconds": round(self.wall_seconds or 0.0, 6),
+            "rows": self.rows,
+            "stages": {
+                name: round(self.counters[f"{name}_seconds"], 6)
+                for name in STAGES
+                if self.counters.get(f"{name}_seconds")
+            },
+            "http_requests": int(self.counters.get("http_requests", 0)),
+            "http_bytes": int(self.counters.get("http_bytes", 0)),
+            "retries": int(self.counters.get("retries", 0)),
+            "rate_limit_wait_seconds": round(self.counters.get("rate_limit_wait_seconds", 0.0), 6),
+        }
+        if self.tracemalloc_peak_bytes is not None:
+            payload["tracemalloc_peak_bytes"] = self.tracemalloc_peak_bytes
+        return payload
+
+    def note(self) -> str:
+        summary = self.to_json()
+        parts = [f"timing: {summary['wall_seconds']:.2f}s"]
+        parts += [f"{name}={seconds:.2f}s" for name, seconds in summary["stages"].items()]
+        parts += [
+            f"requests={summary['http_requests']}",
+            f"received={summary['http_bytes'] / 1024:.0f}KiB",
+            f"retries={summary['retries']}",
+        ]
+        return " ".join(parts)
+
+
+def is_timing_note(note: str) -> bool:
+    return note.startswith("timing: ")
+
+
+class RunTimer:
+    """Collects the provider spans and run-level stages of one run for ``timings.json``."""
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.providers: list[ProviderSpan] = []
+        self.stages: dict[str, float] = {}
+        self._lock = threading.Lock()
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+
+    def add(self, span: ProviderSpan) -> None:
+        with self._lock:
+            self.providers.append(span)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - started
+
+    def to_json(self, order: list[str] | None = None) -> dict[str, Any]:
+        rank = {provider: index for index, provider in enumerate(order or [])}
+        spans = sorted(self.providers, key=lambda span: rank.get(span.provider, len(rank)))
+        payload: dict[str, Any] = {
+            "version": TIMINGS_VERSION,
+            "wall_seconds": round(time.perf_counter() - self.started, 6),
+            "stages": {name: round(seconds, 6) for name, seconds in self.stages.items()},
+            "rss_peak_bytes": _rss_peak_bytes(),
+            "providers": [span.to_json() for span in spans],
+        }
+        if tracemalloc.is_tracing():
+            payload["tracemalloc_peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        return payload
+
+
+# From 3.12 cProfile runs on sys.monitoring: one profiler sees every thread, and a second
+# active one raises ValueError. Before that, each thread needs its own.
+PER_THREAD_PROFILES = sys.version_info < (3, 12)
+
+
+class Profiler:
+    """cProfile over the calling thread and every thread started while it is active.
+
+    Collector threads are where the work happens. Before Python 3.12 each new thread
+    enables its own profiler and all of them are merged into one pstats file.
+    """
+
+    def __init__(self) -> None:
+        self._profiles: list[cProfile.Profile] = []
+        self._lock = threading.Lock()
+        self._main = cProfile.Profile()
+
+    def _thread_hook(self, *_: Any) -> None:
+        # Runs as the first profile event of a new thread; enabling cProfile replaces the hook.
+        profile = cProfile.Profile()
+        with self._lock:
+            self._profiles.append(profile)
+        profile.enable()
+
+    def __enter__(self) -> Profiler:
+        tracemalloc.start()
+        if PER_THREAD_PROFILES:
+            threading.setprofile(self._thread_hook)
+        self._main.enable()
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        self._main.disable()
+        if PER_THREAD_PROFILES:
+            threading.setprofile(None)
+        tracemalloc.stop()
+
+    def save(self, path: Path) -> pstats.Stats:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        stats = pstats.Stats(self._main)
+        with self._lock:
+            profiles = list(self._profiles)
+        for profile in profiles:
+            profile.disable()
+            try:
+                stats.add(profile)
+            except TypeError:
+                # A thread that never made a call has no stats to merge.
+                continue
+        stats.dump_stats(str(path))
+        return stats
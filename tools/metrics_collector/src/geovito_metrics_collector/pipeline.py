@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from typing import Any, Callable, Generator, Iterator
+
+from .instrument import stage
+from .sanitize import RowSanitizer
+from .schema import ProviderResult
+
+RowBatch = list[dict[str, Any]]
+
+# A streaming collector yields raw row batches and returns the result metadata (metrics,
+# notes, errors) with empty rows once every batch has been produced.
+RowStream = Generator[RowBatch, None, ProviderResult]
+
+
+def iter_batches(produced: ProviderResult | Iterator[RowBatch]) -> RowStream:
+    """Adapt a collector's return value to a row stream.
+
+    Plain collectors (third-party ones in particular) still return a complete
+    ``ProviderResult``; its rows become a single batch.
+    """
+    if isinstance(produced, ProviderResult):
+        rows, produced.rows = produced.rows, []
+        if rows:
+            yield rows
+        return produced
+    return (yield from produced)
+
+
+def sanitize_stream(batches: RowStream, limit: int | None) -> RowStream:
+    """Sanitize and deduplicate batches as they pass, stopping output after ``limit`` rows.
+
+    The upstream stream is still drained past the limit so its metadata is returned.
+    """
+    sanitizer = RowSanitizer(limit=limit)
+    while True:
+        try:
+            batch = next(batches)
+        except StopIteration as stop:
+            return stop.value
+        if sanitizer.exhausted:
+            continue
+        with stage("sanitize"):
+            cleaned = sanitizer.sanitize(batch)
+        if cleaned:
+            yield cleaned
+
+
+def drain(stream: RowStream, write: Callable[[RowBatch], Any]) -> ProviderResult:
+    """Hand every batch to ``write`` and return the stream's result metadata."""
+    while True:
+        try:
+            batch = next(stream)
+        except StopIteration as stop:
+            result = stop.value
+            if not isinstance(result, ProviderResult):
+                raise TypeError("collector stream did not return a ProviderResult") from None
+            return result
+        write(batch)
+
+
+def collect_result(stream: Iterator[RowBatch] | ProviderResult, row_limit: int | None) -> ProviderResult:
+    """Run a stream through the sanitize stage and return the result with its rows in memory."""
+    rows: RowBatch = []
+    result = drain(sanitize_stream(iter_batches(stream), limit=row_limit), rows.extend)
+    result.rows = rows
+    return result
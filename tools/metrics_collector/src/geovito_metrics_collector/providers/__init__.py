@@ -1,21 +1,148 @@
 from __future__ import annotations
 
-from typing import Callable
+import re
+import threading
+from collections.abc import MutableMapping
+from importlib import import_module
+from importlib.metadata import EntryPoint, entry_points
+from typing import Callable, Iterator
 
 from ..config import CollectorConfig, DateWindow
-from ..schema import ProviderName, ProviderResult, SUPPORTED_PROVIDERS
-from .adsense import collect_adsense
-from .cloudflare import collect_cloudflare
-from .ga4 import collect_ga4
-from .gsc import collect_gsc
-
-ProviderCollector = Callable[[CollectorConfig, DateWindow, int], ProviderResult]
-
-COLLECTORS: dict[ProviderName, ProviderCollector] = {
-    "ga4": collect_ga4,
-    "gsc": collect_gsc,
-    "cloudflare": collect_cloudflare,
-    "adsense": collect_adsense,
+from ..pipeline import RowStream
+from ..schema import SUPPORTED_PROVIDERS, ProviderName, ProviderResult
+
+# Either a complete result or a stream of row batches that returns the result metadata.
+ProviderCollector = Callable[[CollectorConfig, DateWindow, int], ProviderResult | RowStream]
+
+ENTRY_POINT_GROUP = "geovito_metrics_collector.providers"
+PROVIDER_NAME_PATTERN = re.compile(r"^[a-z][a-z0-9_]{0,31}$")
+
+# Builtin collectors are imported on first use, so `--providers cloudflare` never loads the
+# Google client libraries.
+BUILTIN_COLLECTORS: dict[str, str] = {
+    "ga4": "geovito_metrics_collector.providers.ga4:stream_ga4",
+    "gsc": "geovito_metrics_collector.providers.gsc:stream_gsc",
+    "cloudflare": "geovito_metrics_collector.providers.cloudflare:stream_cloudflare",
+    "adsense": "geovito_metrics_collector.providers.adsense:stream_adsense",
 }
 
-__all__ = ["COLLECTORS", "SUPPORTED_PROVIDERS", "ProviderCollector"]
+
+def _resolve_target(target: str) -> ProviderCollector:
+    module_name, _, attr = target.partition(":")
+    return getattr(import_module(module_name), attr)
+
+
+class CollectorRegistry(MutableMapping):
+    """Provider name -> collector mapping that imports collectors lazily.
+
+    Third-party packages register collectors under the ``geovito_metrics_collector.providers``
+    entry point group, e.g. ``matomo = "geovito_matomo:collect_matomo"``.
+    """
+
+    def __init__(self, builtins: dict[str, str], group: str = ENTRY_POINT_GROUP) -> None:
+        self._builtins = dict(builtins)
+        self._group = group
+        self._specs: dict[str, str | EntryPoint] = dict(builtins)
+        self._resolved: dict[str, ProviderCollector] = {}
+        self._entry_points_loaded = False
+        self._lock = threading.RLock()
+
+    def _load_entry_points(self) -> None:
+        if self._entry_points_loaded:
+            return
+        self._entry_points_loaded = True
+        for entry_point in entry_points(group=self._group):
+            if entry_point.name in self._specs or not PROVIDER_NAME_PATTERN.match(entry_point.name):
+                continue
+            self._specs[entry_point.name] = entry_point
+
+    def names(self) -> list[ProviderName]:
+        with self._lock:
+            self._load_entry_points()
+            extras = sorted(name for name in self._specs if name not in SUPPORTED_PROVIDERS)
+            return [name for name in SUPPORTED_PROVIDERS if name in self._specs] + extras
+
+    def is_registered(self, name: str) -> bool:
+        with self._lock:
+            if name in self._specs or name in self._resolved:
+                return True
+            self._load_entry_points()
+            return name in self._specs
+
+    def module_name(self, name: str) -> str | None:
+        with self._lock:
+            if name not in self._specs:
+                self._load_entry_points()
+            spec = self._specs.get(name)
+            if isinstance(spec, EntryPoint):
+                return spec.module
+            if spec is None or spec.startswith("<"):
+                return None
+            return spec.partition(":")[0]
+
+    def register(self, name: str, target: str | ProviderCollector) -> None:
+        if not PROVIDER_NAME_PATTERN.match(name):
+            raise ValueError(f"Invalid provider name: {name!r}")
+        with self._lock:
+            if callable(target):
+                self._specs[name] = f"<registered {name}>"
+                self._resolved[name] = target
+            else:
+                self._specs[name] = target
+                self._resolved.pop(name, None)
+
+    def __getitem__(self, name: str) -> ProviderCollector:
+        with self._lock:
+            collector = self._resolved.get(name)
+            if collector is not None:
+                return collector
+            if name not in self._specs:
+                self._load_entry_points()
+            spec = self._specs[name]
+            collector = spec.load() if isinstance(spec, EntryPoint) else _resolve_target(spec)
+            if not callable(collector):
+                raise TypeError(f"Provider {name!r} does not resolve to a callable collector")
+            self._resolved[name] = collector
+            return collector
+
+    def __setitem__(self, name: str, collector: ProviderCollector) -> None:
+        self.register(name, collector)
+
+    def __delitem__(self, name: str) -> None:
+        with self._lock:
+            if name not in self._specs:
+                raise KeyError(name)
+            self._resolved.pop(name, None)
+            if name in self._builtins:
+                self._specs[name] = self._builtins[name]
+            else:
+                del self._specs[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.names())
+
+    def __len__(self) -> int:
+        return len(self.names())
+
+
+COLLECTORS = CollectorRegistry(BUILTIN_COLLECTORS)
+
+
+def available_providers() -> list[ProviderName]:
+    return COLLECTORS.names()
+
+
+def is_registered_provider(name: str) -> bool:
+    return COLLECTORS.is_registered(name)
+
+
+__all__ = [
+    "BUILTIN_COLLECTORS",
+    "COLLECTORS",
+    "ENTRY_POINT_GROUP",
+    "SUPPORTED_PROVIDERS",
+    "CollectorRegistry",
+    "ProviderCollector",
+    "available_providers",
+    "is_registered_provider",
+]
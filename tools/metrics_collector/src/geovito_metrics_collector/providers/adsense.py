@@ -1,11 +1,18 @@
 from __future__ import annotations
 
-from googleapiclient.discovery import build
-
-from ..config import CollectorConfig, DateWindow, GOOGLE_SCOPE_ADSENSE, get_google_credentials
-from ..sanitize import sanitize_rows
+from ..cache import cached_fetch
+from ..config import CollectorConfig, DateWindow, GOOGLE_SCOPE_ADSENSE
+from ..credentials import get_google_credentials
+from ..google_api import GoogleClient, get_client
+from ..pipeline import RowStream, collect_result
 from ..schema import ProviderResult, make_provider_result
 
+METRIC_KEYS = {
+    "estimated_earnings": "estimatedEarnings",
+    "impressions": "impressions",
+    "page_views_rpm": "pageViewsRpm",
+}
+
 
 def _to_float(value: object) -> float:
     try:
@@ -18,18 +25,26 @@ def _is_configured(config: CollectorConfig) -> bool:
     return bool(config.google_oauth_client_secret_file)
 
 
-def _resolve_account(service, configured_account: str | None) -> str:
-    if configured_account:
-        return configured_account
+def _resolve_account(client: GoogleClient, config: CollectorConfig, date_window: DateWindow) -> str:
+    if config.adsense_account:
+        return config.adsense_account
 
-    response = service.accounts().list(pageSize=10).execute()
+    response = cached_fetch(
+        config,
+        "adsense",
+        date_window,
+        {"method": "accounts.list", "pageSize": 10},
+        lambda: client.execute(client.service.accounts().list(pageSize=10)),
+        # The accounts listed are those of whoever signed in to this token cache.
+        identity=str(config.google_token_cache),
+    )
     accounts = response.get("accounts") or []
     if not accounts:
         raise RuntimeError("AdSense account discovery failed: no accounts found")
     return str(accounts[0].get("name"))
 
 
-def collect_adsense(config: CollectorConfig, date_window: DateWindow, row_limit: int = 50) -> ProviderResult:
+def stream_adsense(config: CollectorConfig, date_window: DateWindow, row_limit: int = 50) -> RowStream:
     if not _is_configured(config):
         return make_provider_result(
             provider="adsense",
@@ -40,60 +55,53 @@ def collect_adsense(config: CollectorConfig, date_window: DateWindow, row_limit:
         )
 
     credentials = get_google_credentials(config, scopes=[GOOGLE_SCOPE_ADSENSE])
-    service = build("adsense", "v2", credentials=credentials, cache_discovery=False)
-    account_name = _resolve_account(service, config.adsense_account)
-
-    report = (
-        service.accounts()
-        .reports()
-        .generate(
-            name=account_name,
-            dateRange="CUSTOM",
-            startDate_year=date_window.start.year,
-            startDate_month=date_window.start.month,
-            startDate_day=date_window.start.day,
-            endDate_year=date_window.end.year,
-            endDate_month=date_window.end.month,
-            endDate_day=date_window.end.day,
-            metrics=["ESTIMATED_EARNINGS", "IMPRESSIONS", "PAGE_VIEWS_RPM"],
-            dimensions=["DATE"],
-            orderBy=["+DATE"],
-            limit=max(1, int(row_limit)),
-        )
-        .execute()
-    )
-
-    totals = report.get("totals") or []
-    totals_values = [item.get("value") for item in totals if isinstance(item, dict)]
-    metrics = {
-        "estimatedEarnings": _to_float(totals_values[0] if len(totals_values) > 0 else 0),
-        "impressions": _to_float(totals_values[1] if len(totals_values) > 1 else 0),
-        "pageViewsRpm": _to_float(totals_values[2] if len(totals_values) > 2 else 0),
+    client = get_client(config, "adsense", "v2", credentials)
+    account_name = _resolve_account(client, config, date_window)
+
+    report_params = {
+        "account": account_name,
+        "dateRange": "CUSTOM",
+        "startDate_year": date_window.start.year,
+        "startDate_month": date_window.start.month,
+        "startDate_day": date_window.start.day,
+        "endDate_year": date_window.end.year,
+        "endDate_month": date_window.end.month,
+        "endDate_day": date_window.end.day,
+        "metrics": ["ESTIMATED_EARNINGS", "IMPRESSIONS", "PAGE_VIEWS_RPM"],
+        "dimensions": ["DATE"],
+        "orderBy": ["+DATE"],
+        "limit": max(1, int(row_limit)),
     }
+    report = cached_fetch(
+        config,
+        "adsense",
+        date_window,
+        {"method": "reports.generate", "params": report_params},
+        lambda: client.execute(client.service.accounts().reports().generate(**report_params)),
+    )
 
     headers = report.get("headers") or []
     header_names = [str(header.get("name", "")).lower() for header in headers]
 
-    rows: list[dict[str, object]] = []
-    for row in report.get("rows") or []:
+    def parse_cells(row: dict) -> dict[str, object]:
         cells = row.get("cells") or []
         values = [cell.get("value") if isinstance(cell, dict) else None for cell in cells]
 
-        row_data: dict[str, object] = {"kind": "daily"}
+        row_data: dict[str, object] = {}
         for name, value in zip(header_names, values):
             if name == "date":
                 row_data["date"] = str(value or "")
-            elif name in {"estimated_earnings", "impressions", "page_views_rpm"}:
-                key = {
-                    "estimated_earnings": "estimatedEarnings",
-                    "impressions": "impressions",
-                    "page_views_rpm": "pageViewsRpm",
-                }[name]
-                row_data[key] = _to_float(value)
+            elif name in METRIC_KEYS:
+                row_data[METRIC_KEYS[name]] = _to_float(value)
+        return row_data
 
-        rows.append(row_data)
+    # Totals come back as one row of cells in header order (the DATE cell is empty).
+    totals = parse_cells(report.get("totals") or {})
+    metrics = {key: float(totals.get(key, 0.0)) for key in METRIC_KEYS.values()}
+    rows = [{"kind": "daily", **parse_cells(row)} for row in report.get("rows") or []]
 
     rows.sort(key=lambda item: str(item.get("date", "")))
+    yield rows
 
     notes = [f"account={account_name}"]
     if not config.adsense_account:
@@ -104,6 +112,9 @@ def collect_adsense(config: CollectorConfig, date_window: DateWindow, row_limit:
         start=date_window.start,
         end=date_window.end,
         metrics=metrics,
-        rows=sanitize_rows(rows, limit=row_limit),
         notes=notes,
     )
+
+
+def collect_adsense(config: CollectorConfig, date_window: DateWindow, row_limit: int = 50) -> ProviderResult:
+    return collect_result(stream_adsense(config, date_window, row_limit), row_limit)
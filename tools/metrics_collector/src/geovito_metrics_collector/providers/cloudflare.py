@@ -1,15 +1,25 @@
 from __future__ import annotations
 
+import threading
+from contextlib import contextmanager
 from datetime import datetime, time, timedelta, timezone
-from typing import Any
+from typing import Any, Iterator
 
 import requests
 
+from ..cache import cached_fetch
 from ..config import CollectorConfig, DateWindow
-from ..sanitize import sanitize_path, sanitize_rows
+from ..instrument import record
+from ..pipeline import RowStream, collect_result
+from ..sanitize import sanitize_path
+from ..scheduler import RateLimited, parse_retry_after, schedule
 from ..schema import ProviderResult, make_provider_result
 
 CLOUDFLARE_GRAPHQL_URL = "https://api.cloudflare.com/client/v4/graphql"
+CLOUDFLARE_GRAPHQL_PATH = "/client/v4/graphql"
+
+_idle_sessions: list[requests.Session] = []
+_sessions_lock = threading.Lock()
 
 
 ZONE_QUERY = """
@@ -120,22 +130,51 @@ def _window_to_datetimes(date_window: DateWindow) -> tuple[str, str]:
     return start_dt.isoformat().replace("+00:00", "Z"), end_dt.isoformat().replace("+00:00", "Z")
 
 
-def _post_graphql(token: str, query: str, variables: dict[str, Any]) -> dict[str, Any]:
-    response = requests.post(
-        CLOUDFLARE_GRAPHQL_URL,
-        json={"query": query, "variables": variables},
-        headers={"Authorization": f"Bearer {token}", "Content-Type": "application/json"},
-        timeout=45,
-    )
+def _is_rate_limit_error(error: dict[str, Any]) -> bool:
+    # GraphQL limits come back as HTTP 200 with an error entry rather than a 429.
+    code = str((error.get("extensions") or {}).get("code", "")).lower()
+    return code in {"ratelimit", "limit"} or "rate limit" in str(error.get("message", "")).lower()
+
+
+@contextmanager
+def _borrowed_session() -> Iterator[requests.Session]:
+    # Keeps the TLS connection to the API open between runs of a long-lived process.
+    with _sessions_lock:
+        session = _idle_sessions.pop() if _idle_sessions else requests.Session()
+    try:
+        yield session
+    finally:
+        with _sessions_lock:
+            _idle_sessions.append(session)
+
+
+def _graphql_url(config: CollectorConfig) -> str:
+    if config.api_base_url:
+        return config.api_base_url.rstrip("/") + CLOUDFLARE_GRAPHQL_PATH
+    return CLOUDFLARE_GRAPHQL_URL
+
+
+def _post_graphql(url: str, token: str, query: str, variables: dict[str, Any]) -> dict[str, Any]:
+    with _borrowed_session() as session:
+        response = session.post(
+            url,
+            json={"query": query, "variables": variables},
+            headers={"Authorization": f"Bearer {token}", "Content-Type": "application/json"},
+            timeout=45,
+        )
+    record("cloudflare", http_bytes=len(response.content))
     response.raise_for_status()
     payload = response.json()
     if payload.get("errors"):
         messages = "; ".join(str(err.get("message", "unknown error")) for err in payload["errors"])
+        if any(_is_rate_limit_error(err) for err in payload["errors"]):
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            raise RateLimited(f"Cloudflare GraphQL error: {messages}", retry_after)
         raise RuntimeError(f"Cloudflare GraphQL error: {messages}")
     return payload
 
 
-def collect_cloudflare(config: CollectorConfig, date_window: DateWindow, row_limit: int = 50) -> ProviderResult:
+def stream_cloudflare(config: CollectorConfig, date_window: DateWindow, row_limit: int = 50) -> RowStream:
     if not _is_configured(config):
         return make_provider_result(
             provider="cloudflare",
@@ -159,7 +198,16 @@ def collect_cloudflare(config: CollectorConfig, date_window: DateWindow, row_lim
         query = ACCOUNT_QUERY
         variables["accountTag"] = config.cloudflare_account_id
 
-    payload = _post_graphql(str(config.cloudflare_api_token), query, variables)
+    payload = cached_fetch(
+        config,
+        "cloudflare",
+        date_window,
+        {"query": query, "variables": variables},
+        lambda: schedule(
+            "cloudflare",
+            lambda: _post_graphql(_graphql_url(config), str(config.cloudflare_api_token), query, variables),
+        ),
+    )
     viewer = payload.get("data", {}).get("viewer", {})
 
     if config.cloudflare_zone_id:
@@ -211,6 +259,8 @@ def collect_cloudflare(config: CollectorConfig, date_window: DateWindow, row_lim
         )
 
     path_rows.sort(key=lambda item: (-float(item.get("requests", 0)), -float(item.get("bytes", 0)), str(item.get("path", ""))))
+    yield path_rows
+    yield status_rows
 
     metrics = {
         "requests": requests_total,
@@ -224,6 +274,9 @@ def collect_cloudflare(config: CollectorConfig, date_window: DateWindow, row_lim
         start=date_window.start,
         end=date_window.end,
         metrics=metrics,
-        rows=sanitize_rows(path_rows + status_rows, limit=row_limit),
         notes=["source=cloudflare_graphql", "mode=zone" if config.cloudflare_zone_id else "mode=account"],
     )
+
+
+def collect_cloudflare(config: CollectorConfig, date_window: DateWindow, row_limit: int = 50) -> ProviderResult:
+    return collect_result(stream_cloudflare(config, date_window, row_limit), row_limit)
@@ -1,11 +1,22 @@
 from __future__ import annotations
 
-from googleapiclient.discovery import build
+from concurrent.futures import ThreadPoolExecutor
 
-from ..config import CollectorConfig, DateWindow, GOOGLE_SCOPE_GA4, get_google_credentials
-from ..sanitize import sanitize_path, sanitize_rows
+from ..cache import cached_fetch, carry_archive
+from ..config import CollectorConfig, DateWindow, GOOGLE_SCOPE_GA4
+from ..credentials import get_google_credentials
+from ..exports import RowExport, export_path
+from ..google_api import GoogleClient, get_client
+from ..pipeline import RowStream, collect_result
+from ..sanitize import sanitize_path
+from ..scheduler import get_scheduler
 from ..schema import ProviderResult, make_provider_result
 
+TOTAL_METRICS = ("sessions", "activeUsers", "screenPageViews")
+EXPORT_PAGE_SIZE = 100_000
+# Property quotas whose remaining share paces further requests (see `scheduler.observe_headroom`).
+PACED_QUOTAS = ("tokensPerHour", "tokensPerDay", "tokensPerProjectPerHour")
+
 
 def _to_float(value: object) -> float:
     try:
@@ -18,7 +29,184 @@ def _is_configured(config: CollectorConfig) -> bool:
     return bool(config.ga4_property_id and config.google_oauth_client_secret_file)
 
 
-def collect_ga4(config: CollectorConfig, date_window: DateWindow, row_limit: int = 50) -> ProviderResult:
+def property_ids(config: CollectorConfig) -> list[str]:
+    raw = config.ga4_property_id or ""
+    ids: list[str] = []
+    for part in raw.split(","):
+        cleaned = part.strip().removeprefix("properties/")
+        if cleaned and cleaned not in ids:
+            ids.append(cleaned)
+    return ids
+
+
+def _pages_request(date_window: DateWindow, limit: int, offset: int = 0) -> dict:
+    body = {
+        "dateRanges": [{"startDate": str(date_window.start), "endDate": str(date_window.end)}],
+        "dimensions": [{"name": "pagePath"}],
+        "metrics": [{"name": "sessions"}, {"name": "screenPageViews"}],
+        "orderBys": [
+            {"metric": {"metricName": "screenPageViews"}, "desc": True},
+            {"dimension": {"dimensionName": "pagePath"}},
+        ],
+        "limit": max(1, int(limit)),
+        "returnPropertyQuota": True,
+    }
+    if offset:
+        body["offset"] = offset
+    return body
+
+
+def _report_requests(date_window: DateWindow, row_limit: int) -> list[dict]:
+    return [
+        {
+            "dateRanges": [{"startDate": str(date_window.start), "endDate": str(date_window.end)}],
+            "metrics": [{"name": name} for name in TOTAL_METRICS],
+            "returnPropertyQuota": True,
+        },
+        _pages_request(date_window, row_limit),
+    ]
+
+
+def _observe_quota(property_name: str, report: dict) -> None:
+    quota = report.get("propertyQuota") or {}
+    fractions = []
+    for name in PACED_QUOTAS:
+        status = quota.get(name) or {}
+        consumed = _to_float(status.get("consumed"))
+        remaining = _to_float(status.get("remaining"))
+        if consumed + remaining > 0:
+            fractions.append(remaining / (consumed + remaining))
+    if fractions:
+        get_scheduler("ga4").observe_headroom(property_name, min(fractions))
+
+
+def _execute_report(client: GoogleClient, property_name: str, request) -> dict:
+    response = client.execute(request)
+    # Only fresh responses report quota; cached ones did not spend any.
+    for report in response.get("reports") or [response]:
+        _observe_quota(property_name, report)
+    return response
+
+
+def _batch_run_reports(
+    client: GoogleClient,
+    config: CollectorConfig,
+    date_window: DateWindow,
+    property_name: str,
+    requests: list[dict],
+) -> list[dict]:
+    body = {"requests": requests}
+    response = cached_fetch(
+        config,
+        "ga4",
+        date_window,
+        {"method": "batchRunReports", "property": property_name, "body": body},
+        lambda: _execute_report(
+            client, property_name, client.service.properties().batchRunReports(property=property_name, body=body)
+        ),
+    )
+    reports = response.get("reports") or []
+    if len(reports) != len(requests):
+        raise RuntimeError(f"GA4 batchRunReports returned {len(reports)} reports for {len(requests)} requests")
+    return reports
+
+
+def _parse_totals(report: dict) -> dict[str, float]:
+    totals = (report.get("totals") or [{}])[0]
+    total_values = totals.get("metricValues") or []
+    return {
+        name: _to_float((total_values[index] if len(total_values) > index else {}).get("value"))
+        for index, name in enumerate(TOTAL_METRICS)
+    }
+
+
+def _parse_page_rows(report: dict, property_id: str | None = None) -> list[dict[str, object]]:
+    page_rows: list[dict[str, object]] = []
+    for row in report.get("rows") or []:
+        dim_values = row.get("dimensionValues") or []
+        metric_values = row.get("metricValues") or []
+
+        path = (dim_values[0] if len(dim_values) > 0 else {}).get("value", "")
+        sessions = _to_float((metric_values[0] if len(metric_values) > 0 else {}).get("value"))
+        pageviews = _to_float((metric_values[1] if len(metric_values) > 1 else {}).get("value"))
+
+        page_row: dict[str, object] = {
+            "page": sanitize_path(str(path)),
+            "sessions": sessions,
+            "pageviews": pageviews,
+        }
+        if property_id is not None:
+            page_row["property"] = property_id
+        page_rows.append(page_row)
+    return page_rows
+
+
+def _collect_property(
+    client: GoogleClient,
+    config: CollectorConfig,
+    date_window: DateWindow,
+    property_id: str,
+    row_limit: int,
+    tag_rows: bool,
+) -> tuple[dict[str, float], list[dict[str, object]]]:
+    totals_report, pages_report = _batch_run_reports(
+        client,
+        config,
+        date_window,
+        f"properties/{property_id}",
+        _report_requests(date_window, row_limit),
+    )
+    return _parse_totals(totals_report), _parse_page_rows(pages_report, property_id if tag_rows else None)
+
+
+def _export_pages(client: GoogleClient, config: CollectorConfig, date_window: DateWindow, ids: list[str], path) -> RowExport:
+    """Stream every pagePath row, page by page via offset pagination, into a JSONL export."""
+    export = RowExport(path, "ga4 pages export")
+    if export.position is not None and export.position.get("property") not in ids:
+        export.restart()
+    position = export.position or {"property": ids[0], "offset": 0}
+
+    try:
+        for index in range(ids.index(str(position["property"])), len(ids)):
+            property_id = ids[index]
+            property_name = f"properties/{property_id}"
+            offset = int(position["offset"]) if property_id == position["property"] else 0
+            while True:
+                body = _pages_request(date_window, EXPORT_PAGE_SIZE, offset)
+                response = cached_fetch(
+                    config,
+                    "ga4",
+                    date_window,
+                    {"method": "runReport", "property": property_name, "body": body},
+                    lambda: _execute_report(
+                        client, property_name, client.service.properties().runReport(property=property_name, body=body)
+                    ),
+                    cacheable=False,
+                )
+                page = response.get("rows") or []
+                total = int(response.get("rowCount") or 0)
+                offset += len(page)
+                finished = not page or offset >= total
+                if not finished:
+                    next_position = {"property": property_id, "offset": offset}
+                elif index + 1 < len(ids):
+                    next_position = {"property": ids[index + 1], "offset": 0}
+                else:
+                    next_position = {"property": property_id, "offset": offset, "done": True}
+
+                tag = property_id if len(ids) > 1 else None
+                export.append_page(_parse_page_rows(response, tag), next_position, total=total)
+                if finished:
+                    break
+    except Exception as exc:
+        export.close()
+        raise RuntimeError(f"GA4 pages export stopped at {export.position}; re-run to resume: {exc}") from exc
+
+    export.commit()
+    return export
+
+
+def stream_ga4(config: CollectorConfig, date_window: DateWindow, row_limit: int = 50) -> RowStream:
     if not _is_configured(config):
         return make_provider_result(
             provider="ga4",
@@ -29,71 +217,56 @@ def collect_ga4(config: CollectorConfig, date_window: DateWindow, row_limit: int
         )
 
     credentials = get_google_credentials(config, scopes=[GOOGLE_SCOPE_GA4])
-    service = build("analyticsdata", "v1beta", credentials=credentials, cache_discovery=False)
-    property_name = f"properties/{config.ga4_property_id}"
-
-    totals_resp = (
-        service.properties()
-        .runReport(
-            property=property_name,
-            body={
-                "dateRanges": [{"startDate": str(date_window.start), "endDate": str(date_window.end)}],
-                "metrics": [{"name": "sessions"}, {"name": "activeUsers"}, {"name": "screenPageViews"}],
-            },
+    client = get_client(config, "analyticsdata", "v1beta", credentials)
+    ids = property_ids(config)
+
+    with ThreadPoolExecutor(max_workers=min(8, len(ids)), thread_name_prefix="ga4-property") as pool:
+        per_property = list(
+            pool.map(
+                # Property threads archive into (or replay from) this run's archive.
+                carry_archive(
+                    lambda property_id: _collect_property(client, config, date_window, property_id, row_limit, len(ids) > 1)
+                ),
+                ids,
+            )
         )
-        .execute()
-    )
 
-    totals = (totals_resp.get("totals") or [{}])[0]
-    total_values = totals.get("metricValues") or []
-    metrics = {
-        "sessions": _to_float((total_values[0] if len(total_values) > 0 else {}).get("value")),
-        "activeUsers": _to_float((total_values[1] if len(total_values) > 1 else {}).get("value")),
-        "screenPageViews": _to_float((total_values[2] if len(total_values) > 2 else {}).get("value")),
-    }
+    metrics = {name: 0.0 for name in TOTAL_METRICS}
+    page_rows: list[dict[str, object]] = []
+    for property_id, (property_metrics, property_rows) in zip(ids, per_property):
+        for name in TOTAL_METRICS:
+            metrics[name] += property_metrics[name]
+        page_rows.extend(property_rows)
 
-    top_pages_resp = (
-        service.properties()
-        .runReport(
-            property=property_name,
-            body={
-                "dateRanges": [{"startDate": str(date_window.start), "endDate": str(date_window.end)}],
-                "dimensions": [{"name": "pagePath"}],
-                "metrics": [{"name": "sessions"}, {"name": "screenPageViews"}],
-                "orderBys": [
-                    {"metric": {"metricName": "screenPageViews"}, "desc": True},
-                    {"dimension": {"dimensionName": "pagePath"}},
-                ],
-                "limit": max(1, int(row_limit)),
-            },
+    page_rows.sort(
+        key=lambda item: (
+            -float(item.get("pageviews", 0)),
+            -float(item.get("sessions", 0)),
+            str(item.get("page", "")),
+            str(item.get("property", "")),
         )
-        .execute()
     )
 
-    page_rows: list[dict[str, object]] = []
-    for row in top_pages_resp.get("rows", []):
-        dim_values = row.get("dimensionValues") or []
-        metric_values = row.get("metricValues") or []
+    notes = [f"top_pages={min(len(page_rows), row_limit)}"]
+    yield page_rows
 
-        path = (dim_values[0] if len(dim_values) > 0 else {}).get("value", "")
-        sessions = _to_float((metric_values[0] if len(metric_values) > 0 else {}).get("value"))
-        pageviews = _to_float((metric_values[1] if len(metric_values) > 1 else {}).get("value"))
-
-        page_rows.append(
-            {
-                "page": sanitize_path(str(path)),
-                "sessions": sessions,
-                "pageviews": pageviews,
-            }
-        )
+    if len(ids) > 1:
+        notes.append(f"properties={','.join(ids)}")
+        notes.append("activeUsers is summed across properties and may double-count users")
 
-    page_rows.sort(key=lambda item: (-float(item.get("pageviews", 0)), -float(item.get("sessions", 0)), str(item.get("page", ""))))
+    pages_export_path = export_path(config, date_window, "ga4", "pages")
+    if pages_export_path is not None:
+        export = _export_pages(client, config, date_window, ids, pages_export_path)
+        notes.append(f"pages_export={pages_export_path.name} rows={export.rows_written}")
 
     return make_provider_result(
         provider="ga4",
         start=date_window.start,
         end=date_window.end,
         metrics=metrics,
-        rows=sanitize_rows(page_rows, limit=row_limit),
-        notes=[f"top_pages={min(len(page_rows), row_limit)}"],
+        notes=notes,
     )
+
+
+def collect_ga4(config: CollectorConfig, date_window: DateWindow, row_limit: int = 50) -> ProviderResult:
+    return collect_result(stream_ga4(config, date_window, row_limit), row_limit)
@@ -1,11 +1,24 @@
 from __future__ import annotations
 
-from googleapiclient.discovery import build
+from concurrent.futures import ThreadPoolExecutor
 
-from ..config import CollectorConfig, DateWindow, GOOGLE_SCOPE_GSC, get_google_credentials
-from ..sanitize import sanitize_path, sanitize_query, sanitize_rows
+from ..cache import cached_fetch, carry_archive
+from ..config import CollectorConfig, DateWindow, GOOGLE_SCOPE_GSC
+from ..credentials import get_google_credentials
+from ..exports import RowExport, export_path
+from ..google_api import GoogleClient, get_client
+from ..pipeline import RowStream, collect_result
+from ..sanitize import sanitize_path, sanitize_query
 from ..schema import ProviderResult, make_provider_result
 
+EXPORT_PAGE_SIZE = 25_000
+EXPORT_DIMENSIONS = ("query", "page")
+BREAKDOWN_DIMENSIONS = ("query", "page", "country", "device")
+COMBINED_PAGE_SIZE = 25_000
+# The cross product grows much faster than any one dimension. Past this many pages combined
+# mode would cost more calls than the five separate queries, so it falls back to them.
+COMBINED_MAX_PAGES = 2
+
 
 def _to_float(value: object) -> float:
     try:
@@ -18,8 +31,148 @@ def _is_configured(config: CollectorConfig) -> bool:
     return bool(config.gsc_site_url and config.google_oauth_client_secret_file)
 
 
-def _run_query(service, site_url: str, body: dict) -> dict:
-    return service.searchanalytics().query(siteUrl=site_url, body=body).execute()
+def _run_query(
+    client: GoogleClient, config: CollectorConfig, date_window: DateWindow, site_url: str, body: dict, cacheable: bool = True
+) -> dict:
+    return cached_fetch(
+        config,
+        "gsc",
+        date_window,
+        {"method": "searchanalytics.query", "siteUrl": site_url, "body": body},
+        lambda: client.execute(client.service.searchanalytics().query(siteUrl=site_url, body=body)),
+        cacheable=cacheable,
+    )
+
+
+def _prepare_value(kind: str, value: str) -> str:
+    if kind == "page":
+        return sanitize_path(value)
+    if kind == "query":
+        return sanitize_query(value)
+    return value
+
+
+def _prepare_row(kind: str, row: dict) -> dict[str, object]:
+    keys = row.get("keys") or []
+    return {
+        "kind": kind,
+        "value": _prepare_value(kind, str(keys[0]) if keys else ""),
+        "clicks": _to_float(row.get("clicks")),
+        "impressions": _to_float(row.get("impressions")),
+        "ctr": _to_float(row.get("ctr")),
+        "position": _to_float(row.get("position")),
+    }
+
+
+def _export_dimension(client: GoogleClient, config: CollectorConfig, date_window: DateWindow, site_url: str, dimension: str, path) -> RowExport:
+    """Page through every row of one dimension with ``startRow`` and append each page to disk."""
+    export = RowExport(path, f"gsc {dimension} export")
+    start_row = int((export.position or {}).get("startRow", 0))
+
+    try:
+        while True:
+            response = _run_query(
+                client,
+                config,
+                date_window,
+                site_url,
+                {
+                    "startDate": str(date_window.start),
+                    "endDate": str(date_window.end),
+                    "dimensions": [dimension],
+                    "rowLimit": EXPORT_PAGE_SIZE,
+                    "startRow": start_row,
+                },
+                cacheable=False,
+            )
+            page = response.get("rows") or []
+            start_row += len(page)
+            finished = len(page) < EXPORT_PAGE_SIZE
+            next_position: dict[str, object] = {"startRow": start_row}
+            if finished:
+                next_position["done"] = True
+            export.append_page((_prepare_row(dimension, row) for row in page), next_position)
+            if finished:
+                break
+    except Exception as exc:
+        export.close()
+        raise RuntimeError(f"GSC {dimension} export stopped at startRow={start_row}; re-run to resume: {exc}") from exc
+
+    export.commit()
+    return export
+
+
+def _ratio_stats(clicks: float, impressions: float, weighted_position: float) -> dict[str, float]:
+    return {
+        "clicks": clicks,
+        "impressions": impressions,
+        "ctr": clicks / impressions if impressions else 0.0,
+        "position": weighted_position / impressions if impressions else 0.0,
+    }
+
+
+def _combined_breakdown(
+    client: GoogleClient,
+    config: CollectorConfig,
+    date_window: DateWindow,
+    site_url: str,
+    row_limit: int,
+) -> tuple[dict[str, float], list[dict[str, object]]] | None:
+    """Fetch query x page x country x device rows once and derive totals and marginals locally.
+
+    Position is impression-weighted. GSC drops anonymized queries from any request that
+    includes the query dimension, so these numbers undercount the property totals.
+    Returns None when the breakdown needs more than `COMBINED_MAX_PAGES` pages.
+    """
+    # (kind, value) -> [clicks, impressions, impression-weighted position]
+    marginals: dict[tuple[str, str], list[float]] = {}
+    totals = [0.0, 0.0, 0.0]
+    start_row = 0
+
+    for _ in range(COMBINED_MAX_PAGES):
+        response = _run_query(
+            client,
+            config,
+            date_window,
+            site_url,
+            {
+                "startDate": str(date_window.start),
+                "endDate": str(date_window.end),
+                "dimensions": list(BREAKDOWN_DIMENSIONS),
+                "rowLimit": COMBINED_PAGE_SIZE,
+                "startRow": start_row,
+            },
+        )
+        page = response.get("rows") or []
+        for row in page:
+            clicks = _to_float(row.get("clicks"))
+            impressions = _to_float(row.get("impressions"))
+            weighted_position = _to_float(row.get("position")) * impressions
+            totals[0] += clicks
+            totals[1] += impressions
+            totals[2] += weighted_position
+            for kind, key in zip(BREAKDOWN_DIMENSIONS, row.get("keys") or []):
+                bucket = marginals.setdefault((kind, _prepare_value(kind, str(key))), [0.0, 0.0, 0.0])
+                bucket[0] += clicks
+                bucket[1] += impressions
+                bucket[2] += weighted_position
+
+        start_row += len(page)
+        if len(page) < COMBINED_PAGE_SIZE:
+            break
+    else:
+        return None
+
+    rows: list[dict[str, object]] = []
+    for kind in BREAKDOWN_DIMENSIONS:
+        kind_rows = [
+            {"kind": kind, "value": value, **_ratio_stats(*sums)}
+            for (row_kind, value), sums in marginals.items()
+            if row_kind == kind
+        ]
+        rows.extend(_sorted_rows(kind_rows)[: max(1, int(row_limit))])
+
+    return _ratio_stats(*totals), rows
 
 
 def _sorted_rows(rows: list[dict[str, object]]) -> list[dict[str, object]]:
@@ -34,7 +187,7 @@ def _sorted_rows(rows: list[dict[str, object]]) -> list[dict[str, object]]:
     )
 
 
-def collect_gsc(config: CollectorConfig, date_window: DateWindow, row_limit: int = 50) -> ProviderResult:
+def stream_gsc(config: CollectorConfig, date_window: DateWindow, row_limit: int = 50) -> RowStream:
     if not _is_configured(config):
         return make_provider_result(
             provider="gsc",
@@ -45,71 +198,75 @@ def collect_gsc(config: CollectorConfig, date_window: DateWindow, row_limit: int
         )
 
     credentials = get_google_credentials(config, scopes=[GOOGLE_SCOPE_GSC])
-    service = build("searchconsole", "v1", credentials=credentials, cache_discovery=False)
+    client = get_client(config, "searchconsole", "v1", credentials)
     site_url = str(config.gsc_site_url)
 
-    totals_resp = _run_query(
-        service,
-        site_url,
-        {
-            "startDate": str(date_window.start),
-            "endDate": str(date_window.end),
-            "rowLimit": 1,
-        },
-    )
-
-    total_row = (totals_resp.get("rows") or [{}])[0]
-    metrics = {
-        "clicks": _to_float(total_row.get("clicks")),
-        "impressions": _to_float(total_row.get("impressions")),
-        "ctr": _to_float(total_row.get("ctr")),
-        "position": _to_float(total_row.get("position")),
-    }
+    date_range = {"startDate": str(date_window.start), "endDate": str(date_window.end)}
 
-    def dimension_rows(dimension: str, kind: str) -> list[dict[str, object]]:
+    def dimension_rows(dimension: str) -> list[dict[str, object]]:
         response = _run_query(
-            service,
+            client,
+            config,
+            date_window,
             site_url,
-            {
-                "startDate": str(date_window.start),
-                "endDate": str(date_window.end),
-                "dimensions": [dimension],
-                "rowLimit": max(1, int(row_limit)),
-            },
+            {**date_range, "dimensions": [dimension], "rowLimit": max(1, int(row_limit))},
         )
-        prepared: list[dict[str, object]] = []
-        for row in response.get("rows", []):
-            keys = row.get("keys") or []
-            value = str(keys[0]) if keys else ""
-            if kind == "page":
-                value = sanitize_path(value)
-            elif kind == "query":
-                value = sanitize_query(value)
-
-            prepared.append(
-                {
-                    "kind": kind,
-                    "value": value,
-                    "clicks": _to_float(row.get("clicks")),
-                    "impressions": _to_float(row.get("impressions")),
-                    "ctr": _to_float(row.get("ctr")),
-                    "position": _to_float(row.get("position")),
-                }
+        return _sorted_rows([_prepare_row(dimension, row) for row in response.get("rows", [])])
+
+    combined = None
+    if config.gsc_combined_dimensions:
+        combined = _combined_breakdown(client, config, date_window, site_url, row_limit)
+
+    if combined is not None:
+        metrics, rows = combined
+        yield rows
+        notes = [
+            "rows include top query/page/country/device segments",
+            "combined_dimensions=true: totals and segments are derived from one query/page/country/device "
+            "breakdown and are approximate (GSC omits anonymized queries; position is impression-weighted)",
+        ]
+    else:
+        # The totals and per-dimension queries are independent, so they share one service concurrently.
+        with ThreadPoolExecutor(max_workers=1 + len(BREAKDOWN_DIMENSIONS), thread_name_prefix="gsc-query") as pool:
+            totals_future = pool.submit(
+                carry_archive(_run_query), client, config, date_window, site_url, {**date_range, "rowLimit": 1}
             )
-        return _sorted_rows(prepared)
+            dimension_futures = [
+                pool.submit(carry_archive(dimension_rows), dimension) for dimension in BREAKDOWN_DIMENSIONS
+            ]
+            for future in dimension_futures:
+                yield future.result()
+            totals_resp = totals_future.result()
 
-    rows = (
-        dimension_rows("query", "query")
-        + dimension_rows("page", "page")
-        + dimension_rows("country", "country")
-        + dimension_rows("device", "device")
-    )
+        total_row = (totals_resp.get("rows") or [{}])[0]
+        metrics = {
+            "clicks": _to_float(total_row.get("clicks")),
+            "impressions": _to_float(total_row.get("impressions")),
+            "ctr": _to_float(total_row.get("ctr")),
+            "position": _to_float(total_row.get("position")),
+        }
+        notes = ["rows include top query/page/country/device segments"]
+        if config.gsc_combined_dimensions:
+            notes.append(
+                f"combined_dimensions=true: breakdown exceeded {COMBINED_MAX_PAGES} pages; "
+                "used per-dimension queries instead"
+            )
+
+    for dimension in EXPORT_DIMENSIONS:
+        dimension_export_path = export_path(config, date_window, "gsc", dimension)
+        if dimension_export_path is None:
+            continue
+        export = _export_dimension(client, config, date_window, site_url, dimension, dimension_export_path)
+        notes.append(f"{dimension}_export={dimension_export_path.name} rows={export.rows_written}")
 
     return make_provider_result(
         provider="gsc",
         start=date_window.start,
         end=date_window.end,
         metrics=metrics,
-        rows=sanitize_rows(rows, limit=row_limit),
-        notes=["rows include top query/page/country/device segments"],
+        notes=notes,
     )
+
+
+def collect_gsc(config: CollectorConfig, date_window: DateWindow, row_limit: int = 50) -> ProviderResult:
+    return collect_result(stream_gsc(config, date_window, row_limit), row_limit)
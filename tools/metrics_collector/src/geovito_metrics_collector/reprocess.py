@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import date
+from pathlib import Path
+from typing import Sequence
+
+from .archive import ArchiveReader, archive_path, archived_providers
+from .cache import bind_archive
+from .columnar import partition_formats, write_columnar
+from .providers import available_providers
+from .rollups import update_rollups
+from .runner import CollectionAborted, Echo, collect_providers
+from .schema import ProviderName, ProviderResult
+from .storage import build_summary, stored_results, write_results
+from .warehouse import upsert_results
+
+
+@dataclass
+class ReprocessedDay:
+    day: date
+    results: list[ProviderResult] = field(default_factory=list)
+    errors: list[str] = field(default_factory=list)
+    output_dir: Path | None = None
+
+
+@dataclass
+class ReprocessReport:
+    written: list[date] = field(default_factory=list)
+    failed: dict[date, list[str]] = field(default_factory=dict)
+
+
+def replay_archive(path: Path) -> ProviderResult:
+    """Run an archived provider again through its collector and the sanitizer, offline."""
+    archive = ArchiveReader(path)
+    with bind_archive(archive):
+        [result] = collect_providers(
+            archive.replay_config(), archive.date_window, [archive.provider], row_limit=archive.row_limit, timeout=None
+        )
+    result.notes.append(f"reprocessed from archive archived_at={archive.header['archived_at']}")
+    return result
+
+
+def reprocess_day(
+    out_root: Path,
+    day: date,
+    providers: Sequence[ProviderName] | None = None,
+    pretty: bool = False,
+    compression: str | None = None,
+) -> ReprocessedDay:
+    """Rebuild one date directory's archived provider files and its summary.
+
+    Providers without an archive, or whose archive cannot be replayed, keep their stored files.
+    Runs in a worker process of `run_reprocess`.
+    """
+    outcome = ReprocessedDay(day)
+    for provider in archived_providers(out_root, day):
+        if providers is not None and provider not in providers:
+            continue
+        try:
+            outcome.results.append(replay_archive(archive_path(out_root, day, provider)))
+        except CollectionAborted as exc:
+            outcome.errors.extend(exc.errors)
+        except Exception as exc:  # noqa: BLE001
+            # Unreadable or incompatible archive.
+            outcome.errors.append(f"{provider}: {exc}")
+    if not outcome.results:
+        return outcome
+
+    rebuilt = [result.provider for result in outcome.results]
+    order = {name: index for index, name in enumerate(available_providers())}
+    everything = sorted(
+        [*outcome.results, *stored_results(out_root / day.isoformat(), exclude=rebuilt)],
+        key=lambda result: order.get(result.provider, len(order)),
+    )
+    outcome.output_dir = write_results(
+        out_root, day, outcome.results, build_summary(everything), pretty=pretty, compression=compression
+    )
+    return outcome
+
+
+def _rewrite_columnar(out_root: Path, outcome: ReprocessedDay) -> None:
+    # Only partitions that already exist are rewritten, in the format they were written in.
+    for result in outcome.results:
+        for fmt in partition_formats(out_root, result.provider, outcome.day):
+            write_columnar(out_root, outcome.day, [result], fmt)
+
+
+def run_reprocess(
+    out_root: Path,
+    days: Sequence[date],
+    providers: Sequence[ProviderName] | None = None,
+    workers: int | None = None,
+    pretty: bool = False,
+    compression: str | None = None,
+    warehouse_path: Path | None = None,
+    echo: Echo | None = None,
+) -> ReprocessReport:
+    """Reprocess ``days`` across a process pool (one day per task, every core by default).
+
+    Columnar partitions of the rebuilt providers, rollups and the warehouse are updated here,
+    one day at a time, as the workers finish.
+    """
+    emit = echo or (lambda _: None)
+    report = ReprocessReport()
+    max_workers = max(1, min(workers or os.cpu_count() or 1, len(days) or 1))
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(reprocess_day, out_root, day, providers, pretty, compression) for day in days]
+        for future in as_completed(futures):
+            outcome = future.result()
+            if outcome.errors:
+                report.failed[outcome.day] = outcome.errors
+                for err in outcome.errors:
+                    emit(f"- {outcome.day.isoformat()}: {err}")
+            if outcome.output_dir is None:
+                continue
+            try:
+                _rewrite_columnar(out_root, outcome)
+            except RuntimeError as exc:
+                # pyarrow no longer installed; the JSON files are already rebuilt.
+                report.failed.setdefault(outcome.day, []).append(f"columnar: {exc}")
+                emit(f"- {outcome.day.isoformat()}: columnar: {exc}")
+            update_rollups(out_root, outcome.day)
+            if warehouse_path is not None:
+                upsert_results(warehouse_path, outcome.results)
+            report.written.append(outcome.day)
+            providers_done = ",".join(result.provider for result in outcome.results)
+            emit(f"- {outcome.day.isoformat()}: rebuilt {providers_done} -> {outcome.output_dir}")
+
+    report.written.sort()
+    return report
@@ -0,0 +1,350 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any
+
+from .daystore import DAY_STORE_DIRNAME
+from .storage import provider_files, read_json, summary_kpis
+from .warehouse import row_kind_key
+
+ROLLUP_DIRNAME = "rollups"
+ROLLUP_VERSION = 1
+GRAINS = ("week", "month", "quarter")
+DAYS_DIRNAME = "days"
+
+# Ratio/average row fields: summing them across days is meaningless, so they are dropped
+# (``ctr`` is derived again from clicks and impressions when rollups are read).
+RATIO_ROW_FIELDS = frozenset({"ctr", "position", "pageViewsRpm"})
+# KPIs reported as the mean over the days their provider reported instead of a sum.
+MEAN_KPIS = {"ads_rpm_avg": "adsense"}
+# Row metric used to rank top rows, in order of preference.
+RANK_FIELDS = ("sessions", "clicks", "requests", "estimatedEarnings", "impressions")
+
+logger = logging.getLogger(__name__)
+
+# Backfill writes days from several threads; every rollup update is a read-modify-write.
+_update_lock = threading.Lock()
+
+
+def period_of(day: date, grain: str) -> str:
+    if grain == "week":
+        year, week, _ = day.isocalendar()
+        return f"{year}-W{week:02d}"
+    if grain == "month":
+        return f"{day.year}-{day.month:02d}"
+    if grain == "quarter":
+        return f"{day.year}-Q{(day.month - 1) // 3 + 1}"
+    raise ValueError(f"Unsupported rollup grain {grain!r} (expected one of: {', '.join(GRAINS)})")
+
+
+def period_bounds(period: str, grain: str) -> tuple[date, date]:
+    if grain == "week":
+        year, week = period.split("-W")
+        start = date.fromisocalendar(int(year), int(week), 1)
+        return start, start + timedelta(days=6)
+    if grain == "month":
+        year, month = (int(part) for part in period.split("-"))
+        start = date(year, month, 1)
+    else:
+        year, quarter = period.split("-Q")
+        start = date(int(year), (int(quarter) - 1) * 3 + 1, 1)
+        month = start.month + 2
+    next_month = date(start.year + month // 12, month % 12 + 1, 1)
+    return start, next_month - timedelta(days=1)
+
+
+def _rollup_root(out_root: Path) -> Path:
+    return out_root / ROLLUP_DIRNAME
+
+
+def _period_path(out_root: Path, grain: str, period: str) -> Path:
+    return _rollup_root(out_root) / grain / f"{period}.json"
+
+
+def _day_path(out_root: Path, day: date) -> Path:
+    return _rollup_root(out_root) / DAYS_DIRNAME / f"{day.isoformat()}.json"
+
+
+def _read_json(path: Path) -> dict[str, Any] | None:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def _write_json(path: Path, payload: dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    with os.fdopen(fd, "w", encoding="utf-8") as handle:
+        json.dump(payload, handle, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    os.chmod(tmp_name, 0o644)
+    os.replace(tmp_name, path)
+
+
+def _digest(contribution: dict[str, Any] | None) -> str | None:
+    if contribution is None:
+        return None
+    encoded = json.dumps(contribution, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    return hashlib.sha1(encoded).hexdigest()[:16]
+
+
+def _single_day_payloads(out_root: Path, day: date) -> tuple[list[dict[str, Any]], list[str]]:
+    """Provider results stored for exactly ``day``: the date directory first, then the day store.
+
+    Also returns the providers whose stored result for ``day`` spans a multi-day window.
+    """
+    payloads: dict[str, dict[str, Any]] = {}
+    windowed: set[str] = set()
+    for path in provider_files(out_root / day.isoformat()):
+        try:
+            payload = read_json(path)
+        except (OSError, ValueError, RuntimeError):
+            continue
+        window = payload.get("date_range") or {}
+        if window.get("start") == day.isoformat() and window.get("end") == day.isoformat():
+            payloads[str(payload["provider"])] = payload
+        else:
+            windowed.add(str(payload["provider"]))
+    for path in sorted((out_root / DAY_STORE_DIRNAME).glob(f"*/{day.isoformat()}.json")):
+        stored = _read_json(path)
+        if stored is not None and path.parent.name not in payloads:
+            payloads[path.parent.name] = stored["result"]
+    return [payloads[provider] for provider in sorted(payloads)], sorted(windowed - payloads.keys())
+
+
+def _contribution(out_root: Path, day: date) -> tuple[dict[str, Any] | None, list[str]]:
+    payloads, windowed = _single_day_payloads(out_root, day)
+    metrics_by_provider: dict[str, dict[str, float]] = {}
+    rows: dict[str, dict[str, dict[str, float]]] = {}
+    for payload in payloads:
+        if payload.get("errors"):
+            continue
+        provider = str(payload["provider"])
+        metrics_by_provider[provider] = payload.get("metrics") or {}
+        provider_rows = rows.setdefault(provider, {})
+        for row in payload.get("rows") or []:
+            kind, key = row_kind_key(provider, row)
+            totals = provider_rows.setdefault(f"{kind}\t{key}", {})
+            for field, value in row.items():
+                if field in RATIO_ROW_FIELDS or isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                # GA4 rows of several properties can share a page.
+                totals[field] = totals.get(field, 0.0) + float(value)
+    if not metrics_by_provider:
+        return None, windowed
+    contribution = {
+        "providers": sorted(metrics_by_provider),
+        "kpis": summary_kpis(metrics_by_provider, present_only=True),
+        "rows": rows,
+    }
+    return contribution, windowed
+
+
+def day_contribution(out_root: Path, day: date) -> dict[str, Any] | None:
+    """KPIs and summed row metrics of the single-day provider results stored for ``day``.
+
+    Only results whose window is exactly that day count (single-day runs and the day store):
+    overlapping multi-day windows cannot be split into days. Results with errors are left
+    out until they are re-run.
+    """
+    return _contribution(out_root, day)[0]
+
+
+def _empty_state(grain: str, period: str) -> dict[str, Any]:
+    start, end = period_bounds(period, grain)
+    return {
+        "version": ROLLUP_VERSION,
+        "grain": grain,
+        "period": period,
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "days": {},
+        "provider_days": {},
+        "sums": {},
+        "rows": {},
+    }
+
+
+def _apply(state: dict[str, Any], contribution: dict[str, Any], sign: int) -> None:
+    sums = state["sums"]
+    for name, value in contribution["kpis"].items():
+        sums[name] = round(sums.get(name, 0.0) + sign * value, 9)
+    provider_days = state["provider_days"]
+    for provider in contribution["providers"]:
+        provider_days[provider] = provider_days.get(provider, 0) + sign
+        if not provider_days[provider]:
+            del provider_days[provider]
+    for provider, provider_rows in contribution["rows"].items():
+        state_rows = state["rows"].setdefault(provider, {})
+        for row_key, metrics in provider_rows.items():
+            entry = state_rows.setdefault(row_key, {"days": 0, "metrics": {}})
+            entry["days"] += sign
+            if not entry["days"]:
+                del state_rows[row_key]
+                continue
+            for field, value in metrics.items():
+                entry["metrics"][field] = round(entry["metrics"].get(field, 0.0) + sign * value, 9)
+        if not state_rows:
+            del state["rows"][provider]
+
+
+def _rebuild_period(out_root: Path, grain: str, period: str) -> dict[str, Any]:
+    state = _empty_state(grain, period)
+    start, end = period_bounds(period, grain)
+    day = start
+    while day <= end:
+        contribution = _read_json(_day_path(out_root, day))
+        if contribution is not None:
+            _apply(state, contribution, 1)
+            state["days"][day.isoformat()] = _digest(contribution)
+        day += timedelta(days=1)
+    return state
+
+
+def _store_period(out_root: Path, state: dict[str, Any]) -> None:
+    path = _period_path(out_root, state["grain"], state["period"])
+    if state["days"]:
+        _write_json(path, state)
+    else:
+        path.unlink(missing_ok=True)
+
+
+def update_rollups(out_root: Path, day: date) -> bool:
+    """Fold the stored results of ``day`` into its week, month and quarter rollups.
+
+    Each rollup is adjusted by the difference between the day's previous and new contribution,
+    so the cost does not depend on how much history is stored. The per-day contribution files
+    are written first and are the source of truth: a period whose recorded digest for the day
+    does not match (an interrupted update) is rebuilt from them. Returns True if anything changed.
+    """
+    with _update_lock:
+        day_path = _day_path(out_root, day)
+        previous = _read_json(day_path)
+        contribution, windowed = _contribution(out_root, day)
+        if windowed:
+            logger.warning(
+                "rollups: %s for %s not added (multi-day window); rollups need --days 1 or --day-store",
+                ", ".join(windowed),
+                day.isoformat(),
+            )
+        previous_digest, digest = _digest(previous), _digest(contribution)
+        if contribution is None:
+            day_path.unlink(missing_ok=True)
+        elif digest != previous_digest:
+            _write_json(day_path, contribution)
+
+        changed = False
+        for grain in GRAINS:
+            period = period_of(day, grain)
+            state = _read_json(_period_path(out_root, grain, period))
+            if state is None or state.get("version") != ROLLUP_VERSION:
+                state = _empty_state(grain, period)
+            recorded = state["days"].get(day.isoformat())
+            if recorded == digest:
+                continue
+            if recorded == previous_digest:
+                if previous is not None:
+                    _apply(state, previous, -1)
+                if contribution is not None:
+                    _apply(state, contribution, 1)
+                    state["days"][day.isoformat()] = digest
+                else:
+                    state["days"].pop(day.isoformat(), None)
+            else:
+                state = _rebuild_period(out_root, grain, period)
+            _store_period(out_root, state)
+            changed = True
+        return changed
+
+
+def rebuild_rollups(out_root: Path) -> int:
+    """Recompute every rollup from the date directories and the day store; returns the days used."""
+    with _update_lock:
+        shutil.rmtree(_rollup_root(out_root), ignore_errors=True)
+        states: dict[tuple[str, str], dict[str, Any]] = {}
+        used = 0
+        candidates = {path.name for path in out_root.glob("????-??-??")}
+        candidates.update(path.stem for path in out_root.glob(f"{DAY_STORE_DIRNAME}/*/????-??-??.json"))
+        for name in sorted(candidates):
+            try:
+                day = date.fromisoformat(name)
+            except ValueError:
+                continue
+            contribution = day_contribution(out_root, day)
+            if contribution is None:
+                continue
+            _write_json(_day_path(out_root, day), contribution)
+            used += 1
+            for grain in GRAINS:
+                period = period_of(day, grain)
+                state = states.setdefault((grain, period), _empty_state(grain, period))
+                _apply(state, contribution, 1)
+                state["days"][day.isoformat()] = _digest(contribution)
+        for state in states.values():
+            _store_period(out_root, state)
+        return used
+
+
+def _rank(metrics: dict[str, float]) -> float:
+    return next((metrics[field] for field in RANK_FIELDS if field in metrics), 0.0)
+
+
+def _report(state: dict[str, Any], top: int) -> dict[str, Any]:
+    kpis = dict(state["sums"])
+    for name, provider in MEAN_KPIS.items():
+        if name in kpis:
+            kpis[name] = round(kpis[name] / max(state["provider_days"].get(provider, 0), 1), 9)
+
+    top_rows: dict[str, dict[str, list[dict[str, Any]]]] = {}
+    for provider, provider_rows in sorted(state["rows"].items()):
+        by_kind: dict[str, list[dict[str, Any]]] = {}
+        for row_key, entry in provider_rows.items():
+            kind, key = row_key.split("\t", 1)
+            metrics = dict(entry["metrics"])
+            if metrics.get("impressions"):
+                metrics["ctr"] = round(metrics.get("clicks", 0.0) / metrics["impressions"], 9)
+            by_kind.setdefault(kind, []).append({"key": key, "days": entry["days"], **metrics})
+        top_rows[provider] = {
+            kind: sorted(items, key=lambda item: (-_rank(item), item["key"]))[:top]
+            for kind, items in sorted(by_kind.items())
+        }
+
+    start, end = date.fromisoformat(state["start"]), date.fromisoformat(state["end"])
+    return {
+        "grain": state["grain"],
+        "period": state["period"],
+        "start": state["start"],
+        "end": state["end"],
+        "days": len(state["days"]),
+        "complete": len(state["days"]) == (end - start).days + 1,
+        "provider_days": state["provider_days"],
+        "kpis": kpis,
+        "top_rows": top_rows,
+    }
+
+
+def read_rollups(
+    out_root: Path, grain: str, start: date | None = None, end: date | None = None, top: int = 10
+) -> list[dict[str, Any]]:
+    """Rollup reports of ``grain`` whose period overlaps ``start``..``end``, oldest first."""
+    if grain not in GRAINS:
+        raise ValueError(f"Unsupported rollup grain {grain!r} (expected one of: {', '.join(GRAINS)})")
+    reports: list[dict[str, Any]] = []
+    for path in sorted((_rollup_root(out_root) / grain).glob("*.json")):
+        state = _read_json(path)
+        if state is None or state.get("version") != ROLLUP_VERSION:
+            continue
+        if start and date.fromisoformat(state["end"]) < start:
+            continue
+        if end and date.fromisoformat(state["start"]) > end:
+            continue
+        reports.append(_report(state, top))
+    return sorted(reports, key=lambda report: report["start"])
@@ -0,0 +1,389 @@
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from contextlib import nullcontext
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Callable, Protocol, Sequence
+
+from .archive import open_archive
+from .cache import bind_archive, carry_archive
+from .columnar import ColumnarResultWriter
+from .config import CollectorConfig, DateWindow, today_in_timezone
+from .daystore import compose_result, get_day_store, is_final, window_days
+from .instrument import ProviderSpan, RunTimer, bind_provider, stage
+from .pipeline import drain, iter_batches, sanitize_stream
+from .providers import COLLECTORS, ProviderCollector
+from .schema import ProviderName, ProviderResult, make_provider_result
+from .storage import ProviderResultWriter
+from .warehouse import WarehouseWriter
+
+DEFAULT_PROVIDER_TIMEOUT_SECONDS = 300.0
+
+Echo = Callable[[str], None]
+
+
+class CollectionAborted(RuntimeError):
+    """Raised when a provider fails and fail-soft mode is off."""
+
+    def __init__(self, errors: list[str]) -> None:
+        super().__init__("; ".join(errors))
+        self.errors = errors
+
+
+class ResultSink(Protocol):
+    row_count: int
+
+    def write_rows(self, rows: list[dict]) -> None: ...
+
+    def finish(self, result: ProviderResult) -> None: ...
+
+    def commit(self) -> object: ...
+
+    def discard(self) -> None: ...
+
+
+@dataclass(frozen=True)
+class StreamedProvider:
+    result: ProviderResult
+    row_count: int
+    # Columnar and warehouse writers, committed by `commit_side_outputs` after the date directory.
+    side_outputs: ResultSink | None = None
+
+
+def _noop_echo(_: str) -> None:
+    return None
+
+
+class _ListSink:
+    """Keeps a provider's sanitized rows in memory (dry runs, backfill, library callers)."""
+
+    def __init__(self) -> None:
+        self.rows: list[dict] = []
+        self.row_count = 0
+
+    def write_rows(self, rows: list[dict]) -> None:
+        self.rows.extend(rows)
+        self.row_count += len(rows)
+
+    def finish(self, result: ProviderResult) -> None:
+        result.rows = self.rows
+
+    def commit(self) -> None:
+        return None
+
+    def discard(self) -> None:
+        self.rows = []
+
+
+class _TeeSink:
+    """Hands every batch to several sinks; the first one reports the row count."""
+
+    def __init__(self, *sinks: ResultSink) -> None:
+        self.sinks = sinks
+
+    @property
+    def row_count(self) -> int:
+        return self.sinks[0].row_count
+
+    def write_rows(self, rows: list[dict]) -> None:
+        for sink in self.sinks:
+            sink.write_rows(rows)
+
+    def finish(self, result: ProviderResult) -> None:
+        for sink in self.sinks:
+            sink.finish(result)
+
+    def commit(self) -> None:
+        for sink in self.sinks:
+            sink.commit()
+
+    def discard(self) -> None:
+        for sink in self.sinks:
+            sink.discard()
+
+
+class _StagedSink(_TeeSink):
+    """A provider file writer plus side outputs; `commit` only renames the provider file.
+
+    The side outputs wait until the staged date directory is in place (see `commit_side_outputs`).
+    """
+
+    def __init__(self, primary: ResultSink, side: ResultSink | None) -> None:
+        super().__init__(primary, *([side] if side is not None else []))
+        self.primary = primary
+        self.side = side
+
+    def commit(self) -> None:
+        self.primary.commit()
+
+
+def _start_collector(
+    collector: ProviderCollector,
+    config: CollectorConfig,
+    date_window: DateWindow,
+    row_limit: int,
+    name: str,
+    sink: ResultSink,
+    timer: RunTimer | None = None,
+) -> Future:
+    # Daemon threads: a provider that blows its deadline is abandoned instead of
+    # keeping the interpreter alive until its HTTP call returns.
+    future: Future = Future()
+
+    def target() -> None:
+        if not future.set_running_or_notify_cancel():
+            return
+        bind_provider(name)
+        span = ProviderSpan.start(name, f"{date_window.start.isoformat()}..{date_window.end.isoformat()}")
+        archive = None
+
+        def write_rows(rows: list[dict]) -> None:
+            with stage("write"):
+                sink.write_rows(rows)
+
+        try:
+            archive = open_archive(config, date_window, name, row_limit)
+            with bind_archive(archive) if archive is not None else nullcontext():
+                # fetch -> sanitize -> sink, one batch at a time, on the collector's own thread.
+                stream = sanitize_stream(iter_batches(collector(config, date_window, row_limit)), limit=row_limit)
+                result = drain(stream, write_rows)
+            if archive is not None:
+                # A dormant provider made no requests; there is nothing to reprocess.
+                if archive.responses:
+                    archive.commit()
+                else:
+                    archive.discard()
+            result.notes.append(span.finish(sink.row_count).note())
+            if timer is not None:
+                timer.add(span)
+            sink.finish(result)
+        except BaseException as exc:  # noqa: BLE001
+            sink.discard()
+            if archive is not None:
+                archive.discard()
+            future.set_exception(exc)
+        else:
+            future.set_result(result)
+
+    # A caller replaying an archive (`reprocess`) has it bound; the collector thread inherits it.
+    threading.Thread(target=carry_archive(target), name=f"collector-{name}", daemon=True).start()
+    return future
+
+
+def _run_collectors(
+    config: CollectorConfig,
+    date_window: DateWindow,
+    providers: Sequence[ProviderName],
+    row_limit: int,
+    fail_soft: bool,
+    timeout: float | None,
+    echo: Echo | None,
+    sink_factory: Callable[[ProviderName], ResultSink],
+    timer: RunTimer | None = None,
+) -> list[tuple[ProviderResult, ResultSink]]:
+    emit = echo or _noop_echo
+
+    futures: dict[ProviderName, Future] = {}
+    sinks: dict[ProviderName, ResultSink] = {}
+    deadlines: dict[ProviderName, float | None] = {}
+    for provider in providers:
+        emit(f"- {provider}: start")
+        sinks[provider] = sink_factory(provider)
+        futures[provider] = _start_collector(
+            COLLECTORS[provider], config, date_window, row_limit, provider, sinks[provider], timer
+        )
+        deadlines[provider] = time.monotonic() + timeout if timeout else None
+
+    completed: list[tuple[ProviderResult, ResultSink]] = []
+    for provider in providers:
+        future = futures[provider]
+        deadline = deadlines[provider]
+        wait([future], timeout=None if deadline is None else max(0.0, deadline - time.monotonic()))
+
+        try:
+            if not future.done():
+                future.cancel()
+                raise TimeoutError(f"timed out after {timeout:g}s")
+            result = future.result()
+        except Exception as exc:  # noqa: BLE001
+            message = str(exc) or exc.__class__.__name__
+            sinks[provider].discard()
+            if not fail_soft:
+                for pending in futures.values():
+                    pending.cancel()
+                for sink in [*sinks.values(), *(sink for _, sink in completed)]:
+                    sink.discard()
+                raise CollectionAborted([f"{provider}: {message}"]) from exc
+
+            emit(f"  {provider}: failed (fail-soft) -> {message}")
+            result = make_provider_result(
+                provider=provider,
+                start=date_window.start,
+                end=date_window.end,
+                notes=["provider execution failed"],
+                errors=[message],
+            )
+            # A timed-out collector may still be writing into its own sink; never reuse it.
+            sink = sink_factory(provider)
+            sink.finish(result)
+            completed.append((result, sink))
+            continue
+
+        completed.append((result, sinks[provider]))
+        if result.errors:
+            emit(f"  {provider}: warnings/errors -> {', '.join(result.errors)}")
+        else:
+            emit(f"  {provider}: ok ({sinks[provider].row_count} rows)")
+
+    for _, sink in completed:
+        sink.commit()
+    return completed
+
+
+def collect_providers(
+    config: CollectorConfig,
+    date_window: DateWindow,
+    providers: Sequence[ProviderName],
+    row_limit: int = 50,
+    fail_soft: bool = False,
+    timeout: float | None = DEFAULT_PROVIDER_TIMEOUT_SECONDS,
+    echo: Echo | None = None,
+    timer: RunTimer | None = None,
+) -> list[ProviderResult]:
+    """Run the selected collectors concurrently, returning results in the given order.
+
+    Each result gets a ``timing:`` note; with ``timer`` the spans are also kept for ``timings.json``.
+    """
+    completed = _run_collectors(
+        config, date_window, providers, row_limit, fail_soft, timeout, echo, lambda provider: _ListSink(), timer
+    )
+    return [result for result, _ in completed]
+
+
+def stream_providers(
+    config: CollectorConfig,
+    date_window: DateWindow,
+    providers: Sequence[ProviderName],
+    output_dir: Path,
+    row_limit: int = 50,
+    fail_soft: bool = False,
+    timeout: float | None = DEFAULT_PROVIDER_TIMEOUT_SECONDS,
+    pretty: bool = False,
+    columnar_format: str | None = None,
+    warehouse_path: Path | None = None,
+    compression: str | None = None,
+    echo: Echo | None = None,
+    timer: RunTimer | None = None,
+) -> list[StreamedProvider]:
+    """Like `collect_providers`, but rows stream batch by batch into ``<output_dir>/<provider>.json``.
+
+    Provider files are renamed into place only once every provider has finished (or failed
+    soft), so an aborted run leaves no partial output. Returned results carry no rows. With
+    ``columnar_format`` the same batches also go to the columnar dataset next to the date
+    directories (see `columnar.partition_path`), and with ``warehouse_path`` into the SQLite
+    warehouse. Those side outputs are left uncommitted: call `commit_side_outputs` once
+    ``output_dir`` is in place, so a crash in between never leaves them ahead of the JSON files.
+    """
+
+    def sink_factory(provider: ProviderName) -> _StagedSink:
+        sides: list[ResultSink] = []
+        if columnar_format is not None:
+            sides.append(ColumnarResultWriter(output_dir.parent, provider, date_window.end, columnar_format))
+        if warehouse_path is not None:
+            sides.append(WarehouseWriter(warehouse_path, provider, date_window))
+        side = None if not sides else sides[0] if len(sides) == 1 else _TeeSink(*sides)
+        primary = ProviderResultWriter(output_dir / f"{provider}.json", pretty=pretty, compression=compression)
+        return _StagedSink(primary, side)
+
+    completed = _run_collectors(config, date_window, providers, row_limit, fail_soft, timeout, echo, sink_factory, timer)
+    return [
+        StreamedProvider(result=result, row_count=sink.row_count, side_outputs=sink.side)  # type: ignore[attr-defined]
+        for result, sink in completed
+    ]
+
+
+def commit_side_outputs(streamed: Sequence[StreamedProvider]) -> None:
+    """Commit the columnar and warehouse writers of a `stream_providers` run."""
+    for item in streamed:
+        if item.side_outputs is not None:
+            item.side_outputs.commit()
+
+
+def discard_side_outputs(streamed: Sequence[StreamedProvider]) -> None:
+    for item in streamed:
+        if item.side_outputs is not None:
+            item.side_outputs.discard()
+
+
+@dataclass(frozen=True)
+class ComposedRun:
+    results: list[ProviderResult]
+    # Days whose stored facts were (re)fetched in this run, for any provider.
+    fetched_days: list[date]
+
+
+def collect_from_days(
+    config: CollectorConfig,
+    date_window: DateWindow,
+    providers: Sequence[ProviderName],
+    out_root: Path,
+    row_limit: int = 50,
+    fail_soft: bool = False,
+    timeout: float | None = DEFAULT_PROVIDER_TIMEOUT_SECONDS,
+    workers: int = 4,
+    echo: Echo | None = None,
+    timer: RunTimer | None = None,
+) -> ComposedRun:
+    """Compose each provider's window from single-day results kept in the day store.
+
+    Only days that are missing, were not yet final when stored, or hold fewer top rows than
+    ``row_limit`` are fetched (one single-day collector run each); everything else is read
+    from ``<out_root>/.days``. Days that fail are not stored: without ``fail_soft`` the run
+    aborts, otherwise their errors are reported on the composed result.
+    """
+    emit = echo or _noop_echo
+    store = get_day_store(out_root)
+    today = today_in_timezone(config.collector_timezone)
+    days = window_days(date_window)
+
+    def day_result(provider: ProviderName, day: date) -> tuple[ProviderResult, bool]:
+        with store.lock(provider, day):
+            fact = store.load(provider, day)
+            if fact is not None and fact.usable(row_limit):
+                return fact.result, False
+            day_window = DateWindow(start=day, end=day)
+            result = collect_providers(
+                config, day_window, [provider], row_limit=row_limit, fail_soft=fail_soft, timeout=timeout, timer=timer
+            )[0]
+            if result.errors:
+                return result, False
+            store.save(result, final=is_final(provider, day, today), row_limit=row_limit)
+            return result, True
+
+    tasks = [(provider, day) for provider in providers for day in days]
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="day-store") as pool:
+        futures = [pool.submit(day_result, provider, day) for provider, day in tasks]
+        outcomes = [future.result() for future in futures]
+
+    by_provider: dict[ProviderName, list[tuple[date, ProviderResult, bool]]] = {provider: [] for provider in providers}
+    for (provider, day), (result, fetched) in zip(tasks, outcomes):
+        by_provider[provider].append((day, result, fetched))
+
+    results: list[ProviderResult] = []
+    fetched_days: set[date] = set()
+    for provider in providers:
+        entries = by_provider[provider]
+        stored = [result for _, result, _ in entries if not result.errors]
+        failed = {day: result for day, result, _ in entries if result.errors}
+        fetched = [day for day, _, was_fetched in entries if was_fetched]
+        fetched_days.update(fetched)
+        result = compose_result(provider, date_window, stored, row_limit, failed)
+        emit(f"- {provider}: {len(stored) - len(fetched)} stored days reused, {len(fetched)} fetched")
+        if result.errors:
+            emit(f"  {provider}: warnings/errors -> {', '.join(result.errors)}")
+        results.append(result)
+    return ComposedRun(results=results, fetched_days=sorted(fetched_days))
@@ -2,10 +2,16 @@ from __future__ import annotations
 
 import json
 import re
+from typing import Iterable
 from urllib.parse import urlparse
 
 EMAIL_PATTERN = re.compile(r"\b[A-Z0-9._%+-]+@[A-Z0-9.-]+\.[A-Z]{2,}\b", re.IGNORECASE)
-PHONE_PATTERN = re.compile(r"\b(?:\+?\d[\d().\-\s]{7,}\d)\b")
+# ISO dates (AdSense `date` rows, dates typed into queries) have the shape of a phone number
+# but are not one; a match may not start with a bare YYYY-MM-DD.
+PHONE_PATTERN = re.compile(r"\b(?!(?:19|20)\d\d-[01]\d-[0-3]\d\b)(?:\+?\d[\d().\-\s]{7,}\d)\b")
+# Anything EMAIL_PATTERN or PHONE_PATTERN can match contains one of these, so one search
+# decides whether a string needs the two substitutions at all.
+PII_HINT_PATTERN = re.compile(r"@|\d[\d().\-\s]{7,}\d")
 
 SENSITIVE_KEYS = {
     "user",
@@ -129,3 +135,162 @@ def sanitize_rows(rows: list[dict[str, object]], limit: int = 50) -> list[dict[s
             break
 
     return cleaned
+
+
+# String handling per key, decided once per distinct key by `_classify_key`.
+KEY_DROP = 0
+KEY_QUERY = 1
+KEY_PATH = 2
+KEY_REFERRER = 3
+KEY_TEXT = 4
+
+VALUE_CACHE_SIZE = 65_536
+
+_NUMBER_TYPES = (bool, int, float)
+
+
+def _classify_key(key: str) -> int:
+    if _is_sensitive_key(key):
+        return KEY_DROP
+    key_lower = key.lower()
+    if "query" in key_lower:
+        return KEY_QUERY
+    if key_lower in {"path", "page", "url"} or "page" in key_lower or key_lower.endswith("path"):
+        return KEY_PATH
+    if "referrer" in key_lower:
+        return KEY_REFERRER
+    return KEY_TEXT
+
+
+def _sanitize_string(kind: int, value: str) -> str:
+    if kind == KEY_PATH:
+        return sanitize_path(value)
+    # Queries and free text get the same treatment as `sanitize_query`.
+    if PII_HINT_PATTERN.search(value) is not None:
+        value = redact_pii(value)
+    return truncate_text(value, limit=120)
+
+
+def _fingerprint_value(value: object) -> tuple[type, object]:
+    if isinstance(value, str):
+        return str, str(value)
+    if isinstance(value, bool):
+        return bool, bool(value)
+    if isinstance(value, float):
+        value = float(value)
+        # -0.0 == 0.0 and NaN != NaN, but json.dumps tells the zeros apart and repeats "NaN".
+        return float, (value if value and value == value else float.__repr__(value))
+    return int, int(value)
+
+
+def row_fingerprint(item: dict[str, object]) -> tuple:
+    """Hashable stand-in for ``json.dumps(item, sort_keys=True)`` of a sanitized row.
+
+    Two rows get equal fingerprints exactly when their JSON text is equal. Value types are part
+    of the fingerprint because 1, 1.0 and True compare equal.
+    """
+    typed = [_fingerprint_value(value) for value in item.values()]
+    return (
+        tuple(zip(item.keys(), [value for _, value in typed])),
+        tuple(value_type for value_type, _ in typed),
+    )
+
+
+class RowSanitizer:
+    """Batch equivalent of `sanitize_row`/`sanitize_rows` with identical output.
+
+    Each distinct key is classified once, repeated string values are sanitized once, and rows
+    are deduplicated on tuple fingerprints instead of JSON text. Dedup state is kept across
+    `sanitize` calls, so one instance can be fed a row stream page by page.
+    """
+
+    def __init__(self, limit: int | None = None, deduplicate: bool = True) -> None:
+        self.limit = limit
+        self.deduplicate = deduplicate
+        self.emitted = 0
+        self._seen: set[tuple] = set()
+        self._key_kinds: dict[str, int] = {}
+        self._values: dict[tuple[int, str], str] = {}
+
+    @property
+    def exhausted(self) -> bool:
+        return self.limit is not None and self.emitted >= self.limit
+
+    def _sanitize(self, row: dict[str, object]) -> tuple[dict[str, object], bool]:
+        """Sanitized row plus whether its values allow the cheap fingerprint."""
+        key_kinds = self._key_kinds
+        values = self._values
+        sanitized: dict[str, object] = {}
+        plain = True
+        for key, raw_value in row.items():
+            if raw_value is None:
+                continue
+            kind = key_kinds.get(key)
+            if kind is None:
+                kind = key_kinds[key] = _classify_key(key)
+            if kind == KEY_DROP:
+                continue
+            value_type = type(raw_value)
+            if value_type is str:
+                if kind == KEY_REFERRER:
+                    continue
+                cache_key = (kind, raw_value)
+                value = values.get(cache_key)
+                if value is None:
+                    if len(values) >= VALUE_CACHE_SIZE:
+                        values.clear()
+                    value = values[cache_key] = _sanitize_string(kind, raw_value)
+                if value:
+                    sanitized[key] = value
+            elif value_type is int or value_type is bool:
+                sanitized[key] = raw_value
+            elif value_type is float:
+                sanitized[key] = raw_value
+                if not raw_value or raw_value != raw_value:
+                    # 0.0/-0.0 and NaN need the repr-based fingerprint.
+                    plain = False
+            elif isinstance(raw_value, _NUMBER_TYPES):
+                sanitized[key] = raw_value
+                plain = False
+            elif isinstance(raw_value, str):
+                if kind == KEY_REFERRER:
+                    continue
+                value = _sanitize_string(kind, raw_value)
+                if value:
+                    sanitized[key] = value
+        if len(sanitized) > 1:
+            sanitized = {k: sanitized[k] for k in sorted(sanitized)}
+        return sanitized, plain
+
+    def sanitize_row(self, row: dict[str, object]) -> dict[str, object]:
+        return self._sanitize(row)[0]
+
+    def sanitize(self, rows: Iterable[dict[str, object]]) -> list[dict[str, object]]:
+        cleaned: list[dict[str, object]] = []
+        if self.exhausted:
+            return cleaned
+        seen = self._seen
+        deduplicate = self.deduplicate
+        for row in rows:
+            item, plain = self._sanitize(row)
+            if not item:
+                continue
+            if deduplicate:
+                if plain:
+                    # Same tuple `row_fingerprint` builds, without the per-value normalization.
+                    fingerprint = (tuple(item.items()), tuple(map(type, item.values())))
+                else:
+                    fingerprint = row_fingerprint(item)
+                if fingerprint in seen:
+                    continue
+                seen.add(fingerprint)
+            cleaned.append(item)
+            self.emitted += 1
+            if self.exhausted:
+                break
+        return cleaned
+
+
+def sanitize_batch(rows: Iterable[dict[str, object]], limit: int | None = 50) -> list[dict[str, object]]:
+    """Same result as `sanitize_rows(rows, limit)`, for large inputs (``limit=None`` keeps all)."""
+    return RowSanitizer(limit=limit).sanitize(rows)
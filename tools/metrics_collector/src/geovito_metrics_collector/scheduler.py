@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+import random
+import threading
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, TypeVar
+
+from .instrument import record
+
+T = TypeVar("T")
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+# Google reports per-user/per-site rate limits as 403 with one of these reasons.
+RATE_LIMIT_REASONS = ("rateLimitExceeded", "userRateLimitExceeded", "RESOURCE_EXHAUSTED")
+# Quota observations older than this no longer slow a provider down (GA4 hourly quotas reset).
+HEADROOM_TTL_SECONDS = 3600.0
+# Below this fraction of remaining quota the request rate is scaled down proportionally.
+HEADROOM_SLOWDOWN_BELOW = 0.5
+MIN_RATE_SCALE = 0.05
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    rate: float
+    burst: int
+
+
+# Sustained requests per second and burst size per provider, kept below the published quotas:
+# GA4 ~40k property tokens/hour at ~10 tokens per report (40_000 / 10 / 3600 = 1.1 reports/s,
+# so 1/s leaves ~10% margin; the bucket is shared by all properties) and 10 concurrent requests,
+# Search Console 1200 queries/minute per site, Cloudflare GraphQL 300 queries per 5 minutes,
+# AdSense Management API 100 requests/minute.
+PROVIDER_RATE_LIMITS: dict[str, RateLimit] = {
+    "ga4": RateLimit(rate=1.0, burst=10),
+    "gsc": RateLimit(rate=10.0, burst=10),
+    "cloudflare": RateLimit(rate=1.0, burst=5),
+    "adsense": RateLimit(rate=1.5, burst=5),
+}
+DEFAULT_RATE_LIMIT = RateLimit(rate=2.0, burst=5)
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    max_attempts: int = 5
+    base_delay: float = 1.0
+    max_delay: float = 60.0
+    # A Retry-After longer than this is not waited out; the error is raised instead.
+    max_retry_after: float = 300.0
+
+    def delay(self, attempt: int, retry_after: float | None, jitter: float) -> float | None:
+        """Seconds to wait before attempt ``attempt + 1``, or None when it should not be retried.
+
+        Full jitter over an exponential ceiling; a server's Retry-After is a lower bound.
+        """
+        backoff = jitter * min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        if retry_after is None:
+            return backoff
+        if retry_after > self.max_retry_after:
+            return None
+        return retry_after + jitter * self.base_delay
+
+
+class RateLimited(RuntimeError):
+    """A rate-limit response that did not surface as an HTTP error (e.g. a GraphQL error payload)."""
+
+    def __init__(self, message: str, retry_after: float | None = None) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value: Any) -> float | None:
+    if value is None:
+        return None
+    text = str(value).strip()
+    try:
+        return max(0.0, float(text))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(text).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _google_rate_limited(content: Any) -> bool:
+    if isinstance(content, bytes):
+        content = content.decode("utf-8", "replace")
+    return isinstance(content, str) and any(reason in content for reason in RATE_LIMIT_REASONS)
+
+
+def classify_error(exc: BaseException) -> tuple[bool, float | None]:
+    """Whether ``exc`` is worth retrying, and the server's Retry-After in seconds if it sent one."""
+    if isinstance(exc, RateLimited):
+        return True, exc.retry_after
+
+    # googleapiclient.errors.HttpError: an httplib2 response (a dict of lower-cased headers).
+    google_response = getattr(exc, "resp", None)
+    if google_response is not None and hasattr(google_response, "status"):
+        status = int(google_response.status)
+        retry_after = parse_retry_after(google_response.get("retry-after"))
+        if status in RETRY_STATUSES:
+            return True, retry_after
+        return status == 403 and _google_rate_limited(getattr(exc, "content", None)), retry_after
+
+    # requests.HTTPError carries the response it was raised for.
+    response = getattr(exc, "response", None)
+    if response is not None and hasattr(response, "status_code"):
+        return response.status_code in RETRY_STATUSES, parse_retry_after(response.headers.get("Retry-After"))
+
+    import requests
+
+    if isinstance(exc, (requests.ConnectionError, requests.Timeout, ConnectionError, TimeoutError)):
+        return True, None
+    return False, None
+
+
+class TokenBucket:
+    """Requests per second with bursts; tokens are reserved, so waiting callers queue up in order."""
+
+    def __init__(self, limit: RateLimit, clock: Callable[[], float] = time.monotonic) -> None:
+        self.limit = limit
+        self._clock = clock
+        self._tokens = float(limit.burst)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self, scale: float = 1.0) -> float:
+        """Take a token and return how long the caller has to wait before it may be spent."""
+        rate = self.limit.rate * scale
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(float(self.limit.burst), self._tokens + (now - self._updated) * rate)
+            self._updated = now
+            self._tokens -= 1.0
+            return 0.0 if self._tokens >= 0 else -self._tokens / rate
+
+
+class ProviderScheduler:
+    """Paces one provider's API calls through a token bucket and retries throttled ones.
+
+    A throttled call holds back every caller of the provider, not only the one that was told
+    to back off, and quota headroom reported by the API (see `observe_headroom`) lowers the
+    request rate before the quota runs out.
+    """
+
+    def __init__(
+        self,
+        provider: str,
+        limit: RateLimit,
+        policy: RetryPolicy = RetryPolicy(),
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+        jitter: Callable[[], float] = random.random,
+    ) -> None:
+        self.provider = provider
+        self.policy = policy
+        self.bucket = TokenBucket(limit, clock)
+        self._clock = clock
+        self._sleep = sleep
+        self._jitter = jitter
+        self._lock = threading.Lock()
+        self._held_until = 0.0
+        self._headroom: dict[str, tuple[float, float]] = {}
+        self.retries = 0
+
+    def observe_headroom(self, key: str, remaining_fraction: float) -> None:
+        """Record the fraction of a quota (e.g. one GA4 property's hourly tokens) still left."""
+        with self._lock:
+            self._headroom[key] = (max(0.0, min(1.0, remaining_fraction)), self._clock())
+
+    def rate_scale(self) -> float:
+        now = self._clock()
+        with self._lock:
+            fractions = [fraction for fraction, seen in self._headroom.values() if now - seen < HEADROOM_TTL_SECONDS]
+        if not fractions or min(fractions) >= HEADROOM_SLOWDOWN_BELOW:
+            return 1.0
+        return max(MIN_RATE_SCALE, min(fractions) / HEADROOM_SLOWDOWN_BELOW)
+
+    def _hold(self, seconds: float) -> None:
+        with self._lock:
+            self._held_until = max(self._held_until, self._clock() + seconds)
+
+    def _wait(self) -> None:
+        wait = self.bucket.reserve(self.rate_scale())
+        with self._lock:
+            wait = max(wait, self._held_until - self._clock())
+        if wait > 0:
+            record(self.provider, rate_limit_wait_seconds=wait)
+            self._sleep(wait)
+
+    def call(self, fn: Callable[[], T]) -> T:
+        attempt = 0
+        while True:
+            self._wait()
+            started = time.perf_counter()
+            try:
+                return fn()
+            except Exception as exc:
+                attempt += 1
+                retry, retry_after = classify_error(exc)
+                if not retry or attempt >= self.policy.max_attempts:
+                    raise
+                delay = self.policy.delay(attempt, retry_after, self._jitter())
+                if delay is None:
+                    raise
+                with self._lock:
+                    self.retries += 1
+                record(self.provider, retries=1)
+                self._hold(delay)
+            finally:
+                record(self.provider, http_requests=1, http_seconds=time.perf_counter() - started)
+
+
+_SCHEDULERS: dict[str, ProviderScheduler] = {}
+_SCHEDULERS_LOCK = threading.Lock()
+
+
+def get_scheduler(provider: str) -> ProviderScheduler:
+    with _SCHEDULERS_LOCK:
+        scheduler = _SCHEDULERS.get(provider)
+        if scheduler is None:
+            scheduler = ProviderScheduler(provider, PROVIDER_RATE_LIMITS.get(provider, DEFAULT_RATE_LIMIT))
+            _SCHEDULERS[provider] = scheduler
+        return scheduler
+
+
+def schedule(provider: str, fn: Callable[[], T]) -> T:
+    """Run one API call for ``provider`` under its shared rate limit and retry policy."""
+    return get_scheduler(provider).call(fn)
@@ -1,12 +1,26 @@
 from __future__ import annotations
 
 from datetime import date, datetime, timezone
-from typing import Any, Literal
+from typing import Annotated, Any
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import AfterValidator, BaseModel, ConfigDict, Field
 
-ProviderName = Literal["ga4", "gsc", "cloudflare", "adsense"]
-SUPPORTED_PROVIDERS: tuple[ProviderName, ...] = ("ga4", "gsc", "cloudflare", "adsense")
+SUPPORTED_PROVIDERS: tuple[str, ...] = ("ga4", "gsc", "cloudflare", "adsense")
+
+
+def _check_provider_name(name: str) -> str:
+    if name in SUPPORTED_PROVIDERS:
+        return name
+    # Deferred import: the registry module imports this one.
+    from .providers import is_registered_provider
+
+    if is_registered_provider(name):
+        return name
+    raise ValueError(f"unknown provider {name!r}")
+
+
+# Builtin providers plus any registered through the provider entry point group.
+ProviderName = Annotated[str, AfterValidator(_check_provider_name)]
 
 
 class DateRange(BaseModel):
@@ -72,11 +86,32 @@ def make_provider_result(
     )
 
 
-def provider_slice(result: ProviderResult) -> SummaryProviderSlice:
-    return SummaryProviderSlice(
+def make_trusted_result(
+    provider: ProviderName,
+    start: date,
+    end: date,
+    metrics: dict[str, float] | None = None,
+    rows: list[dict[str, Any]] | None = None,
+    notes: list[str] | None = None,
+    errors: list[str] | None = None,
+) -> ProviderResult:
+    """`make_provider_result` for rows that already went through the sanitizer.
+
+    Every other field is validated as usual; the rows are attached as they are instead of
+    being validated and copied one dict at a time.
+    """
+    result = make_provider_result(provider, start, end, metrics=metrics, notes=notes, errors=errors)
+    result.rows = rows or []
+    return result
+
+
+def provider_slice(result: ProviderResult, row_count: int | None = None) -> SummaryProviderSlice:
+    # Streamed results carry no rows in memory; their writer reports the count. The fields
+    # come from a validated result, so they are shared rather than validated again.
+    return SummaryProviderSlice.model_construct(
         provider=result.provider,
         metrics=result.metrics,
-        row_count=len(result.rows),
+        row_count=len(result.rows) if row_count is None else row_count,
         errors=result.errors,
         notes=result.notes,
     )
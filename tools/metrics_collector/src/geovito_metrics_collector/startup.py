@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from dataclasses import dataclass
+
+CLI_MODULE = "geovito_metrics_collector.cli"
+
+
+@dataclass(frozen=True)
+class ImportTiming:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(stderr: str) -> list[ImportTiming]:
+    """Parse ``python -X importtime`` output (``import time: self | cumulative | name``)."""
+    timings: list[ImportTiming] = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:") :].split("|")
+        if len(parts) != 3:
+            continue
+        self_raw, cumulative_raw, name_raw = parts
+        try:
+            self_us = int(self_raw.strip())
+            cumulative_us = int(cumulative_raw.strip())
+        except ValueError:
+            # Header line.
+            continue
+        module = name_raw.rstrip()
+        stripped = module.lstrip()
+        timings.append(
+            ImportTiming(
+                module=stripped,
+                self_us=self_us,
+                cumulative_us=cumulative_us,
+                depth=(len(module) - len(stripped)) // 2,
+            )
+        )
+    return timings
+
+
+def measure_imports(modules: list[str]) -> list[ImportTiming]:
+    """Import ``modules`` in a fresh interpreter and return its per-module import timings."""
+    code = "; ".join(f"import {module}" for module in modules)
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(path for path in sys.path if path)
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=False,
+    )
+    if completed.returncode != 0:
+        message = completed.stderr.strip().splitlines()[-1:] or ["unknown error"]
+        raise RuntimeError(f"import of {', '.join(modules)} failed: {message[0]}")
+    return parse_importtime(completed.stderr)
+
+
+def cumulative_ms(timings: list[ImportTiming], module: str) -> float:
+    for timing in timings:
+        if timing.module == module:
+            return timing.cumulative_us / 1000.0
+    return 0.0
@@ -1,13 +1,69 @@
 from __future__ import annotations
 
+import ctypes
+import ctypes.util
+import gzip
 import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import uuid
+from contextlib import contextmanager
 from datetime import date
 from pathlib import Path
+from typing import IO, Any, Iterator, Sequence
+
+from pydantic import TypeAdapter
 
 from .schema import ProviderResult, SummaryResult, provider_slice, utc_now
 
+# Serializes rows exactly like the `rows` field of `ProviderResult.model_dump(mode="json")`.
+_ROWS_ADAPTER = TypeAdapter(list[dict[str, Any]])
+# `json.dumps` builds a new encoder on every call; one shared instance keeps the C encoder
+# and encodes a whole batch in a single call.
+_COMPACT_ENCODER = json.JSONEncoder(ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+# Raises instead of writing NaN/Infinity, which the pydantic dump turns into null.
+_STRICT_ENCODER = json.JSONEncoder(ensure_ascii=False, sort_keys=True, separators=(",", ":"), allow_nan=False)
+
+COMPRESSIONS = ("gzip", "zstd")
+COMPRESSION_SUFFIXES = {"gzip": ".gz", "zstd": ".zst"}
+ZSTD_LEVEL = 10
+SUMMARY_FILENAME = "summary.json"
+TIMINGS_FILENAME = "timings.json"
+
+
+# Summary KPI -> (provider, provider metrics in order of preference). `build_summary` names
+# them with a ``_7d`` suffix, which the frontend reads; rollups use the bare names.
+SUMMARY_KPIS: dict[str, tuple[str, tuple[str, ...]]] = {
+    "sessions": ("ga4", ("sessions",)),
+    "active_users": ("ga4", ("activeUsers",)),
+    "pageviews": ("ga4", ("screenPageViews", "pageViews")),
+    "clicks": ("gsc", ("clicks",)),
+    "impressions": ("gsc", ("impressions",)),
+    "cf_requests": ("cloudflare", ("requests",)),
+    "cf_bandwidth_bytes": ("cloudflare", ("bandwidthBytes",)),
+    "cf_4xx": ("cloudflare", ("errors4xx",)),
+    "cf_5xx": ("cloudflare", ("errors5xx",)),
+    "earnings": ("adsense", ("estimatedEarnings",)),
+    "ads_impressions": ("adsense", ("impressions",)),
+    "ads_rpm_avg": ("adsense", ("pageViewsRpm",)),
+}
+
 
-def build_summary(provider_results: list[ProviderResult]) -> SummaryResult:
+def summary_kpis(metrics_by_provider: dict[str, dict[str, float]], present_only: bool = False) -> dict[str, float]:
+    """KPIs from provider metrics; absent providers count as 0 unless ``present_only``."""
+    kpis: dict[str, float] = {}
+    for name, (provider, sources) in SUMMARY_KPIS.items():
+        if present_only and provider not in metrics_by_provider:
+            continue
+        metrics = metrics_by_provider.get(provider, {})
+        kpis[name] = float(next((metrics[source] for source in sources if source in metrics), 0.0))
+    return kpis
+
+
+def build_summary(provider_results: list[ProviderResult], row_counts: dict[str, int] | None = None) -> SummaryResult:
     if not provider_results:
         raise ValueError("provider_results cannot be empty")
 
@@ -19,32 +75,13 @@ def build_summary(provider_results: list[ProviderResult]) -> SummaryResult:
         if result.errors:
             warnings.append(f"{result.provider}: {', '.join(result.errors)}")
 
-    by_provider = {result.provider: result for result in provider_results}
-
-    ga4_metrics = by_provider["ga4"].metrics if "ga4" in by_provider else {}
-    gsc_metrics = by_provider["gsc"].metrics if "gsc" in by_provider else {}
-    cf_metrics = by_provider["cloudflare"].metrics if "cloudflare" in by_provider else {}
-    ads_metrics = by_provider["adsense"].metrics if "adsense" in by_provider else {}
-
-    kpis = {
-        "sessions_7d": float(ga4_metrics.get("sessions", 0.0)),
-        "active_users_7d": float(ga4_metrics.get("activeUsers", 0.0)),
-        "pageviews_7d": float(ga4_metrics.get("screenPageViews", ga4_metrics.get("pageViews", 0.0))),
-        "clicks_7d": float(gsc_metrics.get("clicks", 0.0)),
-        "impressions_7d": float(gsc_metrics.get("impressions", 0.0)),
-        "cf_requests_7d": float(cf_metrics.get("requests", 0.0)),
-        "cf_bandwidth_bytes_7d": float(cf_metrics.get("bandwidthBytes", 0.0)),
-        "cf_4xx_7d": float(cf_metrics.get("errors4xx", 0.0)),
-        "cf_5xx_7d": float(cf_metrics.get("errors5xx", 0.0)),
-        "earnings_7d": float(ads_metrics.get("estimatedEarnings", 0.0)),
-        "ads_impressions_7d": float(ads_metrics.get("impressions", 0.0)),
-        "ads_rpm_avg_7d": float(ads_metrics.get("pageViewsRpm", 0.0)),
-    }
+    metrics_by_provider = {result.provider: result.metrics for result in provider_results}
+    kpis = {f"{name}_7d": value for name, value in summary_kpis(metrics_by_provider).items()}
 
     return SummaryResult(
         generated_at=utc_now(),
         date_range={"start": start, "end": end},
-        providers=[provider_slice(result) for result in provider_results],
+        providers=[provider_slice(result, (row_counts or {}).get(result.provider)) for result in provider_results],
         kpis=kpis,
         warnings=warnings,
     )
@@ -58,20 +95,357 @@ def _to_json_bytes(payload: dict, pretty: bool) -> bytes:
     return text.encode("utf-8")
 
 
+def _zstandard() -> Any:
+    try:
+        import zstandard
+    except ImportError as exc:
+        raise RuntimeError("zstd compression needs zstandard: pip install 'geovito-metrics-collector[zstd]'") from exc
+    return zstandard
+
+
+def check_compression(value: str | None) -> str | None:
+    if value is None or value == "none":
+        return None
+    if value not in COMPRESSIONS:
+        raise ValueError(f"Unsupported compression {value!r} (expected none or one of: {', '.join(COMPRESSIONS)})")
+    if value == "zstd":
+        _zstandard()
+    return value
+
+
+@contextmanager
+def _compressed(raw: IO[bytes], compression: str | None) -> Iterator[IO[bytes]]:
+    if compression is None:
+        yield raw
+    elif compression == "gzip":
+        # mtime=0 and no file name keep the output byte-for-byte reproducible.
+        with gzip.GzipFile(filename="", mode="wb", fileobj=raw, mtime=0) as handle:
+            yield handle
+    else:
+        with _zstandard().ZstdCompressor(level=ZSTD_LEVEL).stream_writer(raw, closefd=False) as handle:
+            yield handle
+
+
+def read_bytes(path: Path) -> bytes:
+    """The JSON bytes of a result file written plain, gzip- or zstd-compressed (by file suffix)."""
+    with path.open("rb") as raw:
+        if path.suffix == ".gz":
+            return gzip.GzipFile(fileobj=raw, mode="rb").read()
+        if path.suffix == ".zst":
+            return _zstandard().ZstdDecompressor().stream_reader(raw).read()
+        return raw.read()
+
+
+def read_json(path: Path) -> Any:
+    return json.loads(read_bytes(path))
+
+
+def read_result(path: Path) -> ProviderResult:
+    """Load a stored provider result; its rows were sanitized before writing and are not revalidated."""
+    payload = read_json(path)
+    result = ProviderResult.model_validate({**payload, "rows": []})
+    result.rows = payload.get("rows") or []
+    return result
+
+
+def stored_results(day_dir: Path, exclude: Sequence[str] = ()) -> list[ProviderResult]:
+    """Every readable provider result of a date directory, except the providers in ``exclude``."""
+    results: list[ProviderResult] = []
+    for path in provider_files(day_dir):
+        if result_name(path.name).removesuffix(".json") in exclude:
+            continue
+        try:
+            results.append(read_result(path))
+        except (OSError, ValueError, KeyError, TypeError, RuntimeError):
+            continue
+    return results
+
+
+def result_name(file_name: str) -> str:
+    """``ga4.json.gz`` -> ``ga4.json``; other names are returned unchanged."""
+    for suffix in COMPRESSION_SUFFIXES.values():
+        if file_name.endswith(".json" + suffix):
+            return file_name[: -len(suffix)]
+    return file_name
+
+
+def provider_files(day_dir: Path) -> list[Path]:
+    """Provider result files of a date directory, compressed or not (run-level files excluded)."""
+    if not day_dir.is_dir():
+        return []
+    return sorted(
+        path
+        for path in day_dir.iterdir()
+        if path.is_file()
+        and not path.name.startswith(".")
+        and result_name(path.name).endswith(".json")
+        and result_name(path.name).count(".") == 1
+        and path.name not in (SUMMARY_FILENAME, TIMINGS_FILENAME)
+    )
+
+
+_encode_string = json.encoder.encode_basestring
+_LITERALS = {True: "true", False: "false", None: "null"}
+
+
+def _encode_scalar(value: Any) -> str | None:
+    """JSON text of a plain scalar as the stdlib encoder writes it; None for anything else.
+
+    Raises ValueError for NaN/Infinity, which only the pydantic dump converts correctly.
+    """
+    kind = type(value)
+    if kind is str:
+        return _encode_string(value)
+    if kind is float:
+        if value - value != 0:
+            raise ValueError("non-finite float")
+        return float.__repr__(value)
+    if kind is int:
+        return int.__repr__(value)
+    if value is None or kind is bool:
+        return _LITERALS[value]
+    return None
+
+
+def _pretty_row(row: dict[str, Any], keys: dict[str, str]) -> str:
+    """A row as `json.dumps(indent=2, sort_keys=True)` prints it inside the ``rows`` list.
+
+    Flat rows (the common case) are assembled from directly encoded scalars, with encoded keys
+    shared across the batch; the pure-Python indent encoder is only used for nested values.
+    """
+    if not row:
+        return "\n    {}"
+    parts: list[str] = []
+    for key in sorted(row):
+        encoded_key = keys.get(key) if type(key) is str else None
+        if encoded_key is None and type(key) is str:
+            encoded_key = keys[key] = _encode_string(key)
+        value = _encode_scalar(row[key]) if encoded_key is not None else None
+        if value is None:
+            text = json.dumps(row, ensure_ascii=False, sort_keys=True, indent=2, allow_nan=False)
+            return "\n    " + text.replace("\n", "\n    ")
+        parts.append(f"\n      {encoded_key}: {value}")
+    return "\n    {" + ",".join(parts) + "\n    }"
+
+
+def _encode_json_ready(rows: list[dict[str, Any]], pretty: bool) -> bytes:
+    if pretty:
+        keys: dict[str, str] = {}
+        return ",".join([_pretty_row(row, keys) for row in rows]).encode("utf-8")
+    return _STRICT_ENCODER.encode(rows)[1:-1].encode("utf-8")
+
+
+def encode_rows(rows: list[dict[str, Any]], pretty: bool) -> bytes:
+    """Rows comma-joined as they appear inside the ``rows`` list of a result file.
+
+    Sanitized rows hold only plain scalars and are encoded as they are. Anything the encoder
+    rejects (dates, NaN, custom types) sends the batch through the pydantic JSON dump first,
+    so the bytes always match ``model_dump(mode="json")`` + ``json.dumps(sort_keys=True)``.
+    """
+    if not rows:
+        return b""
+    try:
+        return _encode_json_ready(rows, pretty)
+    except (TypeError, ValueError):
+        return _encode_json_ready(_ROWS_ADAPTER.dump_python(rows, mode="json"), pretty)
+
+
+class ProviderResultWriter:
+    """Writes ``<provider>.json`` incrementally, byte-identical to `write_results`.
+
+    Row batches are encoded as they arrive and spooled to a temporary file, because the
+    result fields that sort before ``rows`` (metrics, notes, errors) are only known once the
+    collector is done. `finish` assembles the document next to the target and `commit` renames
+    it into place, so only one batch is held in memory. With ``compression`` the file gets a
+    ``.gz``/``.zst`` suffix; `read_json` reads either form.
+    """
+
+    def __init__(self, path: Path, pretty: bool = False, compression: str | None = None) -> None:
+        self.path = path.with_name(path.name + COMPRESSION_SUFFIXES[compression]) if compression else path
+        self.pretty = pretty
+        self.compression = compression
+        self.row_count = 0
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._spool = tempfile.TemporaryFile(dir=path.parent, prefix=f".{path.name}.rows.")
+        self._staged: Path | None = None
+        # `discard` may come from the runner while an abandoned collector thread still writes.
+        self._lock = threading.Lock()
+        self._discarded = False
+
+    def write_rows(self, rows: list[dict[str, Any]]) -> None:
+        encoded = encode_rows(rows, self.pretty)
+        with self._lock:
+            if self._discarded or not encoded:
+                return
+            if self.row_count:
+                self._spool.write(b",")
+            self._spool.write(encoded)
+            self.row_count += len(rows)
+
+    def finish(self, result: ProviderResult) -> None:
+        """Write the complete document (``result.rows`` is ignored) to a staging file."""
+        with self._lock:
+            if self._discarded:
+                return
+            self._stage(result)
+
+    def _stage(self, result: ProviderResult) -> None:
+        payload = result.model_dump(mode="json", exclude={"rows"})
+        head = _to_json_bytes(payload, pretty=self.pretty).rstrip(b"\n")
+        # "rows" sorts after every other ProviderResult field, so it closes the object.
+        if self.pretty:
+            head = head[: -len(b"\n}")] + b',\n  "rows": ['
+            tail = b"\n  ]\n}\n" if self.row_count else b"]\n}\n"
+        else:
+            head = head[: -len(b"}")] + b',"rows":['
+            tail = b"]}\n"
+
+        fd, staged_name = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.")
+        with os.fdopen(fd, "wb") as raw, _compressed(raw, self.compression) as handle:
+            handle.write(head)
+            self._spool.seek(0)
+            shutil.copyfileobj(self._spool, handle)
+            handle.write(tail)
+        self._spool.close()
+        self._staged = Path(staged_name)
+
+    def commit(self) -> Path:
+        if self._staged is None:
+            raise RuntimeError(f"{self.path.name} was not finished")
+        os.chmod(self._staged, 0o644)
+        os.replace(self._staged, self.path)
+        self._staged = None
+        return self.path
+
+    def discard(self) -> None:
+        with self._lock:
+            self._discarded = True
+            self._spool.close()
+            if self._staged is not None:
+                self._staged.unlink(missing_ok=True)
+                self._staged = None
+
+
+def _write_run_file(output_dir: Path, name: str, payload: dict, pretty: bool) -> Path:
+    path = output_dir / name
+    fd, tmp_name = tempfile.mkstemp(dir=output_dir, prefix=f".{name}.")
+    with os.fdopen(fd, "wb") as handle:
+        handle.write(_to_json_bytes(payload, pretty=pretty))
+    os.chmod(tmp_name, 0o644)
+    os.replace(tmp_name, path)
+    return path
+
+
+def write_summary(output_dir: Path, summary: SummaryResult, pretty: bool = False) -> Path:
+    """Write ``summary.json``, always uncompressed: dashboards read it directly."""
+    return _write_run_file(output_dir, SUMMARY_FILENAME, summary.model_dump(mode="json"), pretty)
+
+
+def write_timings(output_dir: Path, timings: dict, pretty: bool = False) -> Path:
+    """Write the run's per-provider spans (see `instrument.RunTimer`) to ``timings.json``."""
+    return _write_run_file(output_dir, TIMINGS_FILENAME, {"generated_at": utc_now().isoformat(), **timings}, pretty)
+
+
+def _fsync_path(path: Path) -> None:
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+_RENAME_EXCHANGE = 2
+_AT_FDCWD = -100
+
+
+def _exchange(first: Path, second: Path) -> bool:
+    """Atomically swap two paths with Linux renameat2(RENAME_EXCHANGE); False if unsupported."""
+    if not sys.platform.startswith("linux"):
+        return False
+    libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+    renameat2 = getattr(libc, "renameat2", None)
+    if renameat2 is None:
+        return False
+    result = renameat2(_AT_FDCWD, os.fsencode(first), _AT_FDCWD, os.fsencode(second), _RENAME_EXCHANGE)
+    return result == 0
+
+
+class StagedOutputDir:
+    """A run's date directory, built next to the target and swapped in with one rename.
+
+    Readers see either the previous directory or the complete new one, never a torn file.
+    Files the run did not rewrite (other providers, full exports) are carried over as hard
+    links, except ``timings.json``, which only describes the run that wrote it. Every file is
+    fsynced once at commit instead of after each write.
+    """
+
+    def __init__(self, out_root: Path, target_date: date, fsync: bool = True) -> None:
+        out_root.mkdir(parents=True, exist_ok=True)
+        self.target = out_root / target_date.isoformat()
+        self.path = Path(tempfile.mkdtemp(dir=out_root, prefix=f".{target_date.isoformat()}.staging-"))
+        os.chmod(self.path, 0o755)
+        self.fsync = fsync
+
+    def _carry_over(self) -> None:
+        if not self.target.is_dir():
+            return
+        written = {result_name(path.name) for path in self.path.iterdir()}
+        for entry in self.target.iterdir():
+            if not entry.is_file() or result_name(entry.name) in written or entry.name == TIMINGS_FILENAME:
+                continue
+            try:
+                os.link(entry, self.path / entry.name)
+            except OSError:
+                shutil.copy2(entry, self.path / entry.name)
+
+    def commit(self) -> Path:
+        self._carry_over()
+        if self.fsync:
+            for entry in self.path.iterdir():
+                _fsync_path(entry)
+            _fsync_path(self.path)
+
+        if not self.target.exists():
+            os.rename(self.path, self.target)
+        elif _exchange(self.path, self.target):
+            shutil.rmtree(self.path)
+        else:
+            # No atomic exchange: readers may briefly find no directory, but never a partial one.
+            previous = self.target.with_name(f".{self.target.name}.old-{uuid.uuid4().hex[:8]}")
+            os.rename(self.target, previous)
+            os.rename(self.path, self.target)
+            shutil.rmtree(previous)
+        if self.fsync:
+            _fsync_path(self.target.parent)
+        return self.target
+
+    def discard(self) -> None:
+        shutil.rmtree(self.path, ignore_errors=True)
+
+
+def write_provider_files(
+    output_dir: Path, provider_results: list[ProviderResult], pretty: bool = False, compression: str | None = None
+) -> None:
+    for result in provider_results:
+        writer = ProviderResultWriter(output_dir / f"{result.provider}.json", pretty=pretty, compression=compression)
+        writer.write_rows(result.rows)
+        writer.finish(result)
+        writer.commit()
+
+
 def write_results(
     out_root: Path,
     target_date: date,
     provider_results: list[ProviderResult],
     summary: SummaryResult,
     pretty: bool = False,
+    compression: str | None = None,
 ) -> Path:
-    output_dir = out_root / target_date.isoformat()
-    output_dir.mkdir(parents=True, exist_ok=True)
-
-    for result in provider_results:
-        file_path = output_dir / f"{result.provider}.json"
-        file_path.write_bytes(_to_json_bytes(result.model_dump(mode="json"), pretty=pretty))
-
-    summary_path = output_dir / "summary.json"
-    summary_path.write_bytes(_to_json_bytes(summary.model_dump(mode="json"), pretty=pretty))
-    return output_dir
+    staged = StagedOutputDir(out_root, target_date)
+    try:
+        write_provider_files(staged.path, provider_results, pretty=pretty, compression=compression)
+        write_summary(staged.path, summary, pretty=pretty)
+        return staged.commit()
+    except BaseException:
+        staged.discard()
+        raise
@@ -0,0 +1,280 @@
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import re
+import tempfile
+import uuid
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Any, Iterator
+
+from .storage import provider_files, read_json
+
+INDEX_DIRNAME = ".timeseries"
+INDEX_VERSION = 1
+MANIFEST_NAME = "series.json"
+GROUP_BYS = ("day", "week")
+AGGREGATIONS = ("sum", "mean", "min", "max", "last")
+
+DATE_DIR_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+# Row fields that hold a site path, per row kind ("" when rows carry no kind).
+PATH_FIELDS = {("", "page"), ("path", "path"), ("page", "value")}
+
+
+@dataclass(frozen=True)
+class SeriesKey:
+    provider: str
+    days: int
+    metric: str
+    path: str = ""
+
+    def encode(self) -> str:
+        return "\t".join([self.provider, str(self.days), self.metric, self.path])
+
+    @classmethod
+    def decode(cls, value: str) -> SeriesKey:
+        provider, days, metric, path = value.split("\t")
+        return cls(provider=provider, days=int(days), metric=metric, path=path)
+
+
+@dataclass(frozen=True)
+class Point:
+    day: date
+    value: float
+
+
+def _row_path(row: dict[str, Any]) -> str | None:
+    kind = str(row.get("kind") or "")
+    for row_kind, field in PATH_FIELDS:
+        if kind == row_kind and isinstance(row.get(field), str):
+            return row[field]
+    return None
+
+
+def extract_points(payload: dict[str, Any]) -> dict[SeriesKey, float]:
+    """Totals (path "") and per-path row metrics of one stored provider result."""
+    provider = str(payload["provider"])
+    window = payload["date_range"]
+    days = (date.fromisoformat(window["end"]) - date.fromisoformat(window["start"])).days + 1
+
+    points: dict[SeriesKey, float] = {}
+    for metric, value in (payload.get("metrics") or {}).items():
+        points[SeriesKey(provider, days, metric)] = float(value)
+
+    for row in payload.get("rows") or []:
+        path = _row_path(row)
+        if path is None:
+            continue
+        for metric, value in row.items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            key = SeriesKey(provider, days, metric, path)
+            # GA4 rows from several properties can share a path.
+            points[key] = points.get(key, 0.0) + float(value)
+    return points
+
+
+def _source_dirs(out_root: Path) -> dict[str, int]:
+    sources: dict[str, int] = {}
+    if not out_root.is_dir():
+        return sources
+    for entry in os.scandir(out_root):
+        if entry.is_dir() and DATE_DIR_PATTERN.match(entry.name):
+            # Provider files are renamed into place, which bumps the directory mtime.
+            sources[entry.name] = entry.stat().st_mtime_ns
+    return sources
+
+
+class TimeSeriesIndex:
+    """Column files of (day, value) points sorted by series, read through ``mmap``.
+
+    ``days.i32`` holds day ordinals and ``values.f64`` the values; ``series.json`` maps each
+    series to its ``[offset, count]`` slice and records the date directories it was built from.
+    A lookup is a dict access plus a binary search over a zero-copy slice.
+    """
+
+    def __init__(self, out_root: Path) -> None:
+        self.out_root = out_root
+        self.root = out_root / INDEX_DIRNAME
+        self._manifest: dict[str, Any] | None = None
+        self._maps: list[mmap.mmap] = []
+        self._days: memoryview | None = None
+        self._values: memoryview | None = None
+
+    def is_stale(self) -> bool:
+        manifest = self._load_manifest()
+        return manifest is None or manifest.get("sources") != _source_dirs(self.out_root)
+
+    def _load_manifest(self) -> dict[str, Any] | None:
+        if self._manifest is None:
+            try:
+                manifest = json.loads((self.root / MANIFEST_NAME).read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                return None
+            if manifest.get("version") != INDEX_VERSION:
+                return None
+            self._manifest = manifest
+        return self._manifest
+
+    def _read_dir(self, name: str, series: dict[SeriesKey, list[tuple[int, float]]]) -> None:
+        ordinal = date.fromisoformat(name).toordinal()
+        for path in provider_files(self.out_root / name):
+            try:
+                payload = read_json(path)
+                points = extract_points(payload)
+            except (OSError, ValueError, KeyError, TypeError, RuntimeError):
+                continue
+            for key, value in points.items():
+                series[key].append((ordinal, value))
+
+    def _indexed_points(self, dropped: set[int]) -> dict[SeriesKey, list[tuple[int, float]]]:
+        # Points already in the column files, except those of the given day ordinals.
+        self._open()
+        series: dict[SeriesKey, list[tuple[int, float]]] = defaultdict(list)
+        for encoded, (offset, count) in self._manifest["series"].items():
+            kept = [
+                (self._days[index], self._values[index])
+                for index in range(offset, offset + count)
+                if self._days[index] not in dropped
+            ]
+            if kept:
+                series[SeriesKey.decode(encoded)] = kept
+        return series
+
+    def build(self) -> int:
+        """Rebuild the index from every stored date directory; returns the number of points."""
+        self.close()
+        sources = _source_dirs(self.out_root)
+        series: dict[SeriesKey, list[tuple[int, float]]] = defaultdict(list)
+        for name in sorted(sources):
+            self._read_dir(name, series)
+        return self._write(series, sources)
+
+    def update(self) -> int:
+        """Re-read only date directories added, rewritten or removed since the last build.
+
+        Points of unchanged directories are taken from the current column files. Falls back
+        to `build` when there is no usable index. Returns the number of points.
+        """
+        manifest = self._load_manifest()
+        if manifest is None:
+            return self.build()
+        sources = _source_dirs(self.out_root)
+        indexed = manifest["sources"]
+        changed = sorted(name for name, mtime in sources.items() if indexed.get(name) != mtime)
+        removed = [name for name in indexed if name not in sources]
+        series = self._indexed_points({date.fromisoformat(name).toordinal() for name in [*changed, *removed]})
+        self.close()
+        for name in changed:
+            self._read_dir(name, series)
+        return self._write(series, sources)
+
+    def _write(self, series: dict[SeriesKey, list[tuple[int, float]]], sources: dict[str, int]) -> int:
+        days = array("i")
+        values = array("d")
+        slices: dict[str, list[int]] = {}
+        for key in sorted(series, key=SeriesKey.encode):
+            points = sorted(series[key])
+            slices[key.encode()] = [len(days), len(points)]
+            days.extend(ordinal for ordinal, _ in points)
+            values.extend(value for _, value in points)
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        generation = uuid.uuid4().hex[:12]
+        (self.root / f"days-{generation}.i32").write_bytes(days.tobytes())
+        (self.root / f"values-{generation}.f64").write_bytes(values.tobytes())
+        manifest = {"version": INDEX_VERSION, "generation": generation, "sources": sources, "series": slices}
+        fd, tmp_name = tempfile.mkstemp(dir=self.root, prefix=".series.")
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            json.dump(manifest, handle, separators=(",", ":"))
+        # The manifest names its generation, so swapping it in switches readers atomically.
+        os.replace(tmp_name, self.root / MANIFEST_NAME)
+        for stale in self.root.iterdir():
+            if stale.suffix in {".i32", ".f64"} and generation not in stale.name:
+                stale.unlink(missing_ok=True)
+        self._manifest = manifest
+        return len(days)
+
+    def ensure_current(self) -> bool:
+        """Update the index when date directories were added or rewritten; returns True if updated."""
+        if self.is_stale():
+            self.update()
+            return True
+        return False
+
+    def _open(self) -> None:
+        if self._days is not None:
+            return
+        manifest = self._load_manifest()
+        if manifest is None:
+            raise RuntimeError(f"No time-series index under {self.root}; build it first")
+        generation = manifest["generation"]
+        self._days = self._map(self.root / f"days-{generation}.i32", "i")
+        self._values = self._map(self.root / f"values-{generation}.f64", "d")
+
+    def _map(self, path: Path, typecode: str) -> memoryview:
+        with path.open("rb") as handle:
+            if os.fstat(handle.fileno()).st_size == 0:
+                return memoryview(array(typecode))
+            mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        self._maps.append(mapped)
+        return memoryview(mapped).cast(typecode)
+
+    def close(self) -> None:
+        if self._days is not None:
+            self._days.release()
+            self._values.release()
+        self._days = self._values = None
+        for mapped in self._maps:
+            mapped.close()
+        self._maps = []
+        self._manifest = None
+
+    def series_keys(self) -> Iterator[SeriesKey]:
+        manifest = self._load_manifest() or {"series": {}}
+        return (SeriesKey.decode(value) for value in manifest["series"])
+
+    def points(self, key: SeriesKey, start: date | None = None, end: date | None = None) -> list[Point]:
+        self._open()
+        slot = self._manifest["series"].get(key.encode())
+        if slot is None:
+            return []
+        offset, count = slot
+        days = self._days[offset : offset + count]
+        values = self._values[offset : offset + count]
+        lo = bisect_left(days, start.toordinal()) if start else 0
+        hi = bisect_right(days, end.toordinal()) if end else count
+        return [Point(date.fromordinal(days[index]), values[index]) for index in range(lo, hi)]
+
+
+def _period(day: date, group_by: str) -> str:
+    if group_by == "week":
+        year, week, _ = day.isocalendar()
+        return f"{year}-W{week:02d}"
+    return day.isoformat()
+
+
+def group_points(points: list[Point], group_by: str, agg: str) -> list[tuple[str, float]]:
+    grouped: dict[str, list[float]] = {}
+    for point in points:
+        grouped.setdefault(_period(point.day, group_by), []).append(point.value)
+
+    def reduce(values: list[float]) -> float:
+        if agg == "sum":
+            return sum(values)
+        if agg == "mean":
+            return sum(values) / len(values)
+        if agg == "min":
+            return min(values)
+        if agg == "max":
+            return max(values)
+        return values[-1]
+
+    return [(period, reduce(values)) for period, values in grouped.items()]
+
@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import uuid
+from itertools import islice
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+from .config import DateWindow
+from .schema import ProviderResult
+
+WAREHOUSE_SCHEMA_VERSION = 1
+INSERT_BATCH_SIZE = 5_000
+BUSY_TIMEOUT_SECONDS = 60.0
+
+# Row field that identifies a row within its kind, in order of preference.
+ROW_KEY_FIELDS = ("value", "page", "path", "status_group", "date")
+# Providers whose rows carry no "kind" field.
+DEFAULT_ROW_KINDS = {"ga4": "page"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    provider TEXT NOT NULL,
+    end_date TEXT NOT NULL,
+    start_date TEXT NOT NULL,
+    generated_at TEXT NOT NULL,
+    row_count INTEGER NOT NULL,
+    notes TEXT NOT NULL,
+    errors TEXT NOT NULL,
+    PRIMARY KEY (provider, end_date, start_date)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS metrics (
+    provider TEXT NOT NULL,
+    end_date TEXT NOT NULL,
+    start_date TEXT NOT NULL,
+    name TEXT NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (provider, end_date, start_date, name)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS rows (
+    provider TEXT NOT NULL,
+    end_date TEXT NOT NULL,
+    start_date TEXT NOT NULL,
+    ordinal INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (provider, end_date, start_date, ordinal)
+);
+
+CREATE INDEX IF NOT EXISTS rows_by_date ON rows (provider, end_date, kind, key);
+CREATE INDEX IF NOT EXISTS rows_by_key ON rows (provider, kind, key, end_date);
+
+CREATE TABLE IF NOT EXISTS staged_rows (
+    stage TEXT NOT NULL,
+    ordinal INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (stage, ordinal)
+) WITHOUT ROWID;
+"""
+
+
+def connect(path: Path) -> sqlite3.Connection:
+    """Open the warehouse in WAL mode, creating or migrating the schema as needed."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Autocommit mode; transactions are explicit so each batch is exactly one transaction.
+    conn = sqlite3.connect(str(path), timeout=BUSY_TIMEOUT_SECONDS, isolation_level=None, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version > WAREHOUSE_SCHEMA_VERSION:
+        conn.close()
+        raise RuntimeError(f"{path} has warehouse schema v{version}; this collector supports v{WAREHOUSE_SCHEMA_VERSION}")
+    if version < WAREHOUSE_SCHEMA_VERSION:
+        # executescript commits any open transaction first, so the script carries its own.
+        conn.executescript(f"BEGIN IMMEDIATE;{SCHEMA}PRAGMA user_version = {WAREHOUSE_SCHEMA_VERSION};COMMIT;")
+    return conn
+
+
+def row_kind_key(provider: str, row: dict[str, Any]) -> tuple[str, str]:
+    kind = str(row.get("kind") or DEFAULT_ROW_KINDS.get(provider, "row"))
+    for field in ROW_KEY_FIELDS:
+        if field in row:
+            return kind, str(row[field])
+    return kind, ""
+
+
+def _chunks(items: Iterable[Any], size: int) -> Iterator[list[Any]]:
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+class WarehouseWriter:
+    """Row sink that replaces one provider window in the warehouse.
+
+    Batches go to ``staged_rows`` in short transactions while the collector runs; `commit`
+    swaps them in for the window in a single transaction, so re-running a date replaces its
+    rows instead of duplicating them and an aborted run changes nothing.
+    """
+
+    def __init__(self, path: Path, provider: str, date_window: DateWindow) -> None:
+        self.path = path
+        self.provider = provider
+        self.window_key = (provider, date_window.end.isoformat(), date_window.start.isoformat())
+        self.row_count = 0
+        self._stage = uuid.uuid4().hex
+        self._result: ProviderResult | None = None
+        self._conn: sqlite3.Connection | None = None
+        # `discard` may come from the runner while an abandoned collector thread still writes.
+        self._lock = threading.Lock()
+        self._discarded = False
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = connect(self.path)
+        return self._conn
+
+    def write_rows(self, rows: list[dict[str, Any]]) -> None:
+        values = [
+            (self._stage, self.row_count + offset, *row_kind_key(self.provider, row), _encode(row))
+            for offset, row in enumerate(rows)
+        ]
+        with self._lock:
+            if self._discarded or not values:
+                return
+            conn = self._connection()
+            for chunk in _chunks(values, INSERT_BATCH_SIZE):
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    conn.executemany(
+                        "INSERT INTO staged_rows (stage, ordinal, kind, key, data) VALUES (?, ?, ?, ?, ?)", chunk
+                    )
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+                conn.execute("COMMIT")
+            self.row_count += len(values)
+
+    def finish(self, result: ProviderResult) -> None:
+        self._result = result
+
+    def commit(self) -> None:
+        result = self._result
+        if result is None:
+            return
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            _replace_result(conn, self.window_key, result, self.row_count)
+            conn.execute(
+                "INSERT INTO rows (provider, end_date, start_date, ordinal, kind, key, data) "
+                "SELECT ?, ?, ?, ordinal, kind, key, data FROM staged_rows WHERE stage = ? ORDER BY ordinal",
+                (*self.window_key, self._stage),
+            )
+            conn.execute("DELETE FROM staged_rows WHERE stage = ?", (self._stage,))
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        self._close()
+
+    def discard(self) -> None:
+        with self._lock:
+            self._discarded = True
+            self._result = None
+            if self.row_count:
+                try:
+                    self._connection().execute("DELETE FROM staged_rows WHERE stage = ?", (self._stage,))
+                except sqlite3.Error:
+                    # Left-over staged rows are harmless; they are never read.
+                    pass
+            self._close()
+
+    def _close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+def _encode(row: dict[str, Any]) -> str:
+    return json.dumps(row, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+
+
+def _replace_result(conn: sqlite3.Connection, window_key: tuple[str, str, str], result: ProviderResult, row_count: int) -> None:
+    """Drop everything stored for the window, then insert the result and metrics (not rows)."""
+    for table in ("results", "metrics", "rows"):
+        conn.execute(f"DELETE FROM {table} WHERE provider = ? AND end_date = ? AND start_date = ?", window_key)
+    conn.execute(
+        "INSERT INTO results (provider, end_date, start_date, generated_at, row_count, notes, errors) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (
+            *window_key,
+            result.generated_at.isoformat(),
+            row_count,
+            json.dumps(result.notes, ensure_ascii=False),
+            json.dumps(result.errors, ensure_ascii=False),
+        ),
+    )
+    conn.executemany(
+        "INSERT INTO metrics (provider, end_date, start_date, name, value) VALUES (?, ?, ?, ?, ?)",
+        [(*window_key, name, float(value)) for name, value in sorted(result.metrics.items())],
+    )
+
+
+def upsert_results(path: Path, provider_results: list[ProviderResult]) -> None:
+    """Warehouse counterpart of `write_results` for results that hold their rows in memory.
+
+    All providers of a run are replaced in one transaction.
+    """
+    conn = connect(path)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for result in provider_results:
+                window_key = (result.provider, result.date_range.end.isoformat(), result.date_range.start.isoformat())
+                _replace_result(conn, window_key, result, len(result.rows))
+                values = (
+                    (*window_key, ordinal, *row_kind_key(result.provider, row), _encode(row))
+                    for ordinal, row in enumerate(result.rows)
+                )
+                for chunk in _chunks(values, INSERT_BATCH_SIZE):
+                    conn.executemany(
+                        "INSERT INTO rows (provider, end_date, start_date, ordinal, kind, key, data) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        chunk,
+                    )
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+    finally:
+        conn.close()
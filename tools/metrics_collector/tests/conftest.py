@@ -0,0 +1,60 @@
+import json
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+from geovito_metrics_collector.config import CollectorConfig
+from geovito_metrics_collector.credentials import ALL_GOOGLE_SCOPES
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "benchmarks"))
+import standin_api  # noqa: E402
+
+
+@pytest.fixture
+def collector_config(tmp_path: Path) -> CollectorConfig:
+    return CollectorConfig(
+        ga4_property_id=None,
+        gsc_site_url=None,
+        google_oauth_client_secret_file=None,
+        google_token_cache=tmp_path / "tokens.json",
+        cloudflare_api_token=None,
+        cloudflare_account_id=None,
+        cloudflare_zone_id=None,
+        adsense_account=None,
+        collector_timezone="UTC",
+    )
+
+
+@pytest.fixture
+def standin(tmp_path):
+    server, stats = standin_api.make_server(standin_api.SyntheticAccount(pages=300, queries=700, paths=120))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    (tmp_path / "client_secret.json").write_text("{}")
+    token = {
+        "token": "t",
+        "refresh_token": "r",
+        "client_id": "c",
+        "client_secret": "s",
+        "scopes": list(ALL_GOOGLE_SCOPES),
+        "expiry": "2099-01-01T00:00:00Z",
+    }
+    (tmp_path / "tokens.json").write_text(json.dumps(token))
+    config = CollectorConfig(
+        ga4_property_id="1,2",
+        gsc_site_url="sc-domain:geovito.com",
+        google_oauth_client_secret_file=tmp_path / "client_secret.json",
+        google_token_cache=tmp_path / "tokens.json",
+        cloudflare_api_token="t",
+        cloudflare_account_id="a",
+        cloudflare_zone_id=None,
+        adsense_account=None,
+        collector_timezone="UTC",
+        cache_enabled=False,
+        export_root=tmp_path / "exports",
+        api_base_url=standin_api.base_url(server),
+    )
+    yield config, stats
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,71 @@
+from datetime import date
+
+from geovito_metrics_collector import backfill, runner
+from geovito_metrics_collector.backfill import BackfillJournal, run_backfill, split_date_range
+from geovito_metrics_collector.schema import make_provider_result
+
+
+def test_split_date_range_builds_one_window_per_day() -> None:
+    windows = split_date_range(date(2026, 2, 1), date(2026, 2, 3), days=7)
+    assert [window.end for window in windows] == [date(2026, 2, 1), date(2026, 2, 2), date(2026, 2, 3)]
+    assert windows[0].start == date(2026, 1, 26)
+
+
+def test_backfill_writes_days_and_resumes_from_journal(monkeypatch, tmp_path, collector_config) -> None:
+    failures = {date(2026, 2, 2)}
+
+    def collect(config, date_window, row_limit):
+        if date_window.end in failures:
+            failures.discard(date_window.end)
+            raise RuntimeError("quota")
+        return make_provider_result(provider="ga4", start=date_window.start, end=date_window.end, metrics={"sessions": 1})
+
+    monkeypatch.setitem(runner.COLLECTORS, "ga4", collect)
+    windows = split_date_range(date(2026, 2, 1), date(2026, 2, 3), days=1)
+    journal = BackfillJournal.for_output(tmp_path)
+
+    first = run_backfill(collector_config, windows, ["ga4"], out_root=tmp_path, journal=journal, workers=1)
+    assert first.written == [date(2026, 2, 1)]
+    assert list(first.failed) == [date(2026, 2, 2)]
+    assert first.not_started == [date(2026, 2, 3)]
+
+    second = run_backfill(collector_config, windows, ["ga4"], out_root=tmp_path, journal=journal, workers=2)
+    assert second.skipped == [date(2026, 2, 1)]
+    assert second.written == [date(2026, 2, 2), date(2026, 2, 3)]
+    assert (tmp_path / "2026-02-03" / "summary.json").exists()
+    assert journal.completed(1, ["ga4"]) == {date(2026, 2, 1), date(2026, 2, 2), date(2026, 2, 3)}
+
+
+def test_backfill_records_write_failures_and_stops(monkeypatch, tmp_path, collector_config) -> None:
+    def collect(config, date_window, row_limit):
+        return make_provider_result(provider="ga4", start=date_window.start, end=date_window.end, metrics={"sessions": 1})
+
+    def write_results(**kwargs):
+        raise OSError("No space left on device")
+
+    monkeypatch.setitem(runner.COLLECTORS, "ga4", collect)
+    monkeypatch.setattr(backfill, "write_results", write_results)
+    windows = split_date_range(date(2026, 2, 1), date(2026, 2, 2), days=1)
+    journal = BackfillJournal.for_output(tmp_path)
+    lines: list[str] = []
+
+    report = run_backfill(collector_config, windows, ["ga4"], out_root=tmp_path, journal=journal, workers=1, echo=lines.append)
+
+    assert report.failed == {date(2026, 2, 1): ["OSError: No space left on device"]}
+    assert report.not_started == [date(2026, 2, 2)]
+    assert lines == ["- 2026-02-01: failed -> OSError: No space left on device"]
+    assert journal.completed(1, ["ga4"]) == set()
+
+
+def test_fail_soft_days_with_provider_errors_are_not_journaled(monkeypatch, tmp_path, collector_config) -> None:
+    def collect(config, date_window, row_limit):
+        raise RuntimeError("quota")
+
+    monkeypatch.setitem(runner.COLLECTORS, "ga4", collect)
+    windows = split_date_range(date(2026, 2, 1), date(2026, 2, 1), days=1)
+    journal = BackfillJournal.for_output(tmp_path)
+
+    report = run_backfill(collector_config, windows, ["ga4"], out_root=tmp_path, journal=journal, fail_soft=True)
+
+    assert report.written == [date(2026, 2, 1)]
+    assert journal.completed(1, ["ga4"]) == set()
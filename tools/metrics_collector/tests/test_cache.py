@@ -0,0 +1,84 @@
+import os
+from dataclasses import replace
+from datetime import date
+
+from geovito_metrics_collector.cache import (
+    FINAL_TTL_SECONDS,
+    RECENT_TTL_SECONDS,
+    ResponseCache,
+    cache_key,
+    cached_fetch,
+    ttl_for_window,
+)
+from geovito_metrics_collector.config import DateWindow
+
+WINDOW = DateWindow(start=date(2026, 2, 1), end=date(2026, 2, 7))
+
+
+def test_cache_key_depends_on_provider_request_and_window() -> None:
+    base = cache_key("gsc", {"body": {"rowLimit": 1}}, WINDOW)
+    assert base == cache_key("gsc", {"body": {"rowLimit": 1}}, WINDOW)
+    assert base != cache_key("ga4", {"body": {"rowLimit": 1}}, WINDOW)
+    assert base != cache_key("gsc", {"body": {"rowLimit": 2}}, WINDOW)
+    assert base != cache_key("gsc", {"body": {"rowLimit": 1}}, DateWindow(start=WINDOW.start, end=date(2026, 2, 8)))
+
+
+def test_ttl_uses_provider_finalization_lag() -> None:
+    assert ttl_for_window("gsc", WINDOW, today=date(2026, 2, 10)) == FINAL_TTL_SECONDS
+    assert ttl_for_window("gsc", WINDOW, today=date(2026, 2, 9)) == RECENT_TTL_SECONDS
+    assert ttl_for_window("cloudflare", WINDOW, today=date(2026, 2, 8)) == FINAL_TTL_SECONDS
+
+
+def test_cached_fetch_reuses_response_until_disabled(tmp_path, collector_config) -> None:
+    config = replace(collector_config, cache_dir=tmp_path / "cache")
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return {"rows": [{"clicks": 3}]}
+
+    assert cached_fetch(config, "gsc", WINDOW, {"q": 1}, fetch) == {"rows": [{"clicks": 3}]}
+    assert cached_fetch(config, "gsc", WINDOW, {"q": 1}, fetch) == {"rows": [{"clicks": 3}]}
+    assert len(calls) == 1
+
+    cached_fetch(replace(config, cache_enabled=False), "gsc", WINDOW, {"q": 1}, fetch)
+    assert len(calls) == 2
+
+
+def test_cache_evicts_least_recently_used_entries(tmp_path) -> None:
+    cache = ResponseCache(tmp_path, max_bytes=400)
+    payload = {"blob": "x" * 60}
+    for index, key in enumerate(["a1", "b2", "c3"]):
+        cache.put(key, payload, ttl_seconds=60)
+        os.utime(cache._path(key), (1000 + index, 1000 + index))
+
+    assert cache.get("a1") == payload  # refreshes a1, making b2 the oldest entry
+    cache.put("d4", payload, ttl_seconds=60)
+
+    assert cache.get("b2") is None
+    assert cache.get("a1") == payload
+    assert cache.get("d4") == payload
+
+
+def test_cache_drops_expired_entries(tmp_path) -> None:
+    cache = ResponseCache(tmp_path, max_bytes=10_000)
+    cache.put("e5", {"ok": True}, ttl_seconds=-1)
+    assert cache.get("e5") is None
+
+
+def test_uncacheable_requests_and_identities_stay_apart(tmp_path, collector_config) -> None:
+    config = replace(collector_config, cache_dir=tmp_path / "cache")
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return {"page": len(calls)}
+
+    cached_fetch(config, "ga4", WINDOW, {"q": 1}, fetch, cacheable=False)
+    cached_fetch(config, "ga4", WINDOW, {"q": 1}, fetch, cacheable=False)
+    assert len(calls) == 2
+    assert not list((tmp_path / "cache").rglob("*.json"))
+
+    assert cached_fetch(config, "adsense", WINDOW, {"q": 1}, fetch, identity="a") == {"page": 3}
+    assert cached_fetch(config, "adsense", WINDOW, {"q": 1}, fetch, identity="b") == {"page": 4}
+    assert cached_fetch(config, "adsense", WINDOW, {"q": 1}, fetch, identity="a") == {"page": 3}
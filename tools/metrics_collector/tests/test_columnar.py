@@ -0,0 +1,57 @@
+from datetime import date
+
+import pytest
+
+from geovito_metrics_collector import runner
+from geovito_metrics_collector.columnar import partition_path, write_columnar
+from geovito_metrics_collector.config import DateWindow
+from geovito_metrics_collector.schema import make_provider_result
+
+pa = pytest.importorskip("pyarrow")
+ds = pytest.importorskip("pyarrow.dataset")
+
+WINDOW = DateWindow(start=date(2026, 2, 1), end=date(2026, 2, 7))
+
+
+def _result(provider, rows, metrics):
+    return make_provider_result(provider=provider, start=WINDOW.start, end=WINDOW.end, metrics=metrics, rows=rows)
+
+
+def test_write_columnar_partitions_by_provider_and_date_with_typed_columns(tmp_path) -> None:
+    results = [
+        _result("gsc", [{"kind": "query", "value": "rome", "clicks": 3, "impressions": 40.0}], {"clicks": 3.0}),
+        _result("adsense", [{"kind": "daily", "date": "2026-02-07", "estimatedEarnings": 1.25}], {"impressions": 9.0}),
+    ]
+
+    write_columnar(tmp_path, WINDOW.end, results, "parquet")
+
+    assert partition_path(tmp_path, "rows", "gsc", WINDOW.end, "parquet").exists()
+    rows = ds.dataset(tmp_path / "columnar" / "rows", format="parquet", partitioning="hive")
+    assert rows.schema.field("clicks").type == pa.float64()
+    assert rows.schema.field("window_start").type == pa.date32()
+    table = rows.to_table(columns=["clicks", "value"], filter=ds.field("provider") == "gsc")
+    assert table.to_pylist() == [{"clicks": 3.0, "value": "rome"}]
+
+    metrics = ds.dataset(tmp_path / "columnar" / "metrics", format="parquet", partitioning="hive").to_table()
+    assert sorted(zip(metrics["provider"].to_pylist(), metrics["metric"].to_pylist())) == [
+        ("adsense", "impressions"),
+        ("gsc", "clicks"),
+    ]
+
+
+def test_stream_providers_tees_batches_into_arrow_files(monkeypatch, collector_config, tmp_path) -> None:
+    def stream(config, date_window, row_limit):
+        yield [{"page": "/en/a", "sessions": 2}]
+        yield [{"page": "/en/b", "sessions": 1.5, "property": "123"}]
+        return _result("ga4", [], {"sessions": 3.5})
+
+    monkeypatch.setitem(runner.COLLECTORS, "ga4", stream)
+
+    streamed = runner.stream_providers(collector_config, WINDOW, ["ga4"], tmp_path / "2026-02-07", columnar_format="arrow")
+    assert not partition_path(tmp_path, "rows", "ga4", WINDOW.end, "arrow").exists()
+    runner.commit_side_outputs(streamed)
+
+    table = pa.ipc.open_file(str(partition_path(tmp_path, "rows", "ga4", WINDOW.end, "arrow"))).read_all()
+    assert table.column("sessions").to_pylist() == [2.0, 1.5]
+    assert table.column("property").to_pylist() == [None, "123"]
+    assert (tmp_path / "2026-02-07" / "ga4.json").exists()
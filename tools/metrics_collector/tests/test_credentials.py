@@ -0,0 +1,121 @@
+import json
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+from google.auth.exceptions import RefreshError, TransportError
+
+from geovito_metrics_collector import credentials
+from geovito_metrics_collector.credentials import ALL_GOOGLE_SCOPES, GoogleCredentialBroker
+
+
+def _write_token(path, expiry, scopes=ALL_GOOGLE_SCOPES):
+    path.write_text(
+        json.dumps(
+            {
+                "token": "old-token",
+                "refresh_token": "refresh",
+                "client_id": "client",
+                "client_secret": "secret",
+                "scopes": list(scopes),
+                "expiry": expiry.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            }
+        ),
+        encoding="utf-8",
+    )
+
+
+def test_broker_refreshes_once_for_concurrent_callers(monkeypatch, tmp_path) -> None:
+    token_path = tmp_path / "tokens.json"
+    _write_token(token_path, datetime.utcnow() - timedelta(minutes=1))
+    refreshes = []
+
+    def fake_refresh(self, request):
+        refreshes.append(1)
+        self.token = "new-token"
+        self.expiry = datetime.utcnow() + timedelta(hours=1)
+
+    monkeypatch.setattr(credentials.Credentials, "refresh", fake_refresh)
+    broker = GoogleCredentialBroker(tmp_path / "secret.json", token_path)
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(broker.get())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(refreshes) == 1
+    assert all(item is results[0] for item in results)
+    assert json.loads(token_path.read_text(encoding="utf-8"))["token"] == "new-token"
+
+    # A second process sees the refreshed file and does not refresh again.
+    other = GoogleCredentialBroker(tmp_path / "secret.json", token_path)
+    assert other.get().token == "new-token"
+    assert len(refreshes) == 1
+
+
+def test_broker_reconsents_when_cached_scopes_are_narrower(monkeypatch, tmp_path) -> None:
+    token_path = tmp_path / "tokens.json"
+    _write_token(token_path, datetime.utcnow() + timedelta(hours=1), scopes=[credentials.GOOGLE_SCOPE_GA4])
+    flows = []
+
+    class FakeFlow:
+        @classmethod
+        def from_client_secrets_file(cls, path, scopes):
+            flows.append(tuple(scopes))
+            return cls()
+
+        def run_local_server(self, port):
+            return credentials.Credentials(
+                token="union-token",
+                refresh_token="refresh",
+                client_id="client",
+                client_secret="secret",
+                scopes=list(ALL_GOOGLE_SCOPES),
+                expiry=datetime.utcnow() + timedelta(hours=1),
+            )
+
+    monkeypatch.setattr(credentials, "InstalledAppFlow", FakeFlow)
+    monkeypatch.setattr(credentials, "_interactive", lambda: True)
+    broker = GoogleCredentialBroker(tmp_path / "secret.json", token_path)
+
+    assert broker.get().token == "union-token"
+    assert broker.get().token == "union-token"
+    assert flows == [tuple(sorted(ALL_GOOGLE_SCOPES))]
+
+
+class _NoFlow:
+    @classmethod
+    def from_client_secrets_file(cls, path, scopes):
+        raise AssertionError("consent flow started")
+
+
+def test_broker_propagates_transport_errors_without_reconsent(monkeypatch, tmp_path) -> None:
+    token_path = tmp_path / "tokens.json"
+    _write_token(token_path, datetime.utcnow() - timedelta(minutes=1))
+
+    def failing_refresh(self, request):
+        raise TransportError("Name or service not known")
+
+    monkeypatch.setattr(credentials.Credentials, "refresh", failing_refresh)
+    monkeypatch.setattr(credentials, "InstalledAppFlow", _NoFlow)
+    monkeypatch.setattr(credentials, "_interactive", lambda: True)
+
+    with pytest.raises(TransportError):
+        GoogleCredentialBroker(tmp_path / "secret.json", token_path).get()
+
+
+def test_broker_refuses_consent_flow_without_a_terminal(monkeypatch, tmp_path) -> None:
+    token_path = tmp_path / "tokens.json"
+    _write_token(token_path, datetime.utcnow() - timedelta(minutes=1))
+
+    def revoked_refresh(self, request):
+        raise RefreshError("invalid_grant: Token has been expired or revoked.")
+
+    monkeypatch.setattr(credentials.Credentials, "refresh", revoked_refresh)
+    monkeypatch.setattr(credentials, "InstalledAppFlow", _NoFlow)
+    monkeypatch.setattr(credentials, "_interactive", lambda: False)
+
+    with pytest.raises(RuntimeError, match="re-run the collector interactively"):
+        GoogleCredentialBroker(tmp_path / "secret.json", token_path).get()
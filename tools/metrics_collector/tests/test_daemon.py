@@ -0,0 +1,91 @@
+import json
+import os
+
+import pytest
+
+from geovito_metrics_collector import runner
+from geovito_metrics_collector.daemon import (
+    CollectorDaemon,
+    EnvFileReloader,
+    ServeOptions,
+    parse_interval,
+    parse_schedule,
+)
+from geovito_metrics_collector.schema import make_provider_result
+
+ENV_KEYS = ("COLLECTOR_SCHEDULE", "COLLECTOR_TIMEZONE", "DAEMON_TEST_FROM_FILE", "DAEMON_TEST_FROM_ENV")
+
+
+@pytest.fixture
+def clean_env(monkeypatch):
+    for key in ENV_KEYS:
+        monkeypatch.delenv(key, raising=False)
+
+
+def _write_env(path, text, stamp):
+    path.write_text(text, encoding="utf-8")
+    os.utime(path, ns=(stamp, stamp))
+
+
+def test_parse_schedule() -> None:
+    assert parse_interval("90s") == 90
+    assert parse_interval("1.5h") == 5400
+    assert parse_schedule("gsc=1d, cloudflare=15m", ["ga4", "gsc", "cloudflare"]) == {"gsc": 86400, "cloudflare": 900}
+    with pytest.raises(ValueError):
+        parse_schedule("bing=1h", ["ga4"])
+    with pytest.raises(ValueError):
+        parse_interval("soon")
+
+
+def test_env_reloader_follows_file_edits_but_not_real_environment(clean_env, monkeypatch, tmp_path) -> None:
+    monkeypatch.setenv("DAEMON_TEST_FROM_ENV", "real")
+    env_file = tmp_path / ".env"
+    _write_env(env_file, "DAEMON_TEST_FROM_FILE=one\nDAEMON_TEST_FROM_ENV=file\n", 1_000_000_000)
+    reloader = EnvFileReloader(env_file)
+
+    assert reloader.refresh()
+    assert os.environ["DAEMON_TEST_FROM_FILE"] == "one"
+    assert os.environ["DAEMON_TEST_FROM_ENV"] == "real"
+    assert not reloader.refresh()
+
+    _write_env(env_file, "DAEMON_TEST_FROM_ENV=file\n", 2_000_000_000)
+    assert reloader.refresh()
+    assert "DAEMON_TEST_FROM_FILE" not in os.environ
+    assert os.environ["DAEMON_TEST_FROM_ENV"] == "real"
+
+
+def test_daemon_runs_due_providers_and_keeps_the_others_in_the_summary(clean_env, monkeypatch, tmp_path) -> None:
+    calls = []
+
+    def fake(provider, value):
+        def collect(config, date_window, row_limit):
+            calls.append(provider)
+            return make_provider_result(provider, date_window.start, date_window.end, metrics={"requests": value, "sessions": value})
+
+        return collect
+
+    monkeypatch.setitem(runner.COLLECTORS, "ga4", fake("ga4", 3.0))
+    monkeypatch.setitem(runner.COLLECTORS, "cloudflare", fake("cloudflare", 5.0))
+    env_file = tmp_path / ".env"
+    _write_env(env_file, "COLLECTOR_TIMEZONE=UTC\nCOLLECTOR_SCHEDULE=cloudflare=1h,ga4=1d\n", 1_000_000_000)
+
+    now = [0.0]
+    daemon = CollectorDaemon(ServeOptions(out=tmp_path / "out"), env_file=str(env_file), clock=lambda: now[0])
+    assert daemon.reload()
+    assert daemon.due() == ["ga4", "cloudflare"]
+    output_dir = daemon.collect(daemon.due())
+
+    now[0] = 3600.0
+    assert daemon.due() == ["cloudflare"]
+    daemon.collect(daemon.due())
+    assert calls == ["ga4", "cloudflare", "cloudflare"]
+
+    summary = json.loads((output_dir / "summary.json").read_text(encoding="utf-8"))
+    assert [item["provider"] for item in summary["providers"]] == ["ga4", "cloudflare"]
+    assert summary["kpis"]["sessions_7d"] == 3.0
+    assert summary["kpis"]["cf_requests_7d"] == 5.0
+
+    _write_env(env_file, "COLLECTOR_TIMEZONE=UTC\nCOLLECTOR_SCHEDULE=cloudflare=10m\n", 2_000_000_000)
+    assert daemon.reload()
+    assert daemon.intervals == {"cloudflare": 600.0}
+    assert daemon.seconds_until_due() == 600.0
@@ -0,0 +1,98 @@
+from datetime import date, timedelta
+
+import pytest
+
+from geovito_metrics_collector import runner
+from geovito_metrics_collector.config import DateWindow
+from geovito_metrics_collector.daystore import combine_rows, compose_result, get_day_store
+from geovito_metrics_collector.schema import make_provider_result
+
+END = date(2026, 4, 28)
+
+
+def _counting_collector(calls):
+    def collect(config, date_window, row_limit):
+        assert date_window.start == date_window.end
+        calls.append(date_window.end)
+        day = date_window.end.day
+        return make_provider_result(
+            provider="gsc",
+            start=date_window.start,
+            end=date_window.end,
+            metrics={"clicks": day, "impressions": 10.0 * day, "ctr": 0.1, "position": float(day)},
+            rows=[
+                {"kind": "page", "value": "/en/a", "clicks": 1, "impressions": 10, "ctr": 0.1, "position": 2.0},
+                {"kind": "page", "value": f"/en/{day}", "clicks": 2, "impressions": 4, "ctr": 0.5, "position": 1.0},
+            ],
+        )
+
+    return collect
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    calls = []
+    monkeypatch.setitem(runner.COLLECTORS, "gsc", _counting_collector(calls))
+    return calls
+
+
+def test_windows_reuse_stored_final_days(monkeypatch, collector_config, tmp_path, calls) -> None:
+    monkeypatch.setattr(runner, "today_in_timezone", lambda _: END + timedelta(days=30))
+
+    week = runner.collect_from_days(collector_config, DateWindow(END - timedelta(days=6), END), ["gsc"], tmp_path)
+    assert sorted(calls) == [END - timedelta(days=offset) for offset in range(6, -1, -1)]
+    assert week.fetched_days == sorted(calls)
+
+    calls.clear()
+    month = runner.collect_from_days(collector_config, DateWindow(END - timedelta(days=27), END), ["gsc"], tmp_path)
+    assert len(calls) == 21 and max(calls) == END - timedelta(days=7)
+
+    result = month.results[0]
+    assert result.metrics["clicks"] == sum(range(1, 29))
+    # ctr and position are re-weighted by impressions, not averaged.
+    assert result.metrics["ctr"] == pytest.approx(0.1)
+    assert result.metrics["position"] == pytest.approx(sum(day * day for day in range(1, 29)) / sum(range(1, 29)))
+    assert result.rows[0] == {"kind": "page", "value": "/en/a", "clicks": 28.0, "impressions": 280.0, "ctr": 0.1, "position": 2.0}
+    assert "composed from 28 stored days" in result.notes
+
+
+def test_non_final_and_short_days_are_refetched(monkeypatch, collector_config, tmp_path, calls) -> None:
+    monkeypatch.setattr(runner, "today_in_timezone", lambda _: END)
+    window = DateWindow(END - timedelta(days=6), END)
+
+    runner.collect_from_days(collector_config, window, ["gsc"], tmp_path)
+    calls.clear()
+    runner.collect_from_days(collector_config, window, ["gsc"], tmp_path)
+    # GSC finalizes after 3 days: the last 3 days of the window are fetched again.
+    assert sorted(calls) == [END - timedelta(days=offset) for offset in (2, 1, 0)]
+    assert get_day_store(tmp_path).load("gsc", END - timedelta(days=3)).final is True
+
+    calls.clear()
+    runner.collect_from_days(collector_config, window, ["gsc"], tmp_path, row_limit=100)
+    assert len(calls) == 7
+
+
+def test_compose_reports_failed_days(tmp_path) -> None:
+    window = DateWindow(date(2026, 4, 1), date(2026, 4, 2))
+    ok = make_provider_result(provider="cloudflare", start=window.start, end=window.start, metrics={"requests": 5.0})
+    failed = make_provider_result(provider="cloudflare", start=window.end, end=window.end, errors=["timed out"])
+
+    result = compose_result("cloudflare", window, [ok], 50, {window.end: failed})
+    assert result.metrics == {"requests": 5.0}
+    assert result.errors == ["2026-04-02: timed out"]
+
+    dormant = compose_result("cloudflare", window, [], 50, {window.start: failed, window.end: failed})
+    assert dormant.errors == ["timed out"]
+
+
+def test_combine_rows_keeps_breakdowns_and_ranks_top_lists() -> None:
+    day_rows = [
+        [{"kind": "path", "path": "/a", "requests": 1}, {"kind": "status_group", "status_group": "2xx", "requests": 5}],
+        [{"kind": "path", "path": "/b", "requests": 3}, {"kind": "status_group", "status_group": "2xx", "requests": 1}],
+    ]
+    assert combine_rows(day_rows, 1) == [{"kind": "path", "path": "/b", "requests": 3.0}]
+    assert combine_rows(day_rows, 10) == [
+        {"kind": "path", "path": "/b", "requests": 3.0},
+        {"kind": "path", "path": "/a", "requests": 1.0},
+        {"kind": "status_group", "status_group": "2xx", "requests": 6.0},
+    ]
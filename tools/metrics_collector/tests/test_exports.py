@@ -0,0 +1,35 @@
+import json
+
+from geovito_metrics_collector.exports import RowExport
+
+
+def _read_rows(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_row_export_sanitizes_and_commits(tmp_path) -> None:
+    path = tmp_path / "2026-02-07" / "gsc.query.jsonl"
+    export = RowExport(path, "test export")
+    export.append_page([{"query": "mail me user@example.com", "clicks": 2, "email": "x@y.z"}], {"startRow": 1})
+    export.commit()
+
+    assert _read_rows(path) == [{"clicks": 2, "query": "mail me [redacted-email]"}]
+    assert not export.partial_path.exists()
+    assert not export.progress_path.exists()
+
+
+def test_row_export_resumes_from_last_complete_page(tmp_path) -> None:
+    path = tmp_path / "ga4.pages.jsonl"
+    first = RowExport(path, "test export")
+    first.append_page([{"page": "/a", "sessions": 1}], {"offset": 1})
+    # Simulate a torn write after the checkpoint: it must be discarded on resume.
+    first._handle.write(b'{"page":"/torn"')
+    first.close()
+
+    resumed = RowExport(path, "test export")
+    assert resumed.position == {"offset": 1}
+    assert resumed.rows_written == 1
+    resumed.append_page([{"page": "/b", "sessions": 2}], {"offset": 2, "done": True})
+    resumed.commit()
+
+    assert _read_rows(path) == [{"page": "/a", "sessions": 1}, {"page": "/b", "sessions": 2}]
@@ -0,0 +1,117 @@
+import json
+from dataclasses import replace
+from datetime import date
+
+from geovito_metrics_collector.config import DateWindow
+from geovito_metrics_collector.google_api import GoogleClient
+from geovito_metrics_collector.providers import ga4
+
+WINDOW = DateWindow(start=date(2026, 2, 1), end=date(2026, 2, 7))
+
+
+class _Request:
+    def __init__(self, response):
+        self._response = response
+
+    def execute(self, http=None):
+        return self._response
+
+
+class _FakeAnalyticsData:
+    def __init__(self, calls, pages_by_property):
+        self.calls = calls
+        self.pages_by_property = pages_by_property
+
+    def properties(self):
+        return self
+
+    def batchRunReports(self, property, body):
+        self.calls.append((property, len(body["requests"])))
+        pages = self.pages_by_property[property]
+        totals = {"totals": [{"metricValues": [{"value": "10"}, {"value": "4"}, {"value": "30"}]}]}
+        rows = {
+            "rows": [
+                {"dimensionValues": [{"value": path}], "metricValues": [{"value": "1"}, {"value": str(views)}]}
+                for path, views in pages
+            ]
+        }
+        return _Request({"reports": [totals, rows]})
+
+    def runReport(self, property, body):
+        pages = self.pages_by_property[property]
+        offset = body.get("offset", 0)
+        self.calls.append((property, offset))
+        chunk = pages[offset : offset + body["limit"]]
+        return _Request(
+            {
+                "rowCount": len(pages),
+                "rows": [
+                    {"dimensionValues": [{"value": path}], "metricValues": [{"value": "1"}, {"value": str(views)}]}
+                    for path, views in chunk
+                ],
+            }
+        )
+
+
+def _patch_google(monkeypatch, calls, pages_by_property):
+    service = _FakeAnalyticsData(calls, pages_by_property)
+    monkeypatch.setattr(ga4, "get_google_credentials", lambda config, scopes: object())
+    monkeypatch.setattr(ga4, "get_client", lambda config, api, version, credentials: GoogleClient(service, credentials))
+
+
+def test_collect_ga4_uses_one_batch_request(monkeypatch, collector_config, tmp_path) -> None:
+    calls = []
+    _patch_google(monkeypatch, calls, {"properties/1": [("https://geovito.com/en/?utm=1", 5)]})
+    config = replace(collector_config, ga4_property_id="1", google_oauth_client_secret_file=tmp_path / "secret.json", cache_enabled=False)
+
+    result = ga4.collect_ga4(config, WINDOW)
+
+    assert calls == [("properties/1", 2)]
+    assert result.metrics == {"sessions": 10.0, "activeUsers": 4.0, "screenPageViews": 30.0}
+    assert result.rows == [{"page": "/en/", "pageviews": 5.0, "sessions": 1.0}]
+    assert result.notes == ["top_pages=1"]
+
+
+def test_collect_ga4_merges_multiple_properties(monkeypatch, collector_config, tmp_path) -> None:
+    calls = []
+    _patch_google(
+        monkeypatch,
+        calls,
+        {"properties/1": [("/en/a", 5)], "properties/2": [("/en/b", 9)]},
+    )
+    config = replace(
+        collector_config,
+        ga4_property_id="1, properties/2",
+        google_oauth_client_secret_file=tmp_path / "secret.json",
+        cache_enabled=False,
+    )
+
+    result = ga4.collect_ga4(config, WINDOW)
+
+    assert sorted(calls) == [("properties/1", 2), ("properties/2", 2)]
+    assert result.metrics["sessions"] == 20.0
+    assert [row["property"] for row in result.rows] == ["2", "1"]
+    assert "properties=1,2" in result.notes
+
+
+def test_collect_ga4_full_export_paginates_to_disk(monkeypatch, collector_config, tmp_path) -> None:
+    calls = []
+    pages = [(f"/en/atlas/place-{index}?ref=x", 100 - index) for index in range(5)]
+    _patch_google(monkeypatch, calls, {"properties/1": pages})
+    monkeypatch.setattr(ga4, "EXPORT_PAGE_SIZE", 2)
+    config = replace(
+        collector_config,
+        ga4_property_id="1",
+        google_oauth_client_secret_file=tmp_path / "secret.json",
+        cache_enabled=False,
+        export_root=tmp_path / "out",
+    )
+
+    result = ga4.collect_ga4(config, WINDOW, row_limit=2)
+
+    export_file = tmp_path / "out" / "2026-02-07" / "ga4.pages.jsonl"
+    exported = [json.loads(line) for line in export_file.read_text(encoding="utf-8").splitlines()]
+    assert [row["page"] for row in exported] == [f"/en/atlas/place-{index}" for index in range(5)]
+    assert calls[1:] == [("properties/1", 0), ("properties/1", 2), ("properties/1", 4)]
+    assert "pages_export=ga4.pages.jsonl rows=5" in result.notes
+    assert len(result.rows) == 2
@@ -0,0 +1,26 @@
+import os
+from dataclasses import replace
+
+from geovito_metrics_collector import google_api
+
+
+def test_get_service_builds_static_service_once(collector_config) -> None:
+    config = replace(collector_config, google_discovery_mode="static")
+
+    first = google_api.get_service(config, "searchconsole", "v1")
+    second = google_api.get_service(config, "searchconsole", "v1")
+
+    assert first is second
+    assert hasattr(first, "searchanalytics")
+
+
+def test_file_discovery_cache_round_trip_and_expiry(tmp_path) -> None:
+    cache = google_api.FileDiscoveryCache(tmp_path, max_age_seconds=60)
+    url = "https://searchconsole.googleapis.com/$discovery/rest?version=v1"
+
+    assert cache.get(url) is None
+    cache.set(url, '{"name": "searchconsole"}')
+    assert cache.get(url) == '{"name": "searchconsole"}'
+
+    os.utime(cache._path(url), (0, 0))
+    assert cache.get(url) is None
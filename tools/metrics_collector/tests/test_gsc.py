@@ -0,0 +1,154 @@
+import json
+from dataclasses import replace
+from datetime import date
+
+import pytest
+
+from geovito_metrics_collector.config import DateWindow
+from geovito_metrics_collector.google_api import GoogleClient
+from geovito_metrics_collector.providers import gsc
+
+WINDOW = DateWindow(start=date(2026, 2, 1), end=date(2026, 2, 7))
+
+
+class _Request:
+    def __init__(self, response):
+        self._response = response
+
+    def execute(self, http=None):
+        if isinstance(self._response, Exception):
+            raise self._response
+        return self._response
+
+
+class _FakeSearchConsole:
+    def __init__(self, rows_by_dimension, fail_at=None):
+        self.rows_by_dimension = rows_by_dimension
+        self.fail_at = fail_at
+        self.bodies = []
+
+    def searchanalytics(self):
+        return self
+
+    def query(self, siteUrl, body):
+        self.bodies.append(body)
+        dimensions = body.get("dimensions") or []
+        if not dimensions:
+            return _Request({"rows": [{"clicks": 7, "impressions": 70, "ctr": 0.1, "position": 3.5}]})
+
+        start = body.get("startRow", 0)
+        if len(dimensions) > 1:
+            return _Request({"rows": self.rows_by_dimension["combined"][start : start + body["rowLimit"]]})
+        if self.fail_at is not None and (dimensions[0], start) == self.fail_at:
+            self.fail_at = None
+            return _Request(RuntimeError("backendError"))
+        rows = self.rows_by_dimension.get(dimensions[0], [])[start : start + body["rowLimit"]]
+        return _Request({"rows": [{"keys": [key], "clicks": clicks, "impressions": clicks * 10} for key, clicks in rows]})
+
+
+def _config(collector_config, tmp_path):
+    return replace(
+        collector_config,
+        gsc_site_url="sc-domain:geovito.com",
+        google_oauth_client_secret_file=tmp_path / "secret.json",
+        cache_enabled=False,
+        export_root=tmp_path / "out",
+    )
+
+
+def _read(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_collect_gsc_full_export_pages_with_start_row(monkeypatch, collector_config, tmp_path) -> None:
+    queries = [(f"query {index} user{index}@example.com", 50 - index) for index in range(5)]
+    service = _FakeSearchConsole({"query": queries, "page": [("https://geovito.com/en/?a=1", 3)]})
+    monkeypatch.setattr(gsc, "get_google_credentials", lambda config, scopes: object())
+    monkeypatch.setattr(gsc, "get_client", lambda config, api, version, credentials: GoogleClient(service, credentials))
+    monkeypatch.setattr(gsc, "EXPORT_PAGE_SIZE", 2)
+
+    result = gsc.collect_gsc(_config(collector_config, tmp_path), WINDOW)
+
+    exported = _read(tmp_path / "out" / "2026-02-07" / "gsc.query.jsonl")
+    assert [row["value"] for row in exported] == [f"query {index} [redacted-email]" for index in range(5)]
+    assert [body["startRow"] for body in service.bodies if body.get("dimensions") == ["query"] and "startRow" in body] == [0, 2, 4]
+    assert _read(tmp_path / "out" / "2026-02-07" / "gsc.page.jsonl")[0]["value"] == "/en/"
+    assert "query_export=gsc.query.jsonl rows=5" in result.notes
+
+
+def test_collect_gsc_full_export_resumes_after_failed_page(monkeypatch, collector_config, tmp_path) -> None:
+    queries = [(f"q{index}", 50 - index) for index in range(5)]
+    service = _FakeSearchConsole({"query": queries}, fail_at=("query", 2))
+    monkeypatch.setattr(gsc, "get_google_credentials", lambda config, scopes: object())
+    monkeypatch.setattr(gsc, "get_client", lambda config, api, version, credentials: GoogleClient(service, credentials))
+    monkeypatch.setattr(gsc, "EXPORT_PAGE_SIZE", 2)
+    config = _config(collector_config, tmp_path)
+
+    with pytest.raises(RuntimeError, match="startRow=2"):
+        gsc.collect_gsc(config, WINDOW)
+
+    service.bodies.clear()
+    gsc.collect_gsc(config, WINDOW)
+
+    exported = _read(tmp_path / "out" / "2026-02-07" / "gsc.query.jsonl")
+    assert [row["value"] for row in exported] == [f"q{index}" for index in range(5)]
+    assert [body["startRow"] for body in service.bodies if body.get("dimensions") == ["query"] and "startRow" in body] == [2, 4]
+
+
+def test_collect_gsc_combined_mode_derives_marginals(monkeypatch, collector_config, tmp_path) -> None:
+    combined = [
+        {"keys": ["rome", "/en/rome", "ita", "MOBILE"], "clicks": 6, "impressions": 60, "position": 2.0},
+        {"keys": ["rome", "/en/rome?x=1", "tur", "DESKTOP"], "clicks": 2, "impressions": 20, "position": 6.0},
+        {"keys": ["paris", "/en/paris", "tur", "MOBILE"], "clicks": 1, "impressions": 20, "position": 4.0},
+    ]
+    service = _FakeSearchConsole({"combined": combined})
+    monkeypatch.setattr(gsc, "get_google_credentials", lambda config, scopes: object())
+    monkeypatch.setattr(gsc, "get_client", lambda config, api, version, credentials: GoogleClient(service, credentials))
+    config = replace(_config(collector_config, tmp_path), gsc_combined_dimensions=True, export_root=None)
+
+    result = gsc.collect_gsc(config, WINDOW)
+
+    assert len(service.bodies) == 1
+    assert result.metrics == {"clicks": 9.0, "impressions": 100.0, "ctr": 0.09, "position": 3.2}
+    rome = next(row for row in result.rows if row["kind"] == "query" and row["value"] == "rome")
+    assert rome == {"clicks": 8.0, "ctr": 0.1, "impressions": 80.0, "kind": "query", "position": 3.0, "value": "rome"}
+    page = next(row for row in result.rows if row["kind"] == "page" and row["value"] == "/en/rome")
+    assert page["clicks"] == 8.0
+    assert any("combined_dimensions=true" in note for note in result.notes)
+
+
+def test_collect_gsc_combined_mode_falls_back_past_the_page_cap(monkeypatch, collector_config, tmp_path) -> None:
+    combined = [
+        {"keys": [f"q{index}", "/en/rome", "ita", "MOBILE"], "clicks": 1, "impressions": 10, "position": 2.0}
+        for index in range(5)
+    ]
+    service = _FakeSearchConsole({"combined": combined, "query": [("rome", 3)]})
+    monkeypatch.setattr(gsc, "get_google_credentials", lambda config, scopes: object())
+    monkeypatch.setattr(gsc, "get_client", lambda config, api, version, credentials: GoogleClient(service, credentials))
+    monkeypatch.setattr(gsc, "COMBINED_PAGE_SIZE", 2)
+    config = replace(_config(collector_config, tmp_path), gsc_combined_dimensions=True, export_root=None)
+
+    result = gsc.collect_gsc(config, WINDOW)
+
+    assert len(service.bodies) == gsc.COMBINED_MAX_PAGES + 5
+    assert result.metrics["clicks"] == 7.0
+    assert [row["value"] for row in result.rows] == ["rome"]
+    assert any("used per-dimension queries" in note for note in result.notes)
+
+
+def test_collect_gsc_runs_dimension_queries_separately_by_default(monkeypatch, collector_config, tmp_path) -> None:
+    service = _FakeSearchConsole({"query": [("rome", 3)], "country": [("tur", 3)]})
+    monkeypatch.setattr(gsc, "get_google_credentials", lambda config, scopes: object())
+    monkeypatch.setattr(gsc, "get_client", lambda config, api, version, credentials: GoogleClient(service, credentials))
+
+    result = gsc.collect_gsc(replace(_config(collector_config, tmp_path), export_root=None), WINDOW)
+
+    assert sorted(tuple(body.get("dimensions", [])) for body in service.bodies) == [
+        (),
+        ("country",),
+        ("device",),
+        ("page",),
+        ("query",),
+    ]
+    assert [row["kind"] for row in result.rows] == ["query", "country"]
+    assert result.metrics["clicks"] == 7.0
@@ -0,0 +1,95 @@
+import gzip
+import json
+import urllib.error
+import urllib.request
+from datetime import date
+
+import pytest
+
+from geovito_metrics_collector.httpapi import OutputCache, make_server, render_prometheus, start_server
+from geovito_metrics_collector.schema import make_provider_result
+from geovito_metrics_collector.storage import build_summary, write_results
+
+DAY = date(2026, 2, 7)
+
+
+def _write(out_root, sessions, compression=None):
+    results = [
+        make_provider_result("ga4", DAY, DAY, metrics={"sessions": sessions}, rows=[{"page": "/a", "sessions": 1}] * 40),
+        make_provider_result("cloudflare", DAY, DAY, metrics={"requests": 9.0}, errors=["quota"]),
+    ]
+    return write_results(out_root, DAY, results, build_summary(results), compression=compression)
+
+
+@pytest.fixture
+def server(tmp_path):
+    cache = OutputCache(tmp_path)
+    server = make_server(tmp_path, "127.0.0.1:0", cache)
+    start_server(server)
+    yield server, cache
+    server.shutdown()
+    server.server_close()
+
+
+def _get(server, path, headers=None):
+    host, port = server.server_address[:2]
+    request = urllib.request.Request(f"http://{host}:{port}{path}", headers=headers or {})
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, dict(response.headers), response.read()
+    except urllib.error.HTTPError as exc:
+        return exc.code, dict(exc.headers), exc.read()
+
+
+def test_serves_latest_output_and_picks_up_new_runs(server, tmp_path) -> None:
+    server, cache = server
+    assert _get(server, "/summary")[0] == 404
+
+    output_dir = _write(tmp_path, 3.0, compression="gzip")
+    status, headers, body = _get(server, "/summary")
+    assert status == 200
+    assert body == (output_dir / "summary.json").read_bytes()
+    assert _get(server, "/summary", {"If-None-Match": headers["ETag"]})[0] == 304
+
+    status, _, body = _get(server, "/providers/ga4")
+    assert json.loads(body)["metrics"] == {"sessions": 3.0}
+    status, headers, body = _get(server, f"/days/{DAY.isoformat()}/providers/ga4", {"Accept-Encoding": "gzip"})
+    assert headers["Content-Encoding"] == "gzip"
+    assert json.loads(gzip.decompress(body))["provider"] == "ga4"
+    assert _get(server, "/providers/adsense")[0] == 404
+    assert _get(server, "/providers/..%2Fsecrets")[0] == 404
+
+    _write(tmp_path, 5.0)
+    assert json.loads(_get(server, "/summary")[2])["kpis"]["sessions_7d"] == 5.0
+    assert json.loads(_get(server, "/days")[2]) == [DAY.isoformat()]
+
+
+def test_metrics_endpoint_renders_prometheus_text(server, tmp_path) -> None:
+    server, _ = server
+    _write(tmp_path, 3.0)
+
+    status, headers, body = _get(server, "/metrics")
+    text = body.decode("utf-8")
+    assert status == 200
+    assert headers["Content-Type"].startswith("text/plain; version=0.0.4")
+    assert 'geovito_kpi{name="sessions_7d"} 3.0' in text
+    assert "geovito_window_end_timestamp_seconds 1770422400.0" in text
+    assert 'geovito_provider_metric{provider="cloudflare",metric="requests"} 9.0' in text
+    assert 'geovito_provider_errors{provider="cloudflare"} 1' in text
+    assert 'geovito_provider_rows{provider="ga4"} 40' in text
+    assert "# TYPE geovito_summary_generated_timestamp_seconds gauge" in text
+
+
+def _series(text):
+    return {line.rpartition(" ")[0] for line in text.splitlines() if line and not line.startswith("#")}
+
+
+def test_prometheus_series_identity_is_stable_across_windows() -> None:
+    day_results = [
+        [make_provider_result("ga4", day, day, metrics={"sessions": sessions})]
+        for day, sessions in ((DAY, 3.0), (date(2026, 2, 8), 4.0))
+    ]
+    first, second = (render_prometheus(build_summary(results).model_dump(mode="json")).decode() for results in day_results)
+
+    assert _series(first) == _series(second)
+    assert first != second
@@ -0,0 +1,83 @@
+import json
+import pstats
+from datetime import date
+
+from typer.testing import CliRunner
+
+from geovito_metrics_collector import cli, runner
+from geovito_metrics_collector.config import DateWindow
+from geovito_metrics_collector.instrument import Profiler, RunTimer, record, stage
+from geovito_metrics_collector.schema import make_provider_result
+from geovito_metrics_collector.storage import TIMINGS_FILENAME, provider_files
+
+WINDOW = DateWindow(start=date(2026, 2, 1), end=date(2026, 2, 7))
+
+
+def _busy_loop():
+    return sum(index * index for index in range(20_000))
+
+
+def _metered_collector(config, date_window, row_limit):
+    with stage("credentials"):
+        _busy_loop()
+    record("gsc", http_requests=2, http_bytes=4096, retries=1)
+    return make_provider_result(
+        provider="gsc",
+        start=date_window.start,
+        end=date_window.end,
+        rows=[{"page": "/en/", "clicks": 3}, {"page": "/de/", "clicks": 1}],
+    )
+
+
+def test_provider_span_is_noted_and_kept_by_the_timer(monkeypatch, collector_config) -> None:
+    monkeypatch.setitem(runner.COLLECTORS, "gsc", _metered_collector)
+    timer = RunTimer()
+
+    [result] = runner.collect_providers(collector_config, WINDOW, ["gsc"], timer=timer)
+
+    [note] = [note for note in result.notes if note.startswith("timing: ")]
+    assert "requests=2" in note and "received=4KiB" in note and "retries=1" in note
+    [span] = timer.to_json()["providers"]
+    assert span["provider"] == "gsc"
+    assert span["window"] == "2026-02-01..2026-02-07"
+    assert span["rows"] == 2
+    assert (span["http_requests"], span["http_bytes"], span["retries"]) == (2, 4096, 1)
+    assert "credentials" in span["stages"] and "sanitize" in span["stages"]
+
+
+def test_run_writes_timings_and_profile(monkeypatch, tmp_path, collector_config) -> None:
+    monkeypatch.setitem(runner.COLLECTORS, "gsc", _metered_collector)
+    monkeypatch.setattr(cli, "load_config", lambda env_file=None: collector_config)
+    out = tmp_path / "metrics"
+
+    outcome = CliRunner().invoke(
+        cli.app, ["run", "--date", "2026-02-07", "--providers", "gsc", "--out", str(out), "--profile"]
+    )
+
+    assert outcome.exit_code == 0, outcome.output
+    day_dir = out / "2026-02-07"
+    timings = json.loads((day_dir / TIMINGS_FILENAME).read_text())
+    assert timings["version"] == 1
+    assert [span["provider"] for span in timings["providers"]] == ["gsc"]
+    assert set(timings["stages"]) == {"write"}
+    assert timings["tracemalloc_peak_bytes"] > 0
+    assert [path.name for path in provider_files(day_dir)] == ["gsc.json"]
+    [profile] = (out / ".profiles").glob("run-*.pstats")
+    stats = pstats.Stats(str(profile))
+    # The collector ran on its own thread; its calls are in the saved profile.
+    assert any(function[2] == "_busy_loop" for function in stats.stats)
+
+
+def test_profiler_merges_collector_threads(tmp_path) -> None:
+    import threading
+
+    def busy():
+        sum(range(1000))
+
+    with Profiler() as profiler:
+        thread = threading.Thread(target=busy)
+        thread.start()
+        thread.join()
+
+    stats = profiler.save(tmp_path / "run.pstats")
+    assert any(function[2] == "busy" for function in stats.stats)
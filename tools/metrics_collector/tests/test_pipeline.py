@@ -0,0 +1,86 @@
+from datetime import date, datetime, timezone
+
+import pytest
+
+from geovito_metrics_collector import runner, schema
+from geovito_metrics_collector.config import DateWindow
+from geovito_metrics_collector.pipeline import collect_result, drain, iter_batches, sanitize_stream
+from geovito_metrics_collector.schema import make_provider_result
+from geovito_metrics_collector.storage import ProviderResultWriter, build_summary, write_results
+
+WINDOW = DateWindow(start=date(2026, 2, 1), end=date(2026, 2, 7))
+
+
+def _streaming_collector(provider, batches, fail=False):
+    def stream(config, date_window, row_limit):
+        for batch in batches:
+            yield batch
+        if fail:
+            raise RuntimeError("boom")
+        return make_provider_result(
+            provider=provider,
+            start=date_window.start,
+            end=date_window.end,
+            metrics={"sessions": 3.0},
+            notes=["streamed"],
+        )
+
+    return stream
+
+
+BATCHES = [
+    [{"page": "https://geovito.com/en/a?x=1", "sessions": 2, "title": "Café ü"}, {"page": "/en/a", "sessions": 2, "title": "Café ü"}],
+    [],
+    [{"page": "/en/b", "sessions": 1.5, "sessionId": "secret"}, {"page": "/en/c", "sessions": 1}],
+]
+
+
+@pytest.mark.parametrize("pretty", [False, True])
+@pytest.mark.parametrize("batches", [BATCHES, []])
+def test_provider_result_writer_matches_write_results(tmp_path, pretty, batches) -> None:
+    collector = _streaming_collector("ga4", batches)
+    result = collect_result(collector(None, WINDOW, 50), row_limit=50)
+    expected_dir = write_results(tmp_path / "expected", WINDOW.end, [result], build_summary([result]), pretty=pretty)
+
+    writer = ProviderResultWriter(tmp_path / "streamed" / "ga4.json", pretty=pretty)
+    streamed = drain(sanitize_stream(iter_batches(collector(None, WINDOW, 50)), limit=50), writer.write_rows)
+    writer.finish(streamed.model_copy(update={"generated_at": result.generated_at}))
+    writer.commit()
+
+    assert (tmp_path / "streamed" / "ga4.json").read_bytes() == (expected_dir / "ga4.json").read_bytes()
+
+
+def test_sanitize_stream_stops_output_at_limit_and_returns_metadata() -> None:
+    stream = sanitize_stream(_streaming_collector("ga4", BATCHES)(None, WINDOW, 2), limit=2)
+    batches = []
+    with pytest.raises(StopIteration) as stop:
+        while True:
+            batches.append(next(stream))
+
+    assert batches == [[{"page": "/en/a", "sessions": 2, "title": "Café ü"}], [{"page": "/en/b", "sessions": 1.5}]]
+    assert stop.value.value.notes == ["streamed"]
+
+
+def test_stream_providers_writes_same_files_as_collect_providers(monkeypatch, collector_config, tmp_path) -> None:
+    monkeypatch.setattr(schema, "utc_now", lambda: datetime(2026, 2, 8, tzinfo=timezone.utc))
+    monkeypatch.setitem(runner.COLLECTORS, "ga4", _streaming_collector("ga4", BATCHES))
+    monkeypatch.setitem(runner.COLLECTORS, "gsc", _streaming_collector("gsc", []))
+
+    streamed = runner.stream_providers(collector_config, WINDOW, ["ga4", "gsc"], tmp_path / "streamed")
+    results = runner.collect_providers(collector_config, WINDOW, ["ga4", "gsc"])
+    expected_dir = write_results(tmp_path / "expected", WINDOW.end, results, build_summary(results))
+
+    assert [item.row_count for item in streamed] == [3, 0]
+    assert all(item.result.rows == [] for item in streamed)
+    for provider in ("ga4", "gsc"):
+        assert (tmp_path / "streamed" / f"{provider}.json").read_bytes() == (expected_dir / f"{provider}.json").read_bytes()
+
+
+def test_stream_providers_abort_leaves_no_files(monkeypatch, collector_config, tmp_path) -> None:
+    monkeypatch.setitem(runner.COLLECTORS, "ga4", _streaming_collector("ga4", BATCHES))
+    monkeypatch.setitem(runner.COLLECTORS, "gsc", _streaming_collector("gsc", BATCHES, fail=True))
+
+    with pytest.raises(runner.CollectionAborted):
+        runner.stream_providers(collector_config, WINDOW, ["ga4", "gsc"], tmp_path / "out")
+
+    assert list((tmp_path / "out").iterdir()) == []
@@ -0,0 +1,66 @@
+import subprocess
+import sys
+from datetime import date
+from importlib.metadata import EntryPoint
+
+import pytest
+
+from geovito_metrics_collector import providers
+from geovito_metrics_collector.config import DateWindow
+from geovito_metrics_collector.providers import BUILTIN_COLLECTORS, CollectorRegistry
+from geovito_metrics_collector.schema import make_provider_result
+from geovito_metrics_collector.startup import parse_importtime
+
+
+def collect_example(config, date_window, row_limit=50):
+    return make_provider_result(provider="example", start=date_window.start, end=date_window.end, metrics={})
+
+
+def test_cli_import_does_not_load_provider_modules() -> None:
+    code = (
+        "import sys, geovito_metrics_collector.cli; "
+        "print(sorted(m for m in sys.modules if m.startswith(('googleapiclient', 'google.oauth2', "
+        "'geovito_metrics_collector.providers.'))))"
+    )
+    completed = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert completed.stdout.strip() == "[]"
+
+
+def test_registry_loads_entry_point_providers(monkeypatch) -> None:
+    entry_point = EntryPoint(name="example", value=f"{__name__}:collect_example", group=providers.ENTRY_POINT_GROUP)
+    monkeypatch.setattr(providers, "entry_points", lambda group: [entry_point])
+    registry = CollectorRegistry(BUILTIN_COLLECTORS)
+    monkeypatch.setattr(providers, "COLLECTORS", registry)
+
+    assert registry.names() == ["ga4", "gsc", "cloudflare", "adsense", "example"]
+    assert registry["example"] is collect_example
+    assert registry.module_name("example") == __name__
+    # ProviderResult accepts any registered provider name.
+    result = collect_example(None, DateWindow(start=date(2026, 2, 1), end=date(2026, 2, 7)))
+    assert result.provider == "example"
+
+
+def test_registry_register_and_delete_restores_builtin() -> None:
+    registry = CollectorRegistry(BUILTIN_COLLECTORS)
+
+    registry["ga4"] = collect_example
+    assert registry["ga4"] is collect_example
+    assert registry.module_name("ga4") is None
+
+    del registry["ga4"]
+    assert registry.module_name("ga4") == "geovito_metrics_collector.providers.ga4"
+    with pytest.raises(ValueError):
+        registry.register("Bad-Name", collect_example)
+
+
+def test_parse_importtime() -> None:
+    stderr = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |   pydantic.version\n"
+        "import time:       300 |        420 | pydantic\n"
+    )
+    timings = parse_importtime(stderr)
+    assert [(t.module, t.self_us, t.cumulative_us, t.depth) for t in timings] == [
+        ("pydantic.version", 120, 120, 1),
+        ("pydantic", 300, 420, 0),
+    ]
@@ -0,0 +1,119 @@
+import gzip
+import stat
+from dataclasses import fields, replace
+from datetime import date
+
+import pytest
+
+from geovito_metrics_collector import runner
+from geovito_metrics_collector.archive import archive_path, archived_days, archived_providers
+from geovito_metrics_collector.columnar import partition_path, write_columnar
+from geovito_metrics_collector.config import CollectorConfig, DateWindow
+from geovito_metrics_collector.reprocess import reprocess_day, run_reprocess
+from geovito_metrics_collector.storage import build_summary, read_json, read_result, write_results
+
+WINDOW = DateWindow(start=date(2026, 2, 1), end=date(2026, 2, 7))
+PROVIDERS = ["ga4", "gsc", "cloudflare", "adsense"]
+
+
+def _collect(config, out):
+    results = runner.collect_providers(replace(config, archive_root=out), WINDOW, PROVIDERS, row_limit=20)
+    write_results(out, WINDOW.end, results, build_summary(results))
+    return results
+
+
+def test_reprocess_rebuilds_outputs_from_the_archive_without_the_api(standin, tmp_path) -> None:
+    config, stats = standin
+    out = tmp_path / "out"
+    collected = _collect(config, out)
+    day_dir = out / WINDOW.end.isoformat()
+    summary = read_json(day_dir / "summary.json")
+    (day_dir / "ga4.json").unlink()
+    requests_before = stats.to_json()["requests"]
+
+    assert archived_days(out) == [WINDOW.end]
+    assert archived_providers(out, WINDOW.end) == sorted(PROVIDERS)
+    assert stat.S_IMODE(archive_path(out, WINDOW.end, "ga4").stat().st_mode) == 0o600
+
+    outcome = reprocess_day(out, WINDOW.end)
+
+    assert outcome.errors == []
+    assert stats.to_json()["requests"] == requests_before
+    rebuilt = {result.provider: result for result in outcome.results}
+    for original in collected:
+        stored = read_result(day_dir / f"{original.provider}.json")
+        assert stored.rows == original.rows == rebuilt[original.provider].rows
+        assert stored.metrics == original.metrics
+        assert any(note.startswith("reprocessed from archive") for note in stored.notes)
+    assert read_json(day_dir / "summary.json")["kpis"] == summary["kpis"]
+
+
+def test_reprocess_keeps_stored_files_of_providers_it_does_not_rebuild(standin, tmp_path) -> None:
+    config, _ = standin
+    out = tmp_path / "out"
+    _collect(config, out)
+    day_dir = out / WINDOW.end.isoformat()
+    gsc_before = (day_dir / "gsc.json").read_bytes()
+
+    report = run_reprocess(out, [WINDOW.end], providers=["ga4"], workers=1)
+
+    assert report.written == [WINDOW.end] and report.failed == {}
+    assert (day_dir / "gsc.json").read_bytes() == gsc_before
+    assert {entry["provider"] for entry in read_json(day_dir / "summary.json")["providers"]} == set(PROVIDERS)
+
+
+def test_reprocess_rewrites_existing_columnar_partitions(standin, tmp_path) -> None:
+    pa = pytest.importorskip("pyarrow")
+    config, _ = standin
+    out = tmp_path / "out"
+    collected = _collect(config, out)
+    write_columnar(out, WINDOW.end, collected, "arrow")
+    ga4_rows = partition_path(out, "rows", "ga4", WINDOW.end, "arrow")
+    expected = pa.ipc.open_file(str(ga4_rows)).read_all().column("page").to_pylist()
+    ga4_rows.unlink()
+    partition_path(out, "metrics", "ga4", WINDOW.end, "arrow").write_bytes(b"stale")
+
+    report = run_reprocess(out, [WINDOW.end], providers=["ga4"], workers=1)
+
+    assert report.failed == {}
+    assert pa.ipc.open_file(str(ga4_rows)).read_all().column("page").to_pylist() == expected
+    assert pa.ipc.open_file(str(partition_path(out, "metrics", "ga4", WINDOW.end, "arrow"))).read_all().num_rows > 0
+    assert not partition_path(out, "rows", "ga4", WINDOW.end, "parquet").exists()
+
+
+def test_archive_is_bound_per_run_not_kept_on_the_config(standin, tmp_path) -> None:
+    config, _ = standin
+    _collect(config, tmp_path / "out")
+
+    assert [field.name for field in fields(CollectorConfig) if "archive" in field.name] == ["archive_root"]
+    # The GA4 property threads and GSC query threads archived into their provider's run.
+    outcome = reprocess_day(tmp_path / "out", WINDOW.end, providers=["ga4", "gsc"])
+    assert outcome.errors == [] and len(outcome.results) == 2
+
+
+def test_missing_archived_response_is_an_error_not_a_fetch(standin, tmp_path) -> None:
+    config, stats = standin
+    out = tmp_path / "out"
+    _collect(config, out)
+    path = archive_path(out, WINDOW.end, "cloudflare")
+    with gzip.open(path, "rt", encoding="utf-8") as handle:
+        header = handle.readline()
+    with gzip.open(path, "wt", encoding="utf-8") as handle:
+        handle.write(header)
+    requests_before = stats.to_json()["requests"]
+
+    outcome = reprocess_day(out, WINDOW.end, providers=["cloudflare"])
+
+    assert outcome.output_dir is None
+    assert any("no response" in error for error in outcome.errors)
+    assert stats.to_json()["requests"] == requests_before
+
+
+def test_unconfigured_provider_leaves_no_archive(collector_config, tmp_path) -> None:
+    out = tmp_path / "out"
+
+    [result] = runner.collect_providers(replace(collector_config, archive_root=out), WINDOW, ["cloudflare"])
+
+    assert result.errors == ["not configured"]
+    assert archived_providers(out, WINDOW.end) == []
+    assert not list((out / "archive").rglob("*.tmp"))
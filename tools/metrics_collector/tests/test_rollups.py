@@ -0,0 +1,101 @@
+import json
+from datetime import date, timedelta
+
+import pytest
+
+from geovito_metrics_collector.rollups import (
+    _day_path,
+    _period_path,
+    period_bounds,
+    period_of,
+    read_rollups,
+    rebuild_rollups,
+    update_rollups,
+)
+from geovito_metrics_collector.schema import make_provider_result
+from geovito_metrics_collector.storage import build_summary, write_results
+
+
+def _write_day(out_root, end, sessions, days=1, rpm=10.0):
+    results = [
+        make_provider_result(
+            provider="ga4",
+            start=end - timedelta(days=days - 1),
+            end=end,
+            metrics={"sessions": sessions},
+            rows=[{"page": "/en/a", "sessions": sessions}, {"page": f"/en/{end.day}", "sessions": 1}],
+        ),
+        make_provider_result(
+            provider="adsense",
+            start=end - timedelta(days=days - 1),
+            end=end,
+            metrics={"estimatedEarnings": 2.0, "pageViewsRpm": rpm},
+        ),
+    ]
+    write_results(out_root, end, results, build_summary(results))
+
+
+def test_periods_cover_calendar() -> None:
+    assert period_of(date(2026, 1, 1), "week") == "2026-W01"
+    assert period_of(date(2026, 12, 31), "quarter") == "2026-Q4"
+    assert period_bounds("2026-02", "month") == (date(2026, 2, 1), date(2026, 2, 28))
+    assert period_bounds("2026-Q4", "quarter") == (date(2026, 10, 1), date(2026, 12, 31))
+    assert period_bounds("2026-W01", "week") == (date(2025, 12, 29), date(2026, 1, 4))
+
+
+def test_incremental_updates_match_rebuild(tmp_path) -> None:
+    for offset in range(40):
+        day = date(2026, 3, 20) + timedelta(days=offset)
+        _write_day(tmp_path, day, float(offset), rpm=float(offset % 3))
+        update_rollups(tmp_path, day)
+    # Rewriting a day replaces its contribution; a 7-day window cannot be split into days.
+    _write_day(tmp_path, date(2026, 3, 25), 100.0)
+    update_rollups(tmp_path, date(2026, 3, 25))
+    _write_day(tmp_path, date(2026, 3, 26), 50.0, days=7)
+    update_rollups(tmp_path, date(2026, 3, 26))
+
+    incremental = {grain: read_rollups(tmp_path, grain, top=3) for grain in ("week", "month", "quarter")}
+    assert rebuild_rollups(tmp_path) == 39
+    assert {grain: read_rollups(tmp_path, grain, top=3) for grain in ("week", "month", "quarter")} == incremental
+
+    march, april = incremental["month"]
+    assert (march["period"], march["days"], march["complete"]) == ("2026-03", 11, False)
+    assert march["kpis"]["sessions"] == sum(range(12)) - 5 - 6 + 100
+    assert march["kpis"]["earnings"] == 22.0
+    assert april["kpis"]["ads_rpm_avg"] == pytest.approx(sum(offset % 3 for offset in range(12, 40)) / 28)
+    assert april["top_rows"]["ga4"]["page"][0] == {"key": "/en/a", "days": 28, "sessions": float(sum(range(12, 40)))}
+    assert len(april["top_rows"]["ga4"]["page"]) == 3
+    assert [report["period"] for report in read_rollups(tmp_path, "week", date(2026, 4, 1), date(2026, 4, 10))] == [
+        "2026-W14",
+        "2026-W15",
+    ]
+
+
+def test_interrupted_update_rebuilds_the_period(tmp_path) -> None:
+    day = date(2026, 5, 4)
+    _write_day(tmp_path, day, 5.0)
+    update_rollups(tmp_path, day)
+    _write_day(tmp_path, day, 8.0)
+    update_rollups(tmp_path, day)
+
+    # Simulate a crash after the day file was rewritten but before the week was updated.
+    week_path = _period_path(tmp_path, "week", "2026-W19")
+    state = json.loads(week_path.read_text())
+    state["days"][day.isoformat()] = "stale"
+    state["sums"]["sessions"] = -1.0
+    week_path.write_text(json.dumps(state))
+    assert _day_path(tmp_path, day).exists()
+
+    assert update_rollups(tmp_path, day) is True
+    assert read_rollups(tmp_path, "week")[0]["kpis"]["sessions"] == 8.0
+    assert update_rollups(tmp_path, day) is False
+
+
+def test_multi_day_window_warns_that_it_adds_nothing(tmp_path, caplog) -> None:
+    _write_day(tmp_path, date(2026, 3, 26), 50.0, days=7)
+
+    with caplog.at_level("WARNING", logger="geovito_metrics_collector.rollups"):
+        assert update_rollups(tmp_path, date(2026, 3, 26)) is False
+
+    assert "adsense, ga4 for 2026-03-26 not added (multi-day window)" in caplog.text
+    assert read_rollups(tmp_path, "month") == []
@@ -0,0 +1,70 @@
+import threading
+import time
+from datetime import date
+
+import pytest
+
+from geovito_metrics_collector import runner
+from geovito_metrics_collector.config import DateWindow
+from geovito_metrics_collector.schema import make_provider_result
+
+WINDOW = DateWindow(start=date(2026, 2, 1), end=date(2026, 2, 7))
+
+
+def _sleeping_collector(provider, delay):
+    def collect(config, date_window, row_limit):
+        time.sleep(delay)
+        return make_provider_result(
+            provider=provider,
+            start=date_window.start,
+            end=date_window.end,
+            rows=[{"page": "/en/", "sessions": 1}],
+        )
+
+    return collect
+
+
+def _failing_collector(config, date_window, row_limit):
+    raise RuntimeError("boom")
+
+
+def test_collect_providers_runs_concurrently_in_canonical_order(monkeypatch, collector_config) -> None:
+    # Each collector waits for the other; run one after the other, the barrier would break.
+    barrier = threading.Barrier(2, timeout=10)
+
+    def rendezvous(provider):
+        def collect(config, date_window, row_limit):
+            barrier.wait()
+            return _sleeping_collector(provider, 0.0)(config, date_window, row_limit)
+
+        return collect
+
+    monkeypatch.setitem(runner.COLLECTORS, "ga4", rendezvous("ga4"))
+    monkeypatch.setitem(runner.COLLECTORS, "gsc", rendezvous("gsc"))
+    monkeypatch.setitem(runner.COLLECTORS, "cloudflare", _sleeping_collector("cloudflare", 0.0))
+
+    results = runner.collect_providers(collector_config, WINDOW, ["ga4", "gsc", "cloudflare"])
+
+    assert [result.provider for result in results] == ["ga4", "gsc", "cloudflare"]
+    assert [result.errors for result in results] == [[], [], []]
+
+
+def test_collect_providers_deadline_is_fail_soft(monkeypatch, collector_config) -> None:
+    monkeypatch.setitem(runner.COLLECTORS, "ga4", _sleeping_collector("ga4", 2.0))
+    monkeypatch.setitem(runner.COLLECTORS, "gsc", _sleeping_collector("gsc", 0.0))
+
+    results = runner.collect_providers(collector_config, WINDOW, ["ga4", "gsc"], fail_soft=True, timeout=0.1)
+
+    assert results[0].errors == ["timed out after 0.1s"]
+    assert results[0].notes == ["provider execution failed"]
+    assert results[1].errors == []
+
+
+def test_collect_providers_aborts_without_fail_soft(monkeypatch, collector_config) -> None:
+    monkeypatch.setitem(runner.COLLECTORS, "ga4", _sleeping_collector("ga4", 0.0))
+    monkeypatch.setitem(runner.COLLECTORS, "gsc", _failing_collector)
+
+    with pytest.raises(runner.CollectionAborted) as excinfo:
+        runner.collect_providers(collector_config, WINDOW, ["ga4", "gsc"])
+
+    assert excinfo.value.errors == ["gsc: boom"]
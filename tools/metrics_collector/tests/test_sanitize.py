@@ -1,4 +1,14 @@
-from geovito_metrics_collector.sanitize import sanitize_path, sanitize_query, sanitize_row, sanitize_rows
+import json
+
+from geovito_metrics_collector.sanitize import (
+    RowSanitizer,
+    row_fingerprint,
+    sanitize_batch,
+    sanitize_path,
+    sanitize_query,
+    sanitize_row,
+    sanitize_rows,
+)
 
 
 def test_sanitize_path_strips_host_query_and_hash() -> None:
@@ -17,6 +27,15 @@ def test_sanitize_query_truncates_and_redacts() -> None:
     assert len(value) <= 120
 
 
+def test_sanitizers_keep_iso_dates_but_redact_phone_numbers() -> None:
+    row = {"kind": "daily", "date": "2026-02-07", "estimatedEarnings": 1.25}
+    assert sanitize_row(row)["date"] == "2026-02-07"
+    assert sanitize_batch([row])[0]["date"] == "2026-02-07"
+    assert sanitize_query("flights 2026-02-07 rome") == "flights 2026-02-07 rome"
+    assert sanitize_query("call 0212 555 0101") == "call [redacted-phone]"
+    assert sanitize_query("2026-02-0712") == "[redacted-phone]"
+
+
 def test_sanitize_row_drops_sensitive_fields() -> None:
     row = sanitize_row(
         {
@@ -41,3 +60,48 @@ def test_sanitize_rows_deduplicates_and_limits() -> None:
     ]
     cleaned = sanitize_rows(rows, limit=1)
     assert cleaned == [{"page": "/en/a", "sessions": 10}]
+
+
+def _mixed_rows():
+    values = [
+        "https://geovito.com/en/a?x=1",
+        "//en//b#top",
+        "call +90 (212) 555-0101 now",
+        "mail a.b@example.com or 12345678 9@x.com",
+        "  spaced   text  ",
+        "",
+        "x" * 200,
+        10,
+        10.0,
+        True,
+        -0.0,
+        0.0,
+        float("nan"),
+        None,
+        ["nested"],
+    ]
+    keys = ["page", "query", "landingPagePath", "title", "referrer", "Session_ID", "clicks", "kind"]
+    rows = []
+    for index in range(600):
+        rows.append({key: values[(index * (offset + 3)) % len(values)] for offset, key in enumerate(keys)})
+    return rows
+
+
+def test_sanitize_batch_matches_sanitize_rows() -> None:
+    rows = _mixed_rows()
+    for limit in (1, 50, 10_000):
+        expected = sanitize_rows(rows, limit=limit)
+        assert json.dumps(sanitize_batch(rows, limit=limit), ensure_ascii=False) == json.dumps(expected, ensure_ascii=False)
+
+    # Dedup state carries across calls on the same sanitizer.
+    sanitizer = RowSanitizer(limit=10_000)
+    streamed = sanitizer.sanitize(rows[:300]) + sanitizer.sanitize(rows[300:])
+    assert json.dumps(streamed) == json.dumps(sanitize_rows(rows, limit=10_000))
+
+
+def test_row_fingerprint_matches_json_equality() -> None:
+    assert row_fingerprint({"a": 1}) != row_fingerprint({"a": 1.0})
+    assert row_fingerprint({"a": 1}) != row_fingerprint({"a": True})
+    assert row_fingerprint({"a": 0.0}) != row_fingerprint({"a": -0.0})
+    assert row_fingerprint({"a": float("nan")}) == row_fingerprint({"a": float("nan")})
+    assert row_fingerprint({"a": "1"}) != row_fingerprint({"a": 1})
@@ -0,0 +1,100 @@
+import httplib2
+import pytest
+import requests
+from googleapiclient.errors import HttpError
+
+from geovito_metrics_collector.providers import ga4
+from geovito_metrics_collector.scheduler import (
+    ProviderScheduler,
+    RateLimit,
+    RateLimited,
+    RetryPolicy,
+    classify_error,
+    get_scheduler,
+)
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def _scheduler(clock, limit=RateLimit(rate=2.0, burst=2)):
+    return ProviderScheduler("test", limit, RetryPolicy(max_attempts=3), clock=clock, sleep=clock.sleep, jitter=lambda: 0.5)
+
+
+def _google_error(status, content=b"{}", headers=None):
+    return HttpError(httplib2.Response({"status": status, **(headers or {})}), content)
+
+
+def test_token_bucket_paces_after_burst() -> None:
+    clock = _Clock()
+    scheduler = _scheduler(clock)
+
+    for _ in range(4):
+        scheduler.call(lambda: None)
+
+    assert clock.sleeps == [0.5, 0.5]
+
+
+def test_retries_honor_retry_after_and_stop_on_permanent_errors() -> None:
+    clock = _Clock()
+    scheduler = _scheduler(clock, RateLimit(rate=100.0, burst=10))
+    attempts = []
+
+    def flaky():
+        attempts.append(clock.now)
+        if len(attempts) == 1:
+            raise _google_error(429, headers={"retry-after": "7"})
+        if len(attempts) == 2:
+            raise RateLimited("limit reached")
+        return "ok"
+
+    assert scheduler.call(flaky) == "ok"
+    # Retry-After plus jitter, then jittered exponential backoff (0.5 * 2s).
+    assert clock.sleeps == [pytest.approx(7.5), pytest.approx(1.0)]
+    assert scheduler.retries == 2
+
+    calls = []
+
+    def forbidden():
+        calls.append(1)
+        raise _google_error(403, b'{"error": {"errors": [{"reason": "forbidden"}]}}')
+
+    with pytest.raises(HttpError):
+        scheduler.call(forbidden)
+    assert len(calls) == 1
+
+
+def test_classify_error() -> None:
+    assert classify_error(_google_error(403, b'{"reason": "userRateLimitExceeded"}')) == (True, None)
+    assert classify_error(_google_error(503)) == (True, None)
+    assert classify_error(_google_error(400)) == (False, None)
+
+    response = requests.Response()
+    response.status_code = 429
+    response.headers["Retry-After"] = "12"
+    assert classify_error(requests.HTTPError(response=response)) == (True, 12.0)
+    assert classify_error(requests.ConnectionError()) == (True, None)
+    assert classify_error(ValueError("bad payload")) == (False, None)
+
+
+def test_ga4_property_quota_slows_the_scheduler() -> None:
+    scheduler = get_scheduler("ga4")
+    ga4._observe_quota(
+        "properties/quota-test",
+        {"propertyQuota": {"tokensPerHour": {"consumed": 36000, "remaining": 4000}, "tokensPerDay": {"consumed": 10, "remaining": 190000}}},
+    )
+    try:
+        assert scheduler.rate_scale() == pytest.approx(0.2)
+    finally:
+        scheduler.observe_headroom("properties/quota-test", 1.0)
+    assert scheduler.rate_scale() == 1.0
@@ -0,0 +1,18 @@
+from datetime import datetime, timezone
+
+import bench_serialization
+
+from geovito_metrics_collector import schema
+
+# Timing and allocation comparisons live in benchmarks/bench_serialization.py.
+ROW_COUNT = 2_000
+
+
+def test_trusted_serialization_writes_the_same_bytes(monkeypatch, tmp_path) -> None:
+    monkeypatch.setattr(schema, "utc_now", lambda: datetime(2026, 2, 8, tzinfo=timezone.utc))
+    rows = bench_serialization.synthetic_rows(ROW_COUNT)
+
+    old_dir = bench_serialization.validated_path(tmp_path / "validated", rows)
+    new_dir = bench_serialization.trusted_path(tmp_path / "trusted", rows)
+
+    assert (new_dir / "ga4.json").read_bytes() == (old_dir / "ga4.json").read_bytes()
@@ -0,0 +1,22 @@
+from datetime import date
+
+from geovito_metrics_collector import runner
+from geovito_metrics_collector.config import DateWindow
+
+WINDOW = DateWindow(start=date(2026, 2, 1), end=date(2026, 2, 7))
+
+
+def test_every_collector_runs_against_the_standin(standin) -> None:
+    config, stats = standin
+
+    results = runner.collect_providers(config, WINDOW, ["ga4", "gsc", "cloudflare", "adsense"], row_limit=20)
+
+    assert [result.errors for result in results] == [[], [], [], []]
+    ga4, gsc, cloudflare, adsense = results
+    assert len(ga4.rows) == 20 and ga4.metrics["screenPageViews"] > 0
+    assert "page_export=gsc.page.jsonl rows=300" in gsc.notes
+    assert "query_export=gsc.query.jsonl rows=700" in gsc.notes
+    assert all("?" not in str(row["path"]) for row in cloudflare.rows if row["kind"] == "path")
+    assert [row["date"] for row in adsense.rows] == [f"2026-02-0{day}" for day in range(1, 8)]
+    assert adsense.metrics == {"estimatedEarnings": 108.5, "impressions": 28_000.0, "pageViewsRpm": 3.1}
+    assert stats.to_json()["rows"]["gsc"] >= 1_000
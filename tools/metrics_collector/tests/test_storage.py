@@ -0,0 +1,62 @@
+import json
+from datetime import date
+
+import pytest
+
+from geovito_metrics_collector.schema import make_provider_result
+from geovito_metrics_collector.storage import build_summary, provider_files, read_json, write_results
+
+DAY = date(2026, 2, 7)
+ROWS = [
+    {"page": "/en/a", "sessions": 2.5, "title": "Café \"ü\"\n", "flag": True, "missing": None},
+    {},
+    {"page": "/en/b", "nested": {"b": [1, 2], "a": {}}, "sessions": 1e16},
+]
+
+
+def _result(provider="ga4", rows=ROWS):
+    return make_provider_result(provider=provider, start=DAY, end=DAY, metrics={"sessions": 3.5}, notes=["n"], rows=rows)
+
+
+@pytest.mark.parametrize("pretty", [False, True])
+def test_fast_encoder_matches_json_dumps(tmp_path, pretty) -> None:
+    result = _result()
+    output_dir = write_results(tmp_path, DAY, [result], build_summary([result]), pretty=pretty)
+
+    payload = result.model_dump(mode="json")
+    if pretty:
+        expected = json.dumps(payload, ensure_ascii=False, sort_keys=True, indent=2) + "\n"
+    else:
+        expected = json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(",", ":")) + "\n"
+    assert (output_dir / "ga4.json").read_bytes() == expected.encode("utf-8")
+
+
+@pytest.mark.parametrize("compression", ["gzip", "zstd"])
+def test_compressed_results_read_transparently_and_reproducibly(tmp_path, compression) -> None:
+    if compression == "zstd":
+        pytest.importorskip("zstandard")
+    result = _result()
+    summary = build_summary([result])
+    first = write_results(tmp_path / "a", DAY, [result], summary, compression=compression)
+    second = write_results(tmp_path / "b", DAY, [result], summary, compression=compression)
+
+    suffix = {"gzip": ".gz", "zstd": ".zst"}[compression]
+    assert provider_files(first) == [first / f"ga4.json{suffix}"]
+    assert read_json(first / f"ga4.json{suffix}") == result.model_dump(mode="json")
+    assert (first / f"ga4.json{suffix}").read_bytes() == (second / f"ga4.json{suffix}").read_bytes()
+    assert json.loads((first / "summary.json").read_text())["kpis"]["sessions_7d"] == 3.5
+
+
+def test_directory_swap_replaces_and_carries_over_files(tmp_path) -> None:
+    ga4, gsc = _result(), _result("gsc", rows=[])
+    write_results(tmp_path, DAY, [ga4, gsc], build_summary([ga4, gsc]))
+    (tmp_path / DAY.isoformat() / "ga4.pages.jsonl").write_text("{}\n")
+    (tmp_path / DAY.isoformat() / "timings.json").write_text("{}\n")
+
+    # A later ga4-only run, now compressed, replaces ga4.json and keeps the other files, but
+    # not the earlier run's timings.
+    output_dir = write_results(tmp_path, DAY, [ga4], build_summary([ga4]), compression="gzip")
+    assert sorted(path.name for path in output_dir.iterdir()) == ["ga4.json.gz", "ga4.pages.jsonl", "gsc.json", "summary.json"]
+    assert [path.name for path in provider_files(output_dir)] == ["ga4.json.gz", "gsc.json"]
+    # Nothing is left behind next to the date directories.
+    assert [path.name for path in tmp_path.iterdir()] == [DAY.isoformat()]
@@ -0,0 +1,77 @@
+import os
+import shutil
+from datetime import date, timedelta
+
+from geovito_metrics_collector import timeseries
+from geovito_metrics_collector.schema import make_provider_result
+from geovito_metrics_collector.storage import build_summary, write_results
+from geovito_metrics_collector.timeseries import SeriesKey, TimeSeriesIndex, group_points
+
+
+def _write_day(out_root, end, sessions, rows):
+    result = make_provider_result(
+        provider="ga4", start=end, end=end, metrics={"sessions": sessions}, rows=rows
+    )
+    write_results(out_root, end, [result], build_summary([result]))
+
+
+def test_index_reads_totals_and_paths_by_date_range(tmp_path) -> None:
+    first = date(2026, 3, 2)
+    for offset in range(10):
+        day = first + timedelta(days=offset)
+        rows = [
+            {"property": "1", "page": "/en/a", "sessions": 1},
+            {"property": "2", "page": "/en/a", "sessions": offset},
+        ]
+        _write_day(tmp_path, day, float(offset), rows)
+
+    index = TimeSeriesIndex(tmp_path)
+    assert index.ensure_current() is True
+    assert index.ensure_current() is False
+
+    totals = index.points(SeriesKey("ga4", 1, "sessions"), date(2026, 3, 4), date(2026, 3, 6))
+    assert [(point.day.day, point.value) for point in totals] == [(4, 2.0), (5, 3.0), (6, 4.0)]
+    # Rows of both properties are summed per path.
+    page = index.points(SeriesKey("ga4", 1, "sessions", "/en/a"))
+    assert [point.value for point in page] == [1.0 + offset for offset in range(10)]
+    assert group_points(totals, "week", "sum") == [("2026-W10", 9.0)]
+    assert group_points(page, "week", "last") == [("2026-W10", 7.0), ("2026-W11", 10.0)]
+    index.close()
+
+
+def test_index_rebuilds_after_new_run(tmp_path) -> None:
+    _write_day(tmp_path, date(2026, 3, 2), 1.0, [])
+    index = TimeSeriesIndex(tmp_path)
+    index.ensure_current()
+    assert len(index.points(SeriesKey("ga4", 1, "sessions"))) == 1
+
+    _write_day(tmp_path, date(2026, 3, 3), 2.0, [])
+    assert index.is_stale()
+    index.ensure_current()
+    assert [point.value for point in index.points(SeriesKey("ga4", 1, "sessions"))] == [1.0, 2.0]
+    # Only the current generation's column files are kept.
+    assert sorted(name.split("-")[0] for name in os.listdir(index.root) if not name.endswith(".json")) == ["days", "values"]
+    index.close()
+
+
+def test_index_update_rereads_only_changed_directories(monkeypatch, tmp_path) -> None:
+    for offset, sessions in enumerate([1.0, 2.0, 3.0]):
+        _write_day(tmp_path, date(2026, 3, 2) + timedelta(days=offset), sessions, [{"page": "/en/a", "sessions": 1}])
+    index = TimeSeriesIndex(tmp_path)
+    index.ensure_current()
+    index.close()
+
+    read = []
+    original = timeseries.read_json
+    monkeypatch.setattr(timeseries, "read_json", lambda path: read.append(path.parent.name) or original(path))
+    _write_day(tmp_path, date(2026, 3, 2), 10.0, [])
+    _write_day(tmp_path, date(2026, 3, 5), 4.0, [{"page": "/en/a", "sessions": 2}])
+    shutil.rmtree(tmp_path / "2026-03-03")
+
+    assert index.ensure_current() is True
+    assert sorted(read) == ["2026-03-02", "2026-03-05"]
+    totals = index.points(SeriesKey("ga4", 1, "sessions"))
+    assert [(point.day.day, point.value) for point in totals] == [(2, 10.0), (4, 3.0), (5, 4.0)]
+    page = index.points(SeriesKey("ga4", 1, "sessions", "/en/a"))
+    assert [(point.day.day, point.value) for point in page] == [(4, 1.0), (5, 2.0)]
+    index.close()
@@ -0,0 +1,94 @@
+import sqlite3
+from datetime import date
+
+import pytest
+
+from geovito_metrics_collector import runner
+from geovito_metrics_collector.config import DateWindow
+from geovito_metrics_collector.schema import make_provider_result
+from geovito_metrics_collector.warehouse import upsert_results
+
+WINDOW = DateWindow(start=date(2026, 2, 1), end=date(2026, 2, 7))
+
+
+def _ga4_result(sessions):
+    return make_provider_result(
+        provider="ga4",
+        start=WINDOW.start,
+        end=WINDOW.end,
+        metrics={"sessions": sessions},
+        rows=[{"page": "/en/atlas/istanbul", "sessions": sessions}, {"page": "/en/", "sessions": 1.0}],
+    )
+
+
+def test_upsert_results_is_idempotent_and_indexed(tmp_path) -> None:
+    path = tmp_path / "warehouse.sqlite3"
+    upsert_results(path, [_ga4_result(5.0)])
+    upsert_results(path, [_ga4_result(7.0)])
+
+    conn = sqlite3.connect(path)
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert conn.execute("SELECT COUNT(*) FROM rows").fetchone()[0] == 2
+    assert conn.execute("SELECT value FROM metrics WHERE provider = 'ga4' AND name = 'sessions'").fetchall() == [(7.0,)]
+
+    query = (
+        "SELECT end_date, json_extract(data, '$.sessions') FROM rows "
+        "WHERE provider = 'ga4' AND kind = 'page' AND key = '/en/atlas/istanbul' AND end_date BETWEEN ? AND ?"
+    )
+    assert conn.execute(query, ("2026-01-01", "2026-03-01")).fetchall() == [("2026-02-07", 7.0)]
+    plan = " ".join(row[-1] for row in conn.execute("EXPLAIN QUERY PLAN " + query, ("2026-01-01", "2026-03-01")))
+    assert "USING INDEX rows_by_key" in plan
+
+
+def _stream(provider, fail=False):
+    def stream(config, date_window, row_limit):
+        yield [{"kind": "query", "value": "rome", "clicks": 3.0}]
+        if fail:
+            raise RuntimeError("boom")
+        return make_provider_result(provider=provider, start=date_window.start, end=date_window.end, metrics={"clicks": 3.0})
+
+    return stream
+
+
+def test_stream_providers_upserts_on_success_only(monkeypatch, collector_config, tmp_path) -> None:
+    path = tmp_path / "warehouse.sqlite3"
+    monkeypatch.setitem(runner.COLLECTORS, "gsc", _stream("gsc"))
+    monkeypatch.setitem(runner.COLLECTORS, "cloudflare", _stream("cloudflare", fail=True))
+
+    with pytest.raises(runner.CollectionAborted):
+        runner.stream_providers(collector_config, WINDOW, ["gsc", "cloudflare"], tmp_path / "a", warehouse_path=path)
+    streamed = runner.stream_providers(collector_config, WINDOW, ["gsc"], tmp_path / "b", warehouse_path=path)
+    # Nothing reaches the warehouse until the run's date directory is in place.
+    assert sqlite3.connect(path).execute("SELECT COUNT(*) FROM results").fetchone()[0] == 0
+    runner.commit_side_outputs(streamed)
+
+    conn = sqlite3.connect(path)
+    assert conn.execute("SELECT provider, kind, key FROM rows").fetchall() == [("gsc", "query", "rome")]
+    assert conn.execute("SELECT COUNT(*) FROM staged_rows").fetchone()[0] == 0
+    assert conn.execute("SELECT provider, row_count FROM results").fetchall() == [("gsc", 1)]
+
+
+def test_run_updates_warehouse_only_after_the_directory_swap(monkeypatch, collector_config, tmp_path) -> None:
+    from typer.testing import CliRunner
+
+    from geovito_metrics_collector import cli
+    from geovito_metrics_collector.storage import StagedOutputDir
+
+    path = tmp_path / "warehouse.sqlite3"
+    out = tmp_path / "metrics"
+    monkeypatch.setitem(runner.COLLECTORS, "gsc", _stream("gsc"))
+    monkeypatch.setattr(cli, "load_config", lambda env_file=None: collector_config)
+
+    def crash(self):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(StagedOutputDir, "commit", crash)
+    args = ["run", "--date", "2026-02-07", "--providers", "gsc", "--out", str(out), "--warehouse", str(path)]
+    outcome = CliRunner().invoke(cli.app, args)
+
+    assert isinstance(outcome.exception, OSError)
+    assert not (out / "2026-02-07").exists()
+    assert not [entry for entry in out.iterdir() if "staging" in entry.name]
+    conn = sqlite3.connect(path)
+    assert conn.execute("SELECT COUNT(*) FROM results").fetchone()[0] == 0
+    assert conn.execute("SELECT COUNT(*) FROM staged_rows").fetchone()[0] == 0